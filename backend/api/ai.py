@@ -10,11 +10,11 @@ from datetime import datetime
 from models.database import get_db
 from models.question import Question
 from models.ai_task import AITask
+from models.types import json_array_contains
 from schemas.common import Response
 from pydantic import BaseModel
 from utils.security import get_current_user
 from utils.exceptions import NotFoundError, ParameterError
-from utils.helpers import to_json, from_json
 from services.ai_service import get_ai_service, AIService
 
 router = APIRouter()
@@ -136,7 +136,7 @@ async def batch_complete_questions(
     task = AITask(
         type=type,
         status="pending",
-        question_ids=to_json([q.id for q in questions]),
+        question_ids=[q.id for q in questions],
         total_count=len(questions)
     )
     
@@ -181,7 +181,7 @@ async def process_batch_task(task_id: str, db: Session):
         return
     
     # Get questions
-    question_ids = from_json(task.question_ids, [])
+    question_ids = task.question_ids or []
     
     # Process each question
     for question_id in question_ids:
@@ -235,6 +235,7 @@ async def process_batch_task(task_id: str, db: Session):
 @router.get("/tasks")
 async def get_tasks(
     status: Optional[str] = None,
+    questionId: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
@@ -244,6 +245,10 @@ async def get_tasks(
     if status and status != 'all':
         query = query.filter(AITask.status == status)
     
+    if questionId:
+        # 包含该题的任务，在库内按 JSON 数组筛选（PostgreSQL 走 GIN 索引）
+        query = query.filter(json_array_contains(db.bind.dialect.name, AITask.question_ids, questionId))
+    
     tasks = query.order_by(AITask.created_at.desc()).all()
     
     items = [
@@ -296,7 +301,7 @@ async def get_task(
             "completedCount": task.completed_count,
             "failedCount": task.failed_count,
             "progress": task.completed_count / task.total_count if task.total_count > 0 else 0,
-            "questionIds": from_json(task.question_ids, []),
+            "questionIds": task.question_ids or [],
             "currentQuestionId": task.current_question_id,
             "errorMessage": task.error_message,
             "createdAt": task.created_at.isoformat() if task.created_at else None,
@@ -430,7 +435,7 @@ async def generate_learning_report(
     for wq in wrong_questions:
         question = db.query(Question).filter(Question.id == wq.question_id).first()
         if question:
-            tags = from_json(question.tags) if question.tags else []
+            tags = question.tags or []
             wrong_question_data.append({
                 "content": question.content,
                 "type": question.type,
@@ -5,6 +5,7 @@ from typing import List
 from models.database import get_db
 from models.category import Category
 from models.question import Question
+from services import change_feed
 from schemas.category import CategoryCreate, CategoryUpdate, CategoryResponse
 from schemas.common import Response
 from utils.security import get_current_user
@@ -188,7 +189,7 @@ async def delete_category(
     
     # Move questions to default category
     moved_count = db.query(Question).filter(Question.category_id == category_id).update(
-        {"category_id": "default"}
+        {"category_id": "default", "change_seq": change_feed.next_seq(db.connection())}
     )
     
     # Delete category
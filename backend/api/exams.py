@@ -6,14 +6,16 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import List, Optional, Dict
 from datetime import datetime
-import json
 
 from models.database import get_db
 from models.exam import Exam, WrongQuestion
 from models.question import Question
+from models.types import json_array_contains
 from services.exam_service import ExamService, ExamConfig
 from services.grading_service import GradingService
 from api.auth import get_current_user
+from utils.responses import trusted_response, rows_to_dicts
+from utils.helpers import to_json
 
 router = APIRouter(prefix="/exams", tags=["exams"])
 
@@ -36,6 +38,7 @@ class CustomExamRequest(BaseModel):
     category_ids: Optional[List[str]] = None
     question_types: Optional[List[str]] = None
     difficulties: Optional[List[str]] = None
+    tags: Optional[List[str]] = None
     type_counts: Optional[List[TypeCount]] = None
     time_limit: Optional[int] = None
     shuffle_options: bool = True
@@ -78,6 +81,9 @@ class ExamResponse(BaseModel):
         from_attributes = True
 
 
+EXAM_LIST_FIELDS = list(ExamResponse.model_fields)
+
+
 class ExamDetailResponse(ExamResponse):
     config: Optional[str]
     question_ids: str
@@ -150,6 +156,7 @@ def generate_custom_exam(
             category_ids=request.category_ids,
             question_types=request.question_types,
             difficulties=request.difficulties,
+            tags=request.tags,
             type_counts=type_counts,
             time_limit=request.time_limit,
             shuffle_options=request.shuffle_options,
@@ -169,6 +176,7 @@ def generate_custom_exam(
 def list_exams(
     status: Optional[str] = None,
     mode: Optional[str] = None,
+    question_id: Optional[str] = None,
     skip: int = 0,
     limit: int = 50,
     db: Session = Depends(get_db),
@@ -181,9 +189,13 @@ def list_exams(
         query = query.filter(Exam.status == status)
     if mode:
         query = query.filter(Exam.mode == mode)
+    if question_id:
+        # 包含该题的考试，在库内按 JSON 数组筛选（PostgreSQL 走 GIN 索引）
+        query = query.filter(json_array_contains(db.bind.dialect.name, Exam.question_ids, question_id))
     
     exams = query.order_by(Exam.created_at.desc()).offset(skip).limit(limit).all()
-    return exams
+    # ORM 列与 ExamResponse 字段一一对应，直接序列化，跳过逐项 from_attributes 校验
+    return trusted_response(rows_to_dicts(exams, EXAM_LIST_FIELDS))
 
 
 @router.get("/{exam_id}", response_model=ExamDetailResponse)
@@ -196,7 +208,15 @@ def get_exam(
     exam = db.query(Exam).filter(Exam.id == exam_id).first()
     if not exam:
         raise HTTPException(status_code=404, detail="考试不存在")
-    return exam
+    
+    # JSON 列在接口中仍以 JSON 字符串返回
+    data = rows_to_dicts([exam], EXAM_LIST_FIELDS)[0]
+    data.update(
+        config=to_json(exam.config),
+        question_ids=to_json(exam.question_ids),
+        answers=to_json(exam.answers)
+    )
+    return data
 
 
 @router.get("/{exam_id}/questions", response_model=ExamQuestionsResponse)
@@ -219,9 +239,7 @@ def get_exam_questions(
     questions = service.get_exam_questions(exam)
     
     # 获取已保存的答案
-    saved_answers = {}
-    if exam.answers:
-        saved_answers = json.loads(exam.answers)
+    saved_answers = exam.answers or {}
     
     # 构建响应
     question_list = []
@@ -231,7 +249,7 @@ def get_exam_questions(
             "type": q.type,
             "difficulty": q.difficulty,
             "content": q.content,
-            "options": q.options,
+            "options": to_json(q.options),
             "user_answer": saved_answers.get(q.id)
         }
         
@@ -263,14 +281,12 @@ def save_answer(
     if exam.status != "in_progress":
         raise HTTPException(status_code=400, detail="考试已结束")
     
-    # 获取当前答案
-    answers = {}
-    if exam.answers:
-        answers = json.loads(exam.answers)
+    # 获取当前答案（复制后重新赋值，JSON 列不跟踪原地修改）
+    answers = dict(exam.answers or {})
     
     # 更新答案
     answers[request.question_id] = request.answer
-    exam.answers = json.dumps(answers, ensure_ascii=False)
+    exam.answers = answers
     
     db.commit()
     
@@ -363,8 +379,7 @@ def manual_grade_question(
         raise HTTPException(status_code=400, detail="只能为已完成的考试评分")
     
     # 验证题目是否在试卷中
-    question_ids = json.loads(exam.question_ids)
-    if request.question_id not in question_ids:
+    if request.question_id not in (exam.question_ids or []):
         raise HTTPException(status_code=400, detail="题目不在试卷中")
     
     # 获取题目
@@ -377,7 +392,7 @@ def manual_grade_question(
     
     # 更新分数
     # 先获取旧的评分信息
-    config = json.loads(exam.config) if exam.config else {}
+    config = dict(exam.config or {})
     manual_grades = config.get("manual_grades", {})
     
     old_grade = manual_grades.get(request.question_id)
@@ -386,18 +401,15 @@ def manual_grade_question(
     # 更新总分：减去旧分，加上新分
     exam.score = exam.score - old_score + request.score
     
-    # 可以将评分信息存储在 config 中
-    config = json.loads(exam.config) if exam.config else {}
-    if "manual_grades" not in config:
-        config["manual_grades"] = {}
-    
+    # 可以将评分信息存储在 config 中（复制后重新赋值，JSON 列不跟踪原地修改）
+    config["manual_grades"] = dict(manual_grades)
     config["manual_grades"][request.question_id] = {
         "score": request.score,
         "feedback": request.feedback,
         "graded_at": datetime.now().isoformat()
     }
     
-    exam.config = json.dumps(config, ensure_ascii=False)
+    exam.config = config
     db.commit()
     
     return {"message": "评分成功", "score": request.score}
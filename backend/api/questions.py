@@ -1,25 +1,36 @@
-from fastapi import APIRouter, Depends, Query, UploadFile, File
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, Query, UploadFile, File, Body, BackgroundTasks, Header
+from fastapi.responses import StreamingResponse, Response as RawResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
-from typing import Optional, List
+from sqlalchemy import or_, and_, select, type_coerce, String, case, func
+from typing import Any, Optional, List, Tuple, Union
+import os
 import math
 import json
-import io
+import asyncio
+import gzip
 from datetime import datetime
 
-from models.database import get_db
+from models.database import get_db, SessionLocal
 from models.question import Question
 from models.category import Category
+from models.exam import WrongQuestion
+from models.import_job import ImportJob, ImportJobItem
 from schemas.question import (
     QuestionCreate, QuestionUpdate, QuestionResponse,
-    QuestionListQuery, QuestionStatsResponse, BatchUpdateCategoryRequest
+    QuestionListQuery, QuestionStatsResponse, BatchUpdateCategoryRequest,
+    BatchGetRequest, ImportSessionRequest, BulkMutationRequest,
+    QuestionPageResponse, QuestionCursorPageResponse
 )
 from schemas.common import Response, PageResponse
 from utils.security import get_current_user
 from utils.exceptions import NotFoundError, ParameterError
-from utils.helpers import to_json, from_json
-from services.document_parser import get_document_parser
+from utils.helpers import encode_cursor, decode_cursor
+from utils.upload import spool_upload, remove_file
+from utils.responses import ok
+from services import search_service, counter_service, question_sync, import_service, tag_service, change_feed, bundle_service
+from services.import_service import ImportService, SUPPORTED_EXTENSIONS
+from config import settings
 
 router = APIRouter()
 
@@ -32,22 +43,28 @@ def question_to_dict(question: Question) -> dict:
         "type": question.type,
         "difficulty": question.difficulty,
         "content": question.content,
-        "options": from_json(question.options, {}),
+        "options": question.options or {},
         "answer": question.answer,
         "answerStatus": question.answer_status,
         "explanation": question.explanation,
         "explanationStatus": question.explanation_status,
-        "tags": from_json(question.tags, []),
+        "tags": question.tags or [],
         "source": question.source,
         "createdAt": question.created_at,
         "updatedAt": question.updated_at
     }
 
 
-@router.get("", response_model=Response[PageResponse])
-async def get_questions(
-    page: int = Query(1, ge=1),
-    pageSize: int = Query(20, ge=1, le=100),
+def _keyset_value(db: Session, value: datetime):
+    """Bind value for comparing against a timestamp column in keyset conditions"""
+    if db.bind.dialect.name == "sqlite":
+        # SQLite 以文本存储时间（server_default 写入的值不含微秒），按原样比较
+        return type_coerce(value.isoformat(sep=" "), String)
+    return value
+
+
+def question_filters(
+    db: Session,
     keyword: Optional[str] = None,
     categoryId: Optional[str] = None,
     type: Optional[str] = None,
@@ -55,56 +72,184 @@ async def get_questions(
     status: Optional[str] = None,
     answerStatus: Optional[str] = None,
     explanationStatus: Optional[str] = None,
-    sortBy: str = "createdAt",
-    sortOrder: str = "desc",
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
-):
-    """Get question list with pagination and filters"""
-    query = db.query(Question)
+    tag: Optional[str] = None
+) -> Tuple[list, Optional[Any]]:
+    """
+    Build question list filter conditions (shared by the list and bulk mutation endpoints)
+
+    Returns (filters, matches): matches is the ranked full-text subquery when the keyword
+    is served by the search index (not included in filters), otherwise None
+    """
+    filters, matches = _search_filters(db, keyword, answerStatus, explanationStatus, tag)
+    return filters + _facet_filters(categoryId, type, difficulty, status), matches
+
+
+def _search_filters(
+    db: Session,
+    keyword: Optional[str],
+    answerStatus: Optional[str],
+    explanationStatus: Optional[str],
+    tag: Optional[str]
+) -> Tuple[list, Optional[Any]]:
+    """Filter conditions other than the facets (same return value as question_filters)"""
+    filters = []
     
-    # Apply filters
+    matches = None
     if keyword:
-        query = query.filter(Question.content.like(f"%{keyword}%"))
+        # 优先使用全文索引，索引不可用或关键词过短时回退到 LIKE
+        matches = search_service.ranked_matches(db.connection(), keyword)
+        if matches is None:
+            filters.append(Question.content.like(f"%{keyword}%"))
+    
+    if answerStatus:
+        filters.append(Question.answer_status == answerStatus)
+    
+    if explanationStatus:
+        filters.append(Question.explanation_status == explanationStatus)
+    
+    if tag:
+        filters.append(tag_service.tag_filter([tag]))
+    
+    return filters, matches
+
+
+def _facet_filters(
+    categoryId: Optional[str],
+    type: Optional[str],
+    difficulty: Optional[str],
+    status: Optional[str]
+) -> list:
+    """Filter conditions for the facet selections (category/type/difficulty/status)"""
+    filters = []
     
     if categoryId:
-        query = query.filter(Question.category_id == categoryId)
+        filters.append(Question.category_id == categoryId)
     
     if type:
-        query = query.filter(Question.type == type)
+        filters.append(Question.type == type)
     
     if difficulty:
-        query = query.filter(Question.difficulty == difficulty)
+        filters.append(Question.difficulty == difficulty)
     
-    if status:
-        if status == "complete":
-            # 答案和解析都不是 none 则视为完成 (包括 confirmed 和 ai_generated)
-            query = query.filter(
-                and_(
-                    Question.answer_status != "none",
-                    Question.explanation_status != "none"
-                )
-            )
-        elif status == "incomplete":
-            # 只要有一个是 none 则视为未完成
-            query = query.filter(
-                or_(
-                    Question.answer_status == "none",
-                    Question.explanation_status == "none"
-                )
-            )
+    if status == "complete":
+        # 答案和解析都不是 none 则视为完成 (包括 confirmed 和 ai_generated)
+        filters.append(and_(
+            Question.answer_status != "none",
+            Question.explanation_status != "none"
+        ))
+    elif status == "incomplete":
+        # 只要有一个是 none 则视为未完成
+        filters.append(or_(
+            Question.answer_status == "none",
+            Question.explanation_status == "none"
+        ))
     
-    if answerStatus:
-        query = query.filter(Question.answer_status == answerStatus)
+    return filters
+
+
+FACET_NAMES = ("categoryId", "type", "difficulty", "status")
+
+
+def question_facets(
+    db: Session,
+    filters: list,
+    matches: Optional[Any],
+    categoryId: Optional[str] = None,
+    type: Optional[str] = None,
+    difficulty: Optional[str] = None,
+    status: Optional[str] = None
+) -> dict:
+    """
+    Per-facet counts (category/type/difficulty/status) under the current filters
+
+    filters/matches are the non-facet conditions from _search_filters (built once per request
+    and shared with the list query). One grouped query over the facet columns with those
+    conditions applied; each facet's counts then apply the other facets' selections (not its
+    own, so every option shows how many questions switching to it would return).
+    """
+    status_expr = case(
+        (and_(Question.answer_status != "none", Question.explanation_status != "none"), "complete"),
+        else_="incomplete"
+    )
+    query = db.query(Question.category_id, Question.type, Question.difficulty, status_expr, func.count())
+    if matches is not None:
+        query = query.join(matches, matches.c.question_id == Question.id)
+    rows = query.filter(*filters).group_by(
+        Question.category_id, Question.type, Question.difficulty, status_expr
+    ).all()
+
+    selected = dict(zip(FACET_NAMES, (
+        categoryId, type, difficulty, status if status in ("complete", "incomplete") else None
+    )))
+    facets = {
+        "categoryId": {},
+        "type": dict.fromkeys(counter_service.QUESTION_TYPES, 0),
+        "difficulty": dict.fromkeys(counter_service.DIFFICULTIES, 0),
+        "status": {"complete": 0, "incomplete": 0}
+    }
+    for *values, count in rows:
+        row = dict(zip(FACET_NAMES, values))
+        for name in FACET_NAMES:
+            if row[name] is None:
+                continue
+            if all(not selected[other] or row[other] == selected[other] for other in FACET_NAMES if other != name):
+                facets[name][row[name]] = facets[name].get(row[name], 0) + count
+    return facets
+
+
+@router.get("", response_model=Response[Union[QuestionPageResponse, QuestionCursorPageResponse]])
+async def get_questions(
+    page: int = Query(1, ge=1),
+    pageSize: int = Query(20, ge=1, le=100),
+    pagination: str = Query("page", pattern="^(page|cursor)$"),
+    cursor: Optional[str] = None,
+    includeTotal: bool = False,
+    keyword: Optional[str] = None,
+    categoryId: Optional[str] = None,
+    type: Optional[str] = None,
+    difficulty: Optional[str] = None,
+    status: Optional[str] = None,
+    answerStatus: Optional[str] = None,
+    explanationStatus: Optional[str] = None,
+    tag: Optional[str] = None,
+    sortBy: str = "createdAt",
+    sortOrder: str = "desc",
+    facets: bool = False,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get question list with pagination (page or cursor mode) and filters
+
+    keyword uses the full-text index: Chinese text matches as a substring, English words and
+    numbers match by word prefix ("func" finds "function"); when no word starts with the given
+    English terms the search falls back to a substring scan ("unction" also finds "function").
+    facets=true adds per-facet counts under the current filters (see question_facets)
+    """
+    # 非分面条件（含全文检索子查询）只构建一次，列表查询与分面统计共用
+    search_filters, matches = _search_filters(db, keyword, answerStatus, explanationStatus, tag)
+    filters = search_filters + _facet_filters(categoryId, type, difficulty, status)
+    facet_counts = question_facets(
+        db, search_filters, matches, categoryId, type, difficulty, status
+    ) if facets else None
+    query = db.query(Question)
+    if matches is not None:
+        query = query.join(matches, matches.c.question_id == Question.id)
+    query = query.filter(*filters)
     
-    if explanationStatus:
-        query = query.filter(Question.explanation_status == explanationStatus)
+    # 游标分页：按 (排序时间, id) 定位，不做 OFFSET 扫描，总数仅在 includeTotal 时计算
+    if pagination == "cursor":
+        return _get_questions_by_cursor(
+            db, query, keyword, pageSize, cursor, includeTotal, sortBy, sortOrder, facet_counts
+        )
     
     # Get total count
     total = query.count()
     
     # Apply sorting
-    if sortBy == "createdAt":
+    if sortBy == "relevance" and matches is not None:
+        query = query.order_by(matches.c.rank.asc(), Question.created_at.desc())
+    elif sortBy == "createdAt":
         query = query.order_by(Question.created_at.desc() if sortOrder == "desc" else Question.created_at.asc())
     elif sortBy == "updatedAt":
         query = query.order_by(Question.updated_at.desc() if sortOrder == "desc" else Question.updated_at.asc())
@@ -113,20 +258,96 @@ async def get_questions(
     offset = (page - 1) * pageSize
     questions = query.offset(offset).limit(pageSize).all()
     
-    # Convert to dict
+    # 列表项由 question_to_dict 构造，直接序列化，不再逐项做 Pydantic 校验
+    data = {
+        "items": _list_items(questions, keyword),
+        "total": total,
+        "page": page,
+        "pageSize": pageSize,
+        "totalPages": math.ceil(total / pageSize) if total > 0 else 0
+    }
+    if facet_counts is not None:
+        data["facets"] = facet_counts
+    return ok(data)
+
+
+def _list_items(questions: List[Question], keyword: Optional[str]) -> List[dict]:
+    """Convert list rows to dicts, with search highlights when a keyword is given"""
     items = [question_to_dict(q) for q in questions]
+    if keyword:
+        for item in items:
+            item["highlight"] = search_service.highlight(item["content"], keyword)
+    return items
+
+
+def _get_questions_by_cursor(
+    db: Session,
+    query,
+    keyword: Optional[str],
+    page_size: int,
+    cursor: Optional[str],
+    include_total: bool,
+    sort_by: str,
+    sort_order: str,
+    facet_counts: Optional[dict] = None
+):
+    """Keyset pagination on (created_at|updated_at, id)"""
+    if sort_by == "relevance":
+        raise ParameterError("游标分页不支持按相关度排序")
     
-    return Response(
-        code=0,
-        message="success",
-        data={
-            "items": items,
-            "total": total,
-            "page": page,
-            "pageSize": pageSize,
-            "totalPages": math.ceil(total / pageSize) if total > 0 else 0
-        }
-    )
+    sort_attr = "updated_at" if sort_by == "updatedAt" else "created_at"
+    sort_column = getattr(Question, sort_attr)
+    descending = sort_order == "desc"
+    
+    total = query.count() if include_total else None
+    
+    if cursor:
+        values = decode_cursor(cursor)
+        if not values or len(values) != 2:
+            raise ParameterError("无效的游标")
+        try:
+            last_value = datetime.fromisoformat(values[0])
+        except (TypeError, ValueError):
+            raise ParameterError("无效的游标")
+        last_id = values[1]
+        
+        bound = _keyset_value(db, last_value)
+        if descending:
+            query = query.filter(or_(
+                sort_column < bound,
+                and_(sort_column == bound, Question.id < last_id)
+            ))
+        else:
+            query = query.filter(or_(
+                sort_column > bound,
+                and_(sort_column == bound, Question.id > last_id)
+            ))
+    
+    if descending:
+        query = query.order_by(sort_column.desc(), Question.id.desc())
+    else:
+        query = query.order_by(sort_column.asc(), Question.id.asc())
+    
+    # 多取一条用于判断是否还有下一页
+    questions = query.limit(page_size + 1).all()
+    has_more = len(questions) > page_size
+    questions = questions[:page_size]
+    
+    next_cursor = None
+    if has_more:
+        last = questions[-1]
+        next_cursor = encode_cursor([getattr(last, sort_attr).isoformat(), last.id])
+    
+    data = {
+        "items": _list_items(questions, keyword),
+        "pageSize": page_size,
+        "nextCursor": next_cursor,
+        "hasMore": has_more,
+        "total": total
+    }
+    if facet_counts is not None:
+        data["facets"] = facet_counts
+    return ok(data)
 
 
 @router.get("/stats", response_model=Response[QuestionStatsResponse])
@@ -135,48 +356,106 @@ async def get_question_stats(
     current_user: dict = Depends(get_current_user)
 ):
     """Get question statistics"""
-    total = db.query(Question).count()
-    
-    # By type
-    by_type = {}
-    for type_name in ["single", "multiple", "judge", "essay"]:
-        count = db.query(Question).filter(Question.type == type_name).count()
-        by_type[type_name] = count
-    
-    # By difficulty
-    by_difficulty = {}
-    for diff in ["easy", "medium", "hard"]:
-        count = db.query(Question).filter(Question.difficulty == diff).count()
-        by_difficulty[diff] = count
-    
-    # By status - 只有 none 状态才算待补全
-    incomplete = db.query(Question).filter(
-        or_(
-            Question.answer_status == "none",
-            Question.explanation_status == "none"
-        )
-    ).count()
-    
-    complete = total - incomplete
+    conn = db.connection()
     
-    by_status = {
-        "complete": complete,
-        "incomplete": incomplete
-    }
+    if settings.QUESTION_COUNTERS_ENABLED:
+        # 读取反范式化计数器（O(1)），尚未建立时以一次分组扫描重建
+        stats = counter_service.read(conn)
+        if stats is None:
+            stats = counter_service.rebuild(conn)
+            db.commit()
+    else:
+        stats = counter_service.aggregate(conn)
     
+    return Response(code=0, message="success", data=stats)
+
+
+@router.get("/tags")
+async def get_question_tags(
+    categoryId: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get tags with question counts (tag cloud)"""
+    filters = [Question.category_id == categoryId] if categoryId else []
+    items = tag_service.counts(db.connection(), filters, limit)
     return Response(
         code=0,
         message="success",
         data={
-            "total": total,
-            "byType": by_type,
-            "byDifficulty": by_difficulty,
-            "byStatus": by_status,
-            "incomplete": incomplete
+            "items": items,
+            "total": len(items)
         }
     )
 
 
+@router.get("/changes")
+async def get_question_changes(
+    since: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Questions created/updated/deleted since a sync token (omit since for the initial full sync)"""
+    result = change_feed.changes(db, since, limit)
+    return ok({
+        "items": [question_to_dict(q) for q in result["questions"]],
+        "deleted": result["deleted"],
+        "nextToken": result["nextToken"],
+        "hasMore": result["hasMore"],
+        "fullResync": result["fullResync"]
+    })
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 是否命中（弱比较）"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in [tag[2:] if tag.startswith("W/") else tag for tag in candidates]
+
+
+@router.get("/bundle")
+def get_question_bundle(
+    categoryId: Optional[str] = None,
+    type: Optional[str] = None,
+    difficulty: Optional[str] = None,
+    includeIncomplete: bool = True,
+    tag: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Answered questions as a gzip-compressed msgpack bundle for client-side caching (ETag)"""
+    filters = _export_filters(categoryId, type, difficulty, includeIncomplete, tag)
+    filters += [Question.answer.isnot(None), Question.answer != ""]
+    
+    # 同一题库版本 + 筛选条件只打包一次（版本和题目在请求会话中读取）
+    bundle = bundle_service.get(
+        (categoryId, type, difficulty, includeIncomplete, tag),
+        lambda: change_feed.bank_version(db),
+        lambda: iter_export_questions(filters, db)
+    )
+    
+    etag = f'"{bundle.etag}"'
+    headers = {
+        # 压缩与未压缩的表示内容相同，使用弱 ETag
+        "ETag": f"W/{etag}",
+        "Cache-Control": "private, no-cache",
+        "Vary": "Accept-Encoding",
+        "X-Question-Count": str(bundle.count)
+    }
+    if _etag_matches(if_none_match, etag):
+        return RawResponse(status_code=304, headers=headers)
+    
+    if accept_encoding and "gzip" in accept_encoding:
+        headers["Content-Encoding"] = "gzip"
+        return RawResponse(bundle.data, media_type="application/x-msgpack", headers=headers)
+    return RawResponse(gzip.decompress(bundle.data), media_type="application/x-msgpack", headers=headers)
+
+
 @router.get("/{question_id}", response_model=Response[QuestionResponse])
 async def get_question(
     question_id: str,
@@ -214,12 +493,12 @@ async def create_question(
         type=question.type,
         difficulty=question.difficulty,
         content=question.content,
-        options=to_json(question.options),
+        options=question.options,
         answer=question.answer,
         answer_status=answer_status,
         explanation=question.explanation,
         explanation_status=explanation_status,
-        tags=to_json(question.tags),
+        tags=question.tags,
         source=question.source
     )
     
@@ -260,7 +539,7 @@ async def update_question(
         db_question.content = question.content
     
     if question.options is not None:
-        db_question.options = to_json(question.options)
+        db_question.options = question.options
     
     if question.answer is not None:
         db_question.answer = question.answer
@@ -273,7 +552,7 @@ async def update_question(
             db_question.explanation_status = "confirmed"
     
     if question.tags is not None:
-        db_question.tags = to_json(question.tags)
+        db_question.tags = question.tags
     
     if question.source is not None:
         db_question.source = question.source
@@ -302,7 +581,7 @@ async def batch_update_category(
 
     # Update questions
     updated_count = db.query(Question).filter(Question.id.in_(request.question_ids)).update(
-        {"category_id": request.category_id or "default"},
+        {"category_id": request.category_id or "default", "change_seq": change_feed.next_seq(db.connection())},
         synchronize_session=False
     )
     db.commit()
@@ -310,6 +589,35 @@ async def batch_update_category(
     return Response(code=0, message=f"成功更新 {updated_count} 道题目的分类", data={"updated": updated_count})
 
 
+BATCH_GET_MAX_IDS = 500
+
+
+@router.post("/batch-get", response_model=Response)
+async def batch_get_questions(
+    request: BatchGetRequest,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get questions by ID list (one IN query, request order preserved)"""
+    # 去重但保留请求顺序
+    ids = list(dict.fromkeys(request.ids))
+    if not ids:
+        raise ParameterError("请提供题目ID")
+    if len(ids) > BATCH_GET_MAX_IDS:
+        raise ParameterError(f"一次最多获取 {BATCH_GET_MAX_IDS} 道题目")
+
+    found = {q.id: q for q in db.query(Question).filter(Question.id.in_(ids)).all()}
+
+    return Response(
+        code=0,
+        message="success",
+        data={
+            "items": [question_to_dict(found[qid]) for qid in ids if qid in found],
+            "missing": [qid for qid in ids if qid not in found]
+        }
+    )
+
+
 @router.post("/batch-delete", response_model=Response)
 async def batch_delete_questions(
     question_ids: list[str],
@@ -320,13 +628,84 @@ async def batch_delete_questions(
     if not question_ids:
         raise ParameterError("请选择要删除的题目")
 
-    # Delete questions
+    # Delete questions (bulk delete bypasses the ORM flush hooks and relationship cascade)
+    question_sync.questions_deleted(db.connection(), question_ids)
+    db.query(WrongQuestion).filter(WrongQuestion.question_id.in_(question_ids)).delete(synchronize_session=False)
     deleted_count = db.query(Question).filter(Question.id.in_(question_ids)).delete(synchronize_session=False)
     db.commit()
 
     return Response(code=0, message=f"成功删除 {deleted_count} 道题目", data={"deleted": deleted_count})
 
 
+@router.post("/bulk", response_model=Response)
+async def bulk_mutate_questions(
+    request: BulkMutationRequest,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Update or delete all questions matching a filter (same filters as the list endpoint)"""
+    filters, matches = question_filters(db, **request.filter.model_dump())
+    if matches is not None:
+        filters.append(Question.id.in_(select(matches.c.question_id)))
+    # 按实际生成的条件判断：没有条件时 and_() 会匹配整个题库
+    if not filters:
+        raise ParameterError("请至少指定一个筛选条件")
+    condition = and_(*filters)
+    
+    values = {}
+    if request.action == "update":
+        update = request.update.model_dump(exclude_none=True) if request.update else {}
+        if not update:
+            raise ParameterError("请指定要修改的字段")
+        if "categoryId" in update:
+            if update["categoryId"] and update["categoryId"] != "default":
+                category = db.query(Category).filter(Category.id == update["categoryId"]).first()
+                if not category:
+                    raise NotFoundError("分类不存在")
+            values["category_id"] = update["categoryId"] or "default"
+        if "difficulty" in update:
+            values["difficulty"] = update["difficulty"]
+    
+    # 匹配的题目 ID 只在服务端用于同步派生数据（计数器、索引），不返回给客户端
+    conn = db.connection()
+    ids = db.execute(select(Question.id).where(condition)).scalars().all()
+    if request.dryRun or not ids:
+        return Response(code=0, message="success", data={"matched": len(ids)})
+    
+    if request.action == "delete":
+        # 先记录墓碑、计算计数器增量；条件可能依赖标签/全文索引表，派生数据在 DELETE 之后清理
+        change_feed.record_deleted(conn, ids)
+        delta = question_sync.removal_delta(conn, ids)
+        wrong_deleted = db.query(WrongQuestion).filter(
+            WrongQuestion.question_id.in_(select(Question.id).where(condition))
+        ).delete(synchronize_session=False)
+        deleted_count = db.query(Question).filter(condition).delete(synchronize_session=False)
+        question_sync.derived_removed(conn, ids)
+        question_sync.counters_changed(conn, delta)
+        db.commit()
+        return Response(
+            code=0,
+            message=f"成功删除 {deleted_count} 道题目",
+            data={"matched": len(ids), "deleted": deleted_count, "wrongQuestionsDeleted": wrong_deleted}
+        )
+    
+    values["change_seq"] = change_feed.next_seq(conn)
+    # 难度参与计数器，按更新前后的键计算增量
+    before = counter_service.keys_for_ids(conn, ids) if "difficulty" in values else None
+    updated_count = db.query(Question).filter(condition).update(values, synchronize_session=False)
+    if before is not None:
+        delta = counter_service.keys_for_ids(conn, ids)
+        delta.subtract(before)
+        question_sync.counters_changed(conn, delta)
+    db.commit()
+    
+    return Response(
+        code=0,
+        message=f"成功更新 {updated_count} 道题目",
+        data={"matched": len(ids), "updated": updated_count}
+    )
+
+
 @router.delete("/{question_id}", response_model=Response)
 async def delete_question(
     question_id: str,
@@ -382,69 +761,122 @@ async def confirm_explanation(
     return Response(code=0, message="确认成功", data=question_to_dict(db_question))
 
 
-@router.get("/export/json")
-async def export_questions_json(
+EXPORT_BATCH_SIZE = 500
+
+def _export_filters(
     categoryId: Optional[str] = None,
     type: Optional[str] = None,
     difficulty: Optional[str] = None,
     includeIncomplete: bool = True,
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
-):
-    """Export questions as JSON"""
-    query = db.query(Question)
+    tag: Optional[str] = None
+) -> list:
+    """Build export filter conditions"""
+    filters = []
     
-    # Apply filters
     if categoryId:
-        query = query.filter(Question.category_id == categoryId)
+        filters.append(Question.category_id == categoryId)
     
     if type:
-        query = query.filter(Question.type == type)
+        filters.append(Question.type == type)
     
     if difficulty:
-        query = query.filter(Question.difficulty == difficulty)
+        filters.append(Question.difficulty == difficulty)
+    
+    if tag:
+        filters.append(tag_service.tag_filter([tag]))
     
     if not includeIncomplete:
-        query = query.filter(
+        filters.append(
             and_(
                 Question.answer_status == "confirmed",
                 Question.explanation_status == "confirmed"
             )
         )
     
-    questions = query.all()
+    return filters
+
+
+def iter_export_questions(filters: list, db: Optional[Session] = None):
+    """
+    Yield export dicts one by one using a server-side cursor
+
+    Without db a separate session is used (streamed responses outlive the request session)
+    """
+    stmt = select(
+        Question.id, Question.type, Question.difficulty, Question.content,
+        Question.options, Question.answer, Question.explanation,
+        Question.tags, Question.source
+    ).where(*filters).order_by(Question.created_at, Question.id)
     
-    # Convert to export format
-    export_data = {
-        "exportTime": datetime.now().isoformat(),
-        "totalCount": len(questions),
-        "questions": [
-            {
+    own_session = db is None
+    if own_session:
+        db = SessionLocal()
+    try:
+        result = db.execute(stmt, execution_options={"yield_per": EXPORT_BATCH_SIZE})
+        for q in result:
+            yield {
                 "id": q.id,
                 "type": q.type,
                 "difficulty": q.difficulty,
                 "content": q.content,
-                "options": from_json(q.options, {}),
+                "options": q.options or {},
                 "answer": q.answer,
                 "explanation": q.explanation,
-                "tags": from_json(q.tags, []),
+                "tags": q.tags or [],
                 "source": q.source
             }
-            for q in questions
-        ]
-    }
+    finally:
+        if own_session:
+            db.close()
+
+
+def _stream_json(filters: list):
+    """Write the export document incrementally: header, questions array, then totalCount"""
+    yield '{"exportTime": %s, "questions": [' % json.dumps(datetime.now().isoformat())
     
-    # Create JSON file
-    json_str = json.dumps(export_data, ensure_ascii=False, indent=2)
-    json_bytes = json_str.encode('utf-8')
+    count = 0
+    for item in iter_export_questions(filters):
+        prefix = ",\n  " if count else "\n  "
+        yield prefix + json.dumps(item, ensure_ascii=False)
+        count += 1
+    
+    yield '\n], "totalCount": %d}\n' % count
+
+
+def _stream_ndjson(filters: list):
+    """One question per line"""
+    for item in iter_export_questions(filters):
+        yield json.dumps(item, ensure_ascii=False) + "\n"
+
+
+@router.get("/export/json")
+async def export_questions_json(
+    categoryId: Optional[str] = None,
+    type: Optional[str] = None,
+    difficulty: Optional[str] = None,
+    includeIncomplete: bool = True,
+    tag: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Export questions as streamed JSON or NDJSON"""
+    filters = _export_filters(categoryId, type, difficulty, includeIncomplete, tag)
     
     # Create filename
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"questions_{timestamp}.json"
+    
+    if format == "ndjson":
+        body = _stream_ndjson(filters)
+        media_type = "application/x-ndjson"
+        filename = f"questions_{timestamp}.ndjson"
+    else:
+        body = _stream_json(filters)
+        media_type = "application/json"
+        filename = f"questions_{timestamp}.json"
     
     return StreamingResponse(
-        io.BytesIO(json_bytes),
-        media_type="application/json",
+        (chunk.encode("utf-8") for chunk in body),
+        media_type=media_type,
         headers={
             "Content-Disposition": f"attachment; filename={filename}"
         }
@@ -454,298 +886,277 @@ async def export_questions_json(
 @router.post("/import/preview")
 async def preview_import(
     file: UploadFile = File(...),
+    page: int = Query(1, ge=1),
+    pageSize: int = Query(50, ge=1, le=500),
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
-    """Preview imported questions"""
+    """Preview imported questions (stored server-side as an import session)"""
     # Check file type
     filename = file.filename.lower()
-    if not any(filename.endswith(ext) for ext in ['.docx', '.xlsx', '.txt', '.json']):
+    if not any(filename.endswith(ext) for ext in SUPPORTED_EXTENSIONS):
         raise ParameterError("不支持的文件格式，仅支持 .docx, .xlsx, .txt, .json")
     
-    # Read file content
-    content = await file.read()
-    
-    # Parse document
-    parser = get_document_parser()
+    # Spool the upload to a temp file in chunks (size-capped)
+    upload = await spool_upload(file, settings.IMPORT_MAX_UPLOAD_MB, suffix=os.path.splitext(filename)[1])
     
     try:
-        if filename.endswith('.docx'):
-            parsed_questions = parser.parse_word(content)
-        elif filename.endswith('.xlsx'):
-            parsed_questions = parser.parse_excel(content)
-        elif filename.endswith('.txt'):
-            parsed_questions = parser.parse_txt(content)
-        elif filename.endswith('.json'):
-            # Parse JSON format
-            data = json.loads(content.decode('utf-8'))
-            parsed_questions = []
-            for idx, q in enumerate(data.get('questions', []), 1):
-                from services.document_parser import ParsedQuestion
-                parsed_questions.append(ParsedQuestion(
-                    index=idx,
-                    type=q.get('type', 'unknown'),
-                    content=q.get('content', ''),
-                    options=q.get('options'),
-                    answer=q.get('answer'),
-                    explanation=q.get('explanation'),
-                    difficulty=q.get('difficulty', 'medium'),
-                    tags=q.get('tags', []),
-                    source=q.get('source')
-                ))
-        else:
-            raise ParameterError("不支持的文件格式")
-        
-    # Calculate statistics
-        # Check for duplicates (Advanced Strategy)
-        import re
-        from difflib import SequenceMatcher
-        
-        def normalize_text(text):
-            """Remove punctuation and whitespace, keep chars only"""
-            if not text: return ""
-            # Keep only Chinese, letters, numbers
-            return re.sub(r'[^\w\u4e00-\u9fff]', '', text).lower()
-
-        def is_similar(a, b, threshold=0.95):
-            """Check if two strings are similar"""
-            return SequenceMatcher(None, a, b).ratio() > threshold
-
-        # 1. Fetch all existing question contents for comparison
-        # Note: Optimization needed for very large datasets (e.g. vector search or elasticsearch)
-        # For now, fetching all contents is acceptable for typical usage (<50k questions)
-        all_existing_questions = db.query(Question.id, Question.content).all()
-
-        # Build lookup maps
-        # Exact map (normalized) -> list of IDs (to handle potential multiple identicals)
-        norm_map = {}
-        for qid, content in all_existing_questions:
-            if not content: continue
-            norm = normalize_text(content)
-            if norm not in norm_map:
-                norm_map[norm] = []
-            norm_map[norm].append(qid)
-
-        # Mark duplicates
-        for q in parsed_questions:
-            if not q.content: continue
-
-            q_norm = normalize_text(q.content)
-            is_dup = False
-            dup_reason = ""
-
-            # Strategy 1: Normalized Exact Match (Fast, catches punctuation/spacing diffs)
-            if q_norm in norm_map:
-                is_dup = True
-                dup_reason = "内容完全相同（忽略标点）"
-
-            # Strategy 2: Fuzzy Match (Slow, catches OCR typos)
-            # Only apply fuzzy matching for longer texts (>20 chars after normalization)
-            # to avoid false positives with short questions
-            if not is_dup and len(q_norm) > 20:
-                # We iterate to find a similar one.
-                # Optimization: Limit comparison to same 'type' if we had that info indexed,
-                # but currently we compare against all.
-                # To be faster, we could check length proximity first.
-                for existing_norm in norm_map.keys():
-                    if abs(len(q_norm) - len(existing_norm)) > 10: continue # Length heuristic
-
-                    if is_similar(q_norm, existing_norm, threshold=0.95):
-                        is_dup = True
-                        dup_reason = "内容高度相似（疑似OCR误差）"
-                        break
-            
-            if is_dup:
-                q.parse_message = f"系统已存在相似题目: {dup_reason}"
-                q.parse_status = "warning"
-                setattr(q, 'is_duplicate', True)
-            else:
-                 setattr(q, 'is_duplicate', False)
-
-        stats = {
-            "total": len(parsed_questions),
-            "success": sum(1 for q in parsed_questions if q.parse_status == "success"),
-            "warning": sum(1 for q in parsed_questions if q.parse_status == "warning"),
-            "duplicate": sum(1 for q in parsed_questions if getattr(q, 'is_duplicate', False)),
-            "complete": sum(1 for q in parsed_questions if q.answer and str(q.answer).strip() and q.explanation and str(q.explanation).strip()),
-            "hasAnswer": sum(1 for q in parsed_questions if q.answer and str(q.answer).strip()),
-            "onlyContent": sum(1 for q in parsed_questions if (not q.answer or not str(q.answer).strip()) and (not q.explanation or not str(q.explanation).strip())),
-            "byType": {}
-        }
-        
-        # Count by type
-        for q in parsed_questions:
-            stats["byType"][q.type] = stats["byType"].get(q.type, 0) + 1
-        
-        # Convert to dict and add isDuplicate flag
-        questions_data = []
-        for q in parsed_questions:
-            d = q.to_dict()
-            d['isDuplicate'] = getattr(q, 'is_duplicate', False)
-            questions_data.append(d)
-
-        return Response(
-            code=0,
-            message="success",
-            data={
-                "questions": questions_data,
-                "statistics": stats
-            }
-        )
-    
+        # Parse + dedup once; re-uploading the same file reuses the session
+        session, cached = import_service.create_session(db, filename, upload.path, upload.sha256)
+    except ParameterError:
+        raise
     except Exception as e:
         raise ParameterError(str(e))
+    finally:
+        remove_file(upload.path)
+
+    data = import_service.session_page(db, session, page, pageSize)
+    data["cached"] = cached
+    return Response(code=0, message="success", data=data)
+
+
+@router.post("/import/preview/stream")
+async def stream_import_preview(
+    file: UploadFile = File(...),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Preview imported questions as NDJSON while the file is parsed
+
+    One {"question": {...}} line per question, then {"summary": {token, statistics, total, cached}};
+    a failure mid-stream ends with {"error": "..."} and no session is kept.
+    The session is committed batch by batch, so no transaction stays open while the client reads.
+    """
+    filename = file.filename.lower()
+    if not any(filename.endswith(ext) for ext in SUPPORTED_EXTENSIONS):
+        raise ParameterError("不支持的文件格式，仅支持 .docx, .xlsx, .txt, .json")
+
+    upload = await spool_upload(file, settings.IMPORT_MAX_UPLOAD_MB, suffix=os.path.splitext(filename)[1])
+
+    def lines():
+        # 独立会话：响应流式发送期间请求依赖中的会话可能已关闭
+        db = SessionLocal()
+        try:
+            for entry in import_service.stream_session(db, filename, upload.path, upload.sha256):
+                yield json.dumps(entry, ensure_ascii=False) + "\n"
+        except Exception as e:
+            db.rollback()
+            yield json.dumps({"error": str(e)}, ensure_ascii=False) + "\n"
+        finally:
+            db.close()
+
+    # 响应结束（包括客户端提前断开）后删除上传的临时文件
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(remove_file, upload.path)
+    )
+
+
+@router.get("/import/preview/{token}")
+async def get_import_preview(
+    token: str,
+    page: int = Query(1, ge=1),
+    pageSize: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get a page of a stored import preview"""
+    session = import_service.get_session(db, token)
+    return Response(
+        code=0,
+        message="success",
+        data=import_service.session_page(db, session, page, pageSize)
+    )
 
 
 @router.post("/import")
 async def import_questions(
-    questions: List[dict],
+    payload: Union[ImportSessionRequest, List[dict]] = Body(...),
     categoryId: Optional[str] = None,
     defaultType: str = "single",
     defaultDifficulty: str = "medium",
     skipErrors: bool = True,
     skipDuplicates: bool = True,
+    mode: str = Query("insert", pattern="^(insert|upsert)$"),
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
-    """Import questions"""
-    if not questions:
-        raise ParameterError("没有要导入的题目")
-    
-    # Check for duplicates using advanced strategy if requested
-    import re
-    from difflib import SequenceMatcher
+    """
+    Import questions
+
+    Body is either an import session ({token, excludedIndices, categoryOverrides})
+    from /import/preview, or the question list itself.
+    mode=upsert updates existing questions matched by id (or content hash when a
+    row has no id) instead of skipping them as duplicates.
+    """
+    if isinstance(payload, ImportSessionRequest):
+        session = import_service.get_session(db, payload.token)
+        category_ids = set(payload.categoryOverrides.values())
+    else:
+        if not payload:
+            raise ParameterError("没有要导入的题目")
+        category_ids = {q.get('categoryId') for q in payload if q.get('categoryId')}
     
-    def normalize_text(text):
-        if not text: return ""
-        return re.sub(r'[^\w\u4e00-\u9fff]', '', text).lower()
-        
-    def is_similar(a, b, threshold=0.9):
-        return SequenceMatcher(None, a, b).ratio() > threshold
+    # Validate category
+    if categoryId:
+        category_ids.add(categoryId)
+    else:
+        categoryId = "default"
+    if category_ids:
+        found = db.query(Category.id).filter(Category.id.in_(category_ids)).count()
+        if found != len(category_ids):
+            raise ParameterError("分类不存在")
 
-    # Pre-fetch all existing question contents for duplicate check
-    existing_norms = []
-    if skipDuplicates:
-        all_existing_questions = db.query(Question.content).all()
-        existing_norms = [normalize_text(q.content) for q in all_existing_questions if q.content]
+    options = dict(
+        category_id=categoryId,
+        default_type=defaultType,
+        default_difficulty=defaultDifficulty,
+        skip_errors=skipErrors,
+        skip_duplicates=skipDuplicates,
+        upsert=mode == "upsert"
+    )
+    if isinstance(payload, ImportSessionRequest):
+        result = import_service.import_session(
+            db, session,
+            excluded_indices=payload.excludedIndices,
+            category_overrides=payload.categoryOverrides,
+            **options
+        )
+    else:
+        result = ImportService(db).import_questions(payload, **options)
+    db.commit()
+
+    return Response(code=0, message="导入完成", data=result)
+
+
+# ============ Background import jobs ============
+
+IMPORT_JOB_POLL_INTERVAL = 0.5
+
+
+@router.post("/import/jobs")
+async def create_import_job(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    categoryId: Optional[str] = None,
+    defaultType: str = "single",
+    defaultDifficulty: str = "medium",
+    skipDuplicates: bool = True,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Upload a file and import it in the background"""
+    filename = file.filename.lower()
+    if not any(filename.endswith(ext) for ext in SUPPORTED_EXTENSIONS):
+        raise ParameterError("不支持的文件格式，仅支持 .docx, .xlsx, .txt, .json")
 
-    # Validate category
     if categoryId:
         category = db.query(Category).filter(Category.id == categoryId).first()
         if not category:
             raise ParameterError("分类不存在")
-    else:
-        categoryId = "default"
 
-    created = []
-    errors = []
-    skipped = []
-    batch_norms = []  # Track normalized content in current batch to prevent self-duplication
+    path = (await spool_upload(file, settings.IMPORT_MAX_UPLOAD_MB, suffix=os.path.splitext(filename)[1])).path
 
-    for idx, q_data in enumerate(questions, 1):
-        try:
-            # Validate required fields
-            content = q_data.get('content')
-            if not content:
-                if skipErrors:
-                    errors.append({"line": idx, "message": "题目内容为空"})
-                    continue
-                else:
-                    raise ParameterError(f"第 {idx} 题：题目内容为空")
-
-            # Check for duplicate
-            if skipDuplicates:
-                q_norm = normalize_text(content)
-                is_dup = False
-
-                # Check against existing database questions (exact match)
-                if q_norm in existing_norms:
-                   is_dup = True
-
-                # Check against existing database questions (fuzzy match)
-                # Only apply fuzzy matching for longer texts (>20 chars after normalization)
-                # to avoid false positives with short questions
-                if not is_dup and len(q_norm) > 20:
-                     for existing_norm in existing_norms:
-                        # Skip if length difference is too large
-                        if abs(len(q_norm) - len(existing_norm)) > 10: continue
-                        # Use higher threshold (0.95) for more strict matching
-                        if SequenceMatcher(None, q_norm, existing_norm).ratio() > 0.95:
-                            is_dup = True
-                            break
-
-                # Check against current batch to prevent self-duplication
-                if not is_dup and q_norm in batch_norms:
-                    is_dup = True
-
-                if is_dup:
-                    skipped.append({"line": idx, "message": "题目已存在或高度相似，跳过导入"})
-                    continue
-
-            # Determine status & Clean data
-            answer = q_data.get('answer')
-            if answer and str(answer).strip():
-                answer_status = "confirmed"
-                answer = str(answer).strip()
-            else:
-                answer_status = "none"
-                answer = None
-
-            explanation = q_data.get('explanation')
-            if explanation and str(explanation).strip():
-                explanation_status = "confirmed"
-                explanation = str(explanation).strip()
-            else:
-                explanation_status = "none"
-                explanation = None
-
-            # Create question
-            question = Question(
-                category_id=categoryId,
-                type=q_data.get('type', defaultType),
-                difficulty=q_data.get('difficulty', defaultDifficulty),
-                content=content,
-                options=to_json(q_data.get('options')),
-                answer=answer,
-                answer_status=answer_status,
-                explanation=explanation,
-                explanation_status=explanation_status,
-                tags=to_json(q_data.get('tags', [])),
-                source=q_data.get('source')
-            )
+    job = import_service.create_job(db, filename, {
+        "categoryId": categoryId,
+        "defaultType": defaultType,
+        "defaultDifficulty": defaultDifficulty,
+        "skipDuplicates": skipDuplicates
+    })
 
-            db.add(question)
-            db.flush()
+    # Sync function: runs in the threadpool after the response is sent
+    background_tasks.add_task(import_service.run_job, job.id, path)
 
-            created.append({
-                "id": question.id,
-                "content": question.content[:50] + "..." if len(question.content) > 50 else question.content
-            })
+    return Response(
+        code=0,
+        message="任务已创建",
+        data=import_service.job_to_dict(job)
+    )
+
+
+def _get_import_job(db: Session, job_id: str) -> ImportJob:
+    job = db.query(ImportJob).filter(ImportJob.id == job_id).first()
+    if not job:
+        raise NotFoundError("导入任务不存在")
+    return job
+
+
+@router.get("/import/jobs/{job_id}")
+async def get_import_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get import job progress"""
+    job = _get_import_job(db, job_id)
+    return Response(code=0, message="success", data=import_service.job_to_dict(job))
+
+
+@router.get("/import/jobs/{job_id}/items", response_model=Response[PageResponse])
+async def get_import_job_items(
+    job_id: str,
+    page: int = Query(1, ge=1),
+    pageSize: int = Query(50, ge=1, le=500),
+    status: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get per-question results of an import job (paginated)"""
+    _get_import_job(db, job_id)
+
+    query = db.query(ImportJobItem).filter(ImportJobItem.job_id == job_id)
+    if status:
+        query = query.filter(ImportJobItem.status == status)
+
+    total = query.count()
+    items = query.order_by(ImportJobItem.line).offset((page - 1) * pageSize).limit(pageSize).all()
 
-            # Add to batch cache to prevent self-duplication within same batch
-            if skipDuplicates:
-                batch_norms.append(normalize_text(content))
-        
-        except Exception as e:
-            if skipErrors:
-                errors.append({"line": idx, "message": str(e)})
-            else:
-                db.rollback()
-                raise ParameterError(f"第 {idx} 题导入失败: {str(e)}")
-    
-    db.commit()
-    
     return Response(
         code=0,
-        message="导入完成",
+        message="success",
         data={
-            "total": len(questions),
-            "success": len(created),
-            "failed": len(errors),
-            "skipped": len(skipped),
-            "created": created[:10],  # Return first 10
-            "importedIds": [c["id"] for c in created],  # 所有导入成功的题目ID
-            "errors": errors,
-            "skippedDetails": skipped
+            "items": [import_service.job_item_to_dict(item) for item in items],
+            "total": total,
+            "page": page,
+            "pageSize": pageSize,
+            "totalPages": math.ceil(total / pageSize) if total > 0 else 0
         }
     )
+
+
+@router.get("/import/jobs/{job_id}/events")
+async def stream_import_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Subscribe to import job progress (Server-Sent Events)"""
+    _get_import_job(db, job_id)
+
+    async def events():
+        last = None
+        while True:
+            session = SessionLocal()
+            try:
+                job = session.query(ImportJob).filter(ImportJob.id == job_id).first()
+                data = import_service.job_to_dict(job) if job else None
+            finally:
+                session.close()
+
+            if data is None:
+                break
+            payload = json.dumps(data, ensure_ascii=False)
+            if payload != last:
+                yield f"data: {payload}\n\n"
+                last = payload
+            if data["status"] in import_service.JOB_TERMINAL_STATUSES:
+                break
+            await asyncio.sleep(IMPORT_JOB_POLL_INTERVAL)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -13,6 +13,8 @@ from datetime import datetime
 from models.database import get_db, get_settings, update_settings
 from services.ai_service import AIService, AIConfig
 from api.auth import get_current_user
+from config import settings as app_settings
+from utils.upload import spool_upload, remove_file
 
 router = APIRouter(prefix="/api/settings", tags=["settings"])
 
@@ -215,17 +217,14 @@ async def restore_backup(
     current_user: dict = Depends(get_current_user)
 ):
     """恢复备份"""
+    temp_path = None
     try:
         # 验证文件类型
         if not file.filename.endswith(".db"):
             raise HTTPException(status_code=400, detail="只支持 .db 文件")
         
-        # 保存上传的文件到临时位置
-        temp_path = f"temp_restore_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
-        
-        with open(temp_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        # 分块保存上传的文件到临时位置
+        temp_path = (await spool_upload(file, app_settings.RESTORE_MAX_UPLOAD_MB, suffix=".db")).path
         
         # 备份当前数据库
         db_path = "data/learning_system.db"
@@ -246,8 +245,7 @@ async def restore_backup(
         }
     except Exception as e:
         # 清理临时文件
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+        remove_file(temp_path)
         raise HTTPException(status_code=500, detail=f"恢复失败: {str(e)}")
 
 
@@ -7,7 +7,6 @@ from sqlalchemy import func, and_
 from pydantic import BaseModel
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
-import json
 
 from models.database import get_db
 from models.exam import Exam, WrongQuestion
@@ -127,8 +126,9 @@ def get_daily_stats(
     exams = db.query(Exam).filter(
         and_(
             Exam.status == "completed",
-            func.date(Exam.submit_time) >= start_date,
-            func.date(Exam.submit_time) <= end_date
+            # 半开区间比较原始列，可走 (status, submit_time) 索引
+            Exam.submit_time >= datetime.combine(start_date, datetime.min.time()),
+            Exam.submit_time < datetime.combine(end_date + timedelta(days=1), datetime.min.time())
         )
     ).all()
     
@@ -201,8 +201,8 @@ def get_category_stats(
         if not exam.question_ids or not exam.answers:
             continue
         
-        question_ids = json.loads(exam.question_ids)
-        answers = json.loads(exam.answers)
+        question_ids = exam.question_ids
+        answers = exam.answers
         
         # 获取题目信息
         questions = db.query(Question).filter(Question.id.in_(question_ids)).all()
@@ -11,6 +11,8 @@ from models.database import get_db
 from models.exam import WrongQuestion
 from models.question import Question
 from api.auth import get_current_user
+from utils.responses import trusted_response
+from utils.helpers import to_json
 
 router = APIRouter(prefix="/api/wrong-questions", tags=["wrong-questions"])
 
@@ -35,30 +37,17 @@ class WrongQuestionResponse(BaseModel):
         from_attributes = True
 
 
-# ============ API Endpoints ============
-
-@router.get("", response_model=List[WrongQuestionResponse])
-def list_wrong_questions(
-    mastered: Optional[int] = None,
-    skip: int = 0,
-    limit: int = 50,
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
-):
-    """获取错题列表"""
-    query = db.query(WrongQuestion)
-    
-    if mastered is not None:
-        query = query.filter(WrongQuestion.mastered == mastered)
-    
-    wrong_questions = query.order_by(
-        WrongQuestion.last_wrong_time.desc()
-    ).offset(skip).limit(limit).all()
+def wrong_questions_to_dicts(db: Session, wrong_questions: List[WrongQuestion]) -> List[dict]:
+    """错题记录转为响应数据（含关联题目信息）"""
+    # 一次 IN 查询加载关联题目，避免逐条查询
+    question_ids = {wq.question_id for wq in wrong_questions}
+    questions = {
+        q.id: q for q in db.query(Question).filter(Question.id.in_(question_ids)).all()
+    } if question_ids else {}
     
-    # 加载题目信息
     result = []
     for wq in wrong_questions:
-        question = db.query(Question).filter(Question.id == wq.question_id).first()
+        question = questions.get(wq.question_id)
         wq_dict = {
             "id": wq.id,
             "question_id": wq.question_id,
@@ -74,7 +63,7 @@ def list_wrong_questions(
                 "type": question.type,
                 "difficulty": question.difficulty,
                 "content": question.content,
-                "options": question.options,
+                "options": to_json(question.options),
                 "answer": question.answer,
                 "explanation": question.explanation
             } if question else None
@@ -84,6 +73,29 @@ def list_wrong_questions(
     return result
 
 
+# ============ API Endpoints ============
+
+@router.get("", response_model=List[WrongQuestionResponse])
+def list_wrong_questions(
+    mastered: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 50,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """获取错题列表"""
+    query = db.query(WrongQuestion)
+    
+    if mastered is not None:
+        query = query.filter(WrongQuestion.mastered == mastered)
+    
+    wrong_questions = query.order_by(
+        WrongQuestion.last_wrong_time.desc()
+    ).offset(skip).limit(limit).all()
+    
+    return trusted_response(wrong_questions_to_dicts(db, wrong_questions))
+
+
 @router.get("/{wrong_question_id}", response_model=WrongQuestionResponse)
 def get_wrong_question(
     wrong_question_id: str,
@@ -113,7 +125,7 @@ def get_wrong_question(
             "type": question.type,
             "difficulty": question.difficulty,
             "content": question.content,
-            "options": question.options,
+            "options": to_json(question.options),
             "answer": question.answer,
             "explanation": question.explanation
         } if question else None
@@ -0,0 +1,89 @@
+"""
+导入性能对比：逐行 ORM add/flush vs 批量写入（ImportService）
+
+两边维护同样的派生数据：orm 每题 add + flush，每次 flush 触发 question_sync 的钩子
+（检索索引、查重 LSH 分桶、标签、统计计数器）；bulk 为 ImportService 的批量写入，
+写入后显式同步同样的数据（不查重，见 skip_duplicates=False）。题目格式与解析器产出的一致，
+选项为 {"A": ..., "B": ...}。
+
+用法（使用 .env / 环境变量中的 DATABASE_URL，结束时回滚，不会保留数据）：
+    python bench_import.py [题目数量]
+
+PostgreSQL 上回滚留下的死元组会拖慢后运行的一方，每项开始前先 VACUUM ANALYZE 相关表。
+"""
+import sys
+import time
+
+from sqlalchemy import text
+
+from models.database import SessionLocal, engine, init_db
+from models.question import Question
+from services.import_service import ImportService
+
+
+def make_questions(n, tag):
+    return [
+        {
+            "content": f"[{tag}] 第{i}题：下列关于数据库索引的描述中，哪一项是正确的？编号{i * 7919}",
+            "options": {k: f"选项{k}{i}" for k in "ABCD"},
+            "answer": "A",
+            "explanation": "解析内容" if i % 2 else None
+        }
+        for i in range(n)
+    ]
+
+
+def orm_import(db, questions):
+    """逐题 add + flush（包括 flush 钩子中的派生数据同步）"""
+    for q_data in questions:
+        db.add(Question(
+            category_id="default",
+            type="single",
+            difficulty="medium",
+            content=q_data["content"],
+            options=q_data["options"],
+            answer=q_data["answer"],
+            answer_status="confirmed",
+            explanation=q_data["explanation"],
+            explanation_status="confirmed" if q_data["explanation"] else "none",
+            tags=[]
+        ))
+        db.flush()
+
+
+def bulk_import(db, questions):
+    """批量写入 + 显式派生数据同步"""
+    ImportService(db).import_questions(questions, skip_duplicates=False)
+
+
+# 题目及写入时同步的派生表
+VACUUM_TABLES = ["questions", "question_search", "question_lsh_buckets", "question_tags", "question_counters"]
+
+
+def vacuum():
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table in VACUUM_TABLES:
+            conn.execute(text(f"VACUUM ANALYZE {table}"))
+
+
+def run(name, fn, n):
+    vacuum()
+    db = SessionLocal()
+    try:
+        questions = make_questions(n, name)
+        start = time.perf_counter()
+        fn(db, questions)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<6} {n} 题  {elapsed:.2f}s  {n / elapsed:.0f} 题/秒")
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    init_db()
+    run("orm", orm_import, count)
+    run("bulk", bulk_import, count)
@@ -0,0 +1,147 @@
+"""
+文本题库解析耗时（DocumentParser._parse_lines 顺序解析 / parse_lines 自动并行）
+
+生成约 N 行的混合格式题库文本（编号/选项/答案/解析的多种写法、判断题独立答案行、题型标签、
+续行题干），输出解析耗时和每秒行数。不连接数据库。
+并行解析的阈值和进程数见 PARSER_PARALLEL_MIN_LINES / PARSER_WORKERS。
+另外生成 N / 10 行的 Excel 题库，检查 <dimension> 与实际数据不符（如只记录 A1）时解析结果不变。
+用法：
+    python bench_parser.py [行数] [重复次数]
+"""
+import io
+import random
+import re
+import sys
+import time
+import zipfile
+
+from openpyxl import Workbook
+
+from services.document_parser import get_document_parser
+
+NUMBER_STYLES = ["{n}.", "{n}、", "（{n}）", "第{n}题 ", "题目{n}：", "Question {n}: ", "[{n}] "]
+ANSWER_STYLES = ["答案：{a}", "【参考答案】：{a}", "(答案) {a}", "Answer: {a}", "正确答案:{a}", "答案{a}"]
+EXPLANATION_STYLES = ["解析：{e}", "【解析】{e}", "（答案解析）{e}", "详解: {e}", "【解答】{e}"]
+STEMS = [
+    "从交易性管理到方向性战略管理，这是人力资源管理（）的转变",
+    "一般而言，竞争策略为（）的企业中，员工归属感很高",
+    "下列关于数据库索引的描述中，哪一项是正确的",
+    "The cache hit ratio of a database buffer pool depends on ( )",
+    "以下哪些属于常见的排序算法",
+]
+OPTION_WORDS = ["组织性质", "管理职能", "管理角色", "管理模式", "B+ tree", "hash index", "快速排序", "归并排序"]
+
+
+def corpus(lines: int, seed: int = 42) -> list:
+    """生成混合格式的题库文本行"""
+    rng = random.Random(seed)
+    out = []
+    n = 0
+    while len(out) < lines:
+        if n % 50 == 0:
+            out.append(rng.choice(["一、单选题", "二、多选题（每题2分）", "判断题：", "第三部分"]))
+        n += 1
+        out.append(rng.choice(NUMBER_STYLES).format(n=n) + rng.choice(STEMS))
+        if rng.random() < 0.2:
+            out.append("（续）" + rng.choice(STEMS))
+
+        kind = rng.random()
+        if kind < 0.15:
+            # 判断题：两行独立的对/错选项 + 答案，或只有一行答案
+            if rng.random() < 0.5:
+                out += ["正确", "错误", rng.choice(ANSWER_STYLES).format(a=rng.choice("AB"))]
+            else:
+                out.append(rng.choice(["√", "×", "对", "错", "T", "F"]))
+        else:
+            keys = "ABCD" if rng.random() < 0.8 else "ABCDE"
+            if rng.random() < 0.3:
+                out.append("  ".join(f"{k}.{rng.choice(OPTION_WORDS)}" for k in keys))
+            else:
+                sep = rng.choice([".", "．", "、", "）", ":"])
+                out += [f"{k}{sep}{rng.choice(OPTION_WORDS)}" for k in keys]
+            answer = "".join(sorted(rng.sample(keys, rng.choice([1, 1, 2, 3]))))
+            out.append(rng.choice(ANSWER_STYLES).format(a=answer))
+
+        if rng.random() < 0.6:
+            out.append(rng.choice(EXPLANATION_STYLES).format(e=rng.choice(STEMS)))
+        if rng.random() < 0.1:
+            out.append("")
+    return out[:lines]
+
+
+def workbook(rows: int, seed: int = 42) -> bytes:
+    """生成 Excel 题库（首行表头，夹杂空行和缺失的列）"""
+    rng = random.Random(seed)
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["题目", "题型", "难度", "A", "B", "C", "D", "答案", "解析"])
+    for i in range(rows):
+        if i % 97 == 5:
+            ws.append([])
+            continue
+        row = [rng.choice(STEMS), rng.choice(["单选", "多选", "判断", None]), rng.choice(["简单", "困难", None])]
+        row += [rng.choice(OPTION_WORDS) for _ in range(4)]
+        row += [rng.choice(["A", "AB", "正确", None]), rng.choice(STEMS + [None])]
+        ws.append(row[:9 if i % 7 else 7])
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def stale_dimension(data: bytes) -> bytes:
+    """把各工作表记录的 <dimension> 改为 A1（部分导出工具的写法）"""
+    src = zipfile.ZipFile(io.BytesIO(data))
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as dst:
+        for info in src.infolist():
+            body = src.read(info.filename)
+            if info.filename.startswith("xl/worksheets/"):
+                body = re.sub(rb'<dimension ref="[^"]*"/>', b'<dimension ref="A1"/>', body)
+            dst.writestr(info, body)
+    return out.getvalue()
+
+
+def measure(name, fn, text, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        questions = fn(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{name:<6} {len(text)} 行 -> {len(questions)} 题  {best * 1000:.1f} ms  {len(text) / best:,.0f} 行/秒")
+    return questions
+
+
+def run(lines: int, repeat: int):
+    parser = get_document_parser()
+    text = corpus(lines)
+    sequential = measure("顺序", parser._parse_lines, text, repeat)
+    # 首次调用包含进程池启动
+    parser.parse_lines(text)
+    automatic = measure("自动", parser.parse_lines, text, repeat)
+    if [q.to_dict() for q in automatic] != [q.to_dict() for q in sequential]:
+        print("并行解析结果与顺序解析不一致")
+        sys.exit(1)
+
+
+def run_excel(rows: int, repeat: int):
+    parser = get_document_parser()
+    data = workbook(rows)
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        questions = parser.parse_excel(data)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"Excel  {rows} 行 -> {len(questions)} 题  {best * 1000:.1f} ms  {rows / best:,.0f} 行/秒")
+    stale = parser.parse_excel(stale_dimension(data))
+    if [q.to_dict() for q in stale] != [q.to_dict() for q in questions]:
+        print(f"<dimension> 不符时解析结果不一致（{len(stale)} / {len(questions)} 题）")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    times = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    run(n, times)
+    run_excel(max(n // 10, 1), times)
@@ -0,0 +1,127 @@
+"""
+列表接口序列化开销对比：response_model 校验 + jsonable_encoder + json vs trusted_response（orjson 直出）
+
+覆盖 get_questions / list_exams / list_wrong_questions 三个列表接口的返回数据，输出每项耗时。
+用法（使用 .env / 环境变量中的 DATABASE_URL，结束时回滚，不会保留数据）：
+    python bench_serialize.py [每页条数] [重复次数]
+"""
+import json
+import sys
+import time
+import uuid
+from datetime import datetime
+from typing import List, Union
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from models.database import SessionLocal, init_db
+from models.question import Question
+from models.exam import Exam, WrongQuestion
+from schemas.common import Response, PageResponse, CursorPageResponse
+from services.import_service import ImportService
+from api.questions import question_to_dict
+from api.exams import ExamResponse, EXAM_LIST_FIELDS
+from api.wrong_questions import WrongQuestionResponse, wrong_questions_to_dicts
+from utils.responses import ok, trusted_response, rows_to_dicts
+
+
+def seed(db, n):
+    """写入 n 道题目（选项与解析器产出的格式一致：{"A": ...}）、n 场考试和 n 条错题"""
+    ImportService(db).import_questions([
+        {
+            "content": f"[bench] 第{i}题：下列关于数据库索引的描述中，哪一项是正确的？编号{uuid.uuid4().hex}",
+            "options": {k: f"选项{k}{i}" for k in "ABCD"},
+            "answer": "A",
+            "explanation": "解析内容",
+            "tags": ["索引", "数据库"]
+        }
+        for i in range(n)
+    ], skip_duplicates=False)
+    questions = db.query(Question).order_by(Question.created_at.desc()).limit(n).all()
+
+    now = datetime.utcnow()
+    for i, q in enumerate(questions):
+        exam = Exam(
+            title=f"bench {i}", mode="exam", status="completed",
+            question_ids=[q.id], total_count=1, total_score=1,
+            score=0, correct_count=0, wrong_count=1,
+            start_time=now, submit_time=now, time_used=60
+        )
+        db.add(exam)
+        db.flush()
+        db.add(WrongQuestion(
+            question_id=q.id, exam_id=exam.id, user_answer="B", correct_answer="A",
+            wrong_count=1, mastered=0, last_wrong_time=now
+        ))
+    db.flush()
+    return questions
+
+
+def measure(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def compare(name, items, validated, trusted, repeat):
+    """validated: 旧路径（FastAPI 按 response_model 校验后编码），trusted: orjson 直出"""
+    before = measure(validated, repeat)
+    after = measure(trusted, repeat)
+    n = max(len(items), 1)
+    print(
+        f"{name:<22} {len(items)} 项  "
+        f"校验 {before / n * 1e6:8.1f} µs/项  直出 {after / n * 1e6:8.1f} µs/项  "
+        f"x{before / after:.1f}"
+    )
+
+
+def run(page_size, repeat):
+    db = SessionLocal()
+    try:
+        questions = seed(db, page_size)
+
+        # get_questions
+        page = {
+            "items": [question_to_dict(q) for q in questions],
+            "total": page_size, "page": 1, "pageSize": page_size, "totalPages": 1
+        }
+        page_adapter = TypeAdapter(Response[Union[PageResponse, CursorPageResponse]])
+        compare(
+            "get_questions", page["items"],
+            lambda: json.dumps(jsonable_encoder(page_adapter.validate_python({"data": page}))),
+            lambda: ok(page).body,
+            repeat
+        )
+
+        # list_exams
+        exams = db.query(Exam).order_by(Exam.created_at.desc()).limit(page_size).all()
+        exam_adapter = TypeAdapter(List[ExamResponse])
+        compare(
+            "list_exams", exams,
+            lambda: json.dumps(jsonable_encoder(exam_adapter.validate_python(exams, from_attributes=True))),
+            lambda: trusted_response(rows_to_dicts(exams, EXAM_LIST_FIELDS)).body,
+            repeat
+        )
+
+        # list_wrong_questions
+        wrong_rows = db.query(WrongQuestion).order_by(WrongQuestion.last_wrong_time.desc()).limit(page_size).all()
+        wrong = wrong_questions_to_dicts(db, wrong_rows)
+        wrong_adapter = TypeAdapter(List[WrongQuestionResponse])
+        compare(
+            "list_wrong_questions", wrong,
+            lambda: json.dumps(jsonable_encoder(wrong_adapter.validate_python(wrong))),
+            lambda: trusted_response(wrong).body,
+            repeat
+        )
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    times = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    init_db()
+    run(size, times)
@@ -11,6 +11,9 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str
     
+    # 题库统计使用反范式化计数器表（关闭则每次单次聚合扫描）
+    QUESTION_COUNTERS_ENABLED: bool = True
+    
     # CORS - 支持逗号分隔的字符串或JSON数组
     CORS_ORIGINS: str = "http://localhost:5173,http://127.0.0.1:5173"
     
@@ -18,6 +21,25 @@ class Settings(BaseSettings):
     DATA_DIR: str = "/tmp"
     BACKUP_DIR: str = "/tmp/backup"
     
+    # Uploads - 分块写入临时文件（目录为空时使用系统临时目录）
+    UPLOAD_TEMP_DIR: str = ""
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024  # 1 MB
+    IMPORT_MAX_UPLOAD_MB: int = 50
+    RESTORE_MAX_UPLOAD_MB: int = 1024
+    
+    # 导入预览会话保留时间（小时），同一文件（内容哈希）在有效期内重复上传直接复用
+    IMPORT_SESSION_TTL_HOURS: int = 24
+    
+    # 增量同步：删除墓碑保留天数
+    CHANGE_FEED_RETENTION_DAYS: int = 90
+    
+    # 文档解析：行数达到 PARSER_PARALLEL_MIN_LINES 时按题目边界分块，在进程池中并行解析
+    # PARSER_WORKERS 为 0 时使用 CPU 核数，为 1 时不启用并行
+    PARSER_PARALLEL_MIN_LINES: int = 20000
+    PARSER_WORKERS: int = 0
+    # Excel 导入解析所有工作表（关闭时只解析活动工作表）
+    EXCEL_IMPORT_ALL_SHEETS: bool = False
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -0,0 +1,171 @@
+"""
+检查常用查询的执行计划是否使用了迁移中建立的索引
+
+用法（使用 .env / 环境变量中的 DATABASE_URL）：
+    python explain_queries.py
+
+SQLite 使用 EXPLAIN QUERY PLAN，PostgreSQL 使用 EXPLAIN。PostgreSQL 在小表上会选择顺序扫描，
+检查时先 SET enable_seqscan = off，只验证预期索引对该查询形态可用；实际计划仍需在有代表性的数据量
+并 ANALYZE 后确认。可用索引不止一个的查询（如 (status, created_at) 与 created_at）在空表上代价相同，
+检查前在同一事务中写入示例数据（题目、考试、AI 任务）并 ANALYZE，结束时回滚。PostgreSQL 上另外检查
+仅在 PostgreSQL 建立的索引（question_ids 的 jsonb_path_ops GIN 索引、检索词的 tsvector GIN 索引）。有查询未使用预期索引时以状态码 1 退出。
+"""
+import sys
+from datetime import datetime
+
+from sqlalchemy import and_, text
+from sqlalchemy.sql.elements import TextClause
+
+from models.database import SessionLocal, init_db
+from models.question import Question
+from models.exam import Exam, WrongQuestion
+from models.ai_task import AITask
+
+
+def query_shapes(db):
+    """(说明, 查询, 预期索引) —— 对应 api/*.py 中的查询"""
+    return [
+        (
+            "题目列表默认排序",
+            db.query(Question).order_by(Question.created_at.desc(), Question.id.desc()).limit(20),
+            "ix_questions_created_id"
+        ),
+        (
+            "增量同步按变更序号读取变更",
+            db.query(Question).filter(Question.change_seq > 100)
+            .order_by(Question.change_seq, Question.id).limit(500),
+            "ix_questions_change_seq"
+        ),
+        (
+            "题目列表按分类筛选",
+            db.query(Question).filter(Question.category_id == "default")
+            .order_by(Question.created_at.desc()).limit(20),
+            "ix_questions_category_created"
+        ),
+        (
+            "题目列表按题型/难度筛选",
+            db.query(Question).filter(Question.type == "single", Question.difficulty == "easy"),
+            "ix_questions_type_difficulty"
+        ),
+        (
+            "AI 批量补全按答案状态筛选",
+            db.query(Question).filter(Question.answer_status == "none"),
+            "ix_questions_answer_explanation_status"
+        ),
+        (
+            # 已完成的考试占多数时按 ix_exams_created 倒序扫描过滤即可，(status, created_at) 用于进行中的少数考试
+            "考试列表按状态筛选（进行中）",
+            db.query(Exam).filter(Exam.status == "in_progress").order_by(Exam.created_at.desc()).limit(20),
+            "ix_exams_status_created"
+        ),
+        (
+            "每日统计（已完成考试按提交时间）",
+            db.query(Exam).filter(and_(
+                Exam.status == "completed",
+                Exam.submit_time >= datetime(2024, 1, 1),
+                Exam.submit_time < datetime(2024, 2, 1)
+            )),
+            "ix_exams_status_submit_time"
+        ),
+        (
+            "判题时查找错题记录",
+            db.query(WrongQuestion).filter(WrongQuestion.question_id == "x").limit(1),
+            "ix_wrong_questions_question_id"
+        ),
+        (
+            "错题列表按掌握状态筛选",
+            db.query(WrongQuestion).filter(WrongQuestion.mastered == 0)
+            .order_by(WrongQuestion.last_wrong_time.desc()).limit(20),
+            "ix_wrong_questions_mastered_last_wrong"
+        ),
+        (
+            "AI 任务列表按状态筛选",
+            db.query(AITask).filter(AITask.status == "running").order_by(AITask.created_at.desc()),
+            "ix_ai_tasks_status_created"
+        ),
+    ]
+
+
+def postgresql_query_shapes():
+    """
+    仅 PostgreSQL 的索引（见 models/exam.py、models/ai_task.py、services/search_service.py）
+
+    JSONB 参数无法以字面量编译，question_ids 的查询按 models.types.json_array_contains
+    生成的形态（question_ids @> '["id"]'）直接写出
+    """
+    return [
+        (
+            "包含某道题的考试（question_ids @>）",
+            text("SELECT id FROM exams WHERE question_ids @> '[\"x\"]'::jsonb"),
+            "ix_exams_question_ids_gin"
+        ),
+        (
+            "包含某道题的 AI 任务（question_ids @>）",
+            text("SELECT id FROM ai_tasks WHERE question_ids @> '[\"x\"]'::jsonb"),
+            "ix_ai_tasks_question_ids_gin"
+        ),
+        (
+            "关键词全文检索",
+            text(
+                "SELECT question_id FROM question_search "
+                "WHERE to_tsvector('simple', tokens) @@ to_tsquery('simple', 'function:*')"
+            ),
+            "ix_question_search_tsv"
+        ),
+    ]
+
+
+# 示例数据：状态等筛选值按实际分布取少数（进行中的考试、未补全的题目、运行中的任务）
+SAMPLE_ROWS = [
+    "INSERT INTO questions (id, type, difficulty, content, answer_status, explanation_status, change_seq, created_at) "
+    "SELECT 'explain-' || g, (ARRAY['single', 'multiple', 'judge', 'essay'])[g % 4 + 1], "
+    "(ARRAY['easy', 'medium', 'hard'])[g % 3 + 1], 'explain ' || g, "
+    "CASE WHEN g % 50 = 0 THEN 'none' ELSE 'confirmed' END, 'confirmed', g, "
+    "timestamp '2023-01-01' + g * interval '1 hour' FROM generate_series(1, :count) g",
+    "INSERT INTO exams (id, title, mode, question_ids, status, created_at, submit_time) "
+    "SELECT 'explain-' || g, 'explain', 'exam', '[]'::jsonb, "
+    "CASE WHEN g % 100 = 0 THEN 'in_progress' ELSE 'completed' END, "
+    "timestamp '2023-01-01' + g * interval '1 hour', "
+    "timestamp '2023-01-01' + g * interval '1 hour' + interval '30 minutes' FROM generate_series(1, :count) g",
+    "INSERT INTO ai_tasks (id, type, status, question_ids, created_at) "
+    "SELECT 'explain-' || g, 'answer', CASE WHEN g % 100 = 0 THEN 'running' ELSE 'completed' END, '[]'::jsonb, "
+    "timestamp '2023-01-01' + g * interval '1 hour' FROM generate_series(1, :count) g",
+]
+
+
+def seed_postgresql(db, count: int = 20000):
+    """写入示例数据并 ANALYZE，由调用方回滚"""
+    for statement in SAMPLE_ROWS:
+        db.execute(text(statement), {"count": count})
+    db.execute(text("ANALYZE questions, exams, ai_tasks"))
+
+
+def explain(db, query) -> str:
+    dialect = db.bind.dialect
+    statement = query if isinstance(query, TextClause) else query.statement
+    compiled = statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True})
+    prefix = "EXPLAIN QUERY PLAN " if dialect.name == "sqlite" else "EXPLAIN "
+    rows = db.execute(text(prefix + str(compiled))).all()
+    return "\n".join(" ".join(str(col) for col in row) for row in rows)
+
+
+if __name__ == "__main__":
+    init_db()
+    db = SessionLocal()
+    failed = 0
+    try:
+        shapes = query_shapes(db)
+        if db.bind.dialect.name == "postgresql":
+            seed_postgresql(db)
+            db.execute(text("SET enable_seqscan = off"))
+            shapes += postgresql_query_shapes()
+        for label, query, index in shapes:
+            plan = explain(db, query)
+            ok = index in plan
+            failed += not ok
+            print(f"[{'OK' if ok else 'MISS'}] {label} -> {index}")
+            print("    " + plan.replace("\n", "\n    "))
+    finally:
+        db.rollback()
+        db.close()
+    sys.exit(1 if failed else 0)
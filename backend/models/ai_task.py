@@ -1,12 +1,13 @@
 """
 AI Task Model
 """
-from sqlalchemy import Column, String, Integer, DateTime, Text
+from sqlalchemy import Column, String, Integer, DateTime, Text, Index
 from sqlalchemy.sql import func
 from datetime import datetime
 import uuid
 
 from .database import Base
+from .types import JSONType
 
 
 class AITask(Base):
@@ -18,7 +19,7 @@ class AITask(Base):
     status = Column(String, default="pending")  # pending/running/paused/completed/failed/cancelled
     
     # Task content
-    question_ids = Column(Text)  # JSON array of question IDs
+    question_ids = Column(JSONType)  # List of question IDs
     total_count = Column(Integer, default=0)
     completed_count = Column(Integer, default=0)
     failed_count = Column(Integer, default=0)
@@ -37,5 +38,15 @@ class AITask(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     completed_at = Column(DateTime)
     
+    # 任务列表（按状态筛选，按创建时间倒序）；包含某道题的任务（仅 PostgreSQL）
+    __table_args__ = (
+        Index("ix_ai_tasks_created", "created_at"),
+        Index("ix_ai_tasks_status_created", "status", "created_at"),
+        Index(
+            "ix_ai_tasks_question_ids_gin", "question_ids",
+            postgresql_using="gin", postgresql_ops={"question_ids": "jsonb_path_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
+    
     def __repr__(self):
         return f"<AITask {self.id} {self.type} {self.status}>"
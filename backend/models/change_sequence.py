@@ -0,0 +1,12 @@
+from sqlalchemy import Column, String, BigInteger
+
+from models.database import Base
+
+
+class ChangeSequence(Base):
+    """增量同步的变更序号计数器（由 services.change_feed 维护）"""
+    __tablename__ = "change_sequence"
+
+    # seq：最后分配的变更序号 / purged：已清理的删除墓碑的最大序号
+    key = Column(String, primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
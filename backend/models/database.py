@@ -3,6 +3,8 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
 
+import orjson
+
 from config import settings
 
 # Ensure data directory exists (only for file-based operations)
@@ -16,7 +18,10 @@ if settings.DATABASE_URL.startswith('sqlite'):
 
 engine = create_engine(
     settings.DATABASE_URL,
-    connect_args=connect_args
+    connect_args=connect_args,
+    # JSON 列的编解码（中文不转义）
+    json_serializer=lambda obj: orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8"),
+    json_deserializer=orjson.loads
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -34,11 +39,33 @@ def get_db():
 
 def init_db():
     """Initialize database with tables and default data"""
-    from models import category, question, exam, ai_task, learning_stat, setting
+    from models import category, question, question_search, question_counter, question_lsh, question_tombstone, change_sequence, exam, ai_task, import_job, learning_stat, setting, tag
+    from services import search_service, counter_service, dedup_service, tag_service, question_sync
     
     # Create all tables
     Base.metadata.create_all(bind=engine)
     
+    # Versioned migrations for existing deployments (columns, indexes, backfills)
+    from models.migrations import run_migrations
+    run_migrations(engine)
+    
+    # Full-text search index and write-path sync
+    search_service.ensure_search_index(engine)
+    question_sync.register(SessionLocal)
+    
+    # Near-duplicate (MinHash/LSH) index for import de-duplication
+    with engine.begin() as conn:
+        dedup_service.backfill(conn)
+    
+    # Normalized tag table (backfilled from questions.tags JSON)
+    with engine.begin() as conn:
+        tag_service.backfill(conn)
+    
+    # Rebuild denormalized question counters (one grouped scan)
+    if settings.QUESTION_COUNTERS_ENABLED:
+        with engine.begin() as conn:
+            counter_service.rebuild(conn)
+    
     # Initialize default settings
     db = SessionLocal()
     try:
@@ -1,9 +1,10 @@
-from sqlalchemy import Column, String, DateTime, Integer, Text, CheckConstraint, ForeignKey
+from sqlalchemy import Column, String, DateTime, Integer, Text, CheckConstraint, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
 
 from models.database import Base
+from models.types import JSONType
 
 
 class Exam(Base):
@@ -17,14 +18,14 @@ class Exam(Base):
     mode = Column(String, nullable=False)  # exam/practice/review
     
     # 配置信息
-    config = Column(Text, nullable=True)  # JSON: 组卷配置
+    config = Column(JSONType, nullable=True)  # 组卷配置
     
     # 题目信息
-    question_ids = Column(Text, nullable=False)  # JSON: 题目ID列表
+    question_ids = Column(JSONType, nullable=False)  # 题目ID列表
     total_count = Column(Integer, default=0)
     
     # 答题信息
-    answers = Column(Text, nullable=True)  # JSON: 用户答案 {questionId: answer}
+    answers = Column(JSONType, nullable=True)  # 用户答案 {questionId: answer}
     
     # 评分信息
     status = Column(String, default="in_progress")  # in_progress/completed
@@ -46,6 +47,15 @@ class Exam(Base):
     __table_args__ = (
         CheckConstraint("mode IN ('exam', 'practice', 'review')", name="check_mode"),
         CheckConstraint("status IN ('in_progress', 'completed')", name="check_status"),
+        # 考试列表（按状态筛选，按创建时间倒序）；学习统计（已完成考试按提交日期）
+        Index("ix_exams_created", "created_at"),
+        Index("ix_exams_status_created", "status", "created_at"),
+        Index("ix_exams_status_submit_time", "status", "submit_time"),
+        # 包含某道题的考试（question_ids @> '["id"]'），仅 PostgreSQL
+        Index(
+            "ix_exams_question_ids_gin", "question_ids",
+            postgresql_using="gin", postgresql_ops={"question_ids": "jsonb_path_ops"}
+        ).ddl_if(dialect="postgresql"),
     )
     
     # Relationships
@@ -76,3 +86,10 @@ class WrongQuestion(Base):
     # Relationships
     question = relationship("Question", back_populates="wrong_questions")
     exam = relationship("Exam", back_populates="wrong_questions")
+    
+    # 判题时按题目查找错题记录；错题列表（按掌握状态筛选，按最近错误时间倒序）
+    __table_args__ = (
+        Index("ix_wrong_questions_question_id", "question_id"),
+        Index("ix_wrong_questions_last_wrong", "last_wrong_time"),
+        Index("ix_wrong_questions_mastered_last_wrong", "mastered", "last_wrong_time"),
+    )
@@ -0,0 +1,65 @@
+"""
+Import Job Model
+"""
+from sqlalchemy import Column, String, Integer, DateTime, Text, Boolean, ForeignKey, Index
+from datetime import datetime
+import uuid
+
+from .database import Base
+
+
+class ImportJob(Base):
+    """Background question import job"""
+    __tablename__ = "import_jobs"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    mode = Column(String, default="import")  # import: 后台导入任务 / preview: 服务端暂存的导入预览会话
+    status = Column(String, default="pending")  # pending/parsing/deduplicating/ready/importing/completed/failed
+    filename = Column(String)
+    file_hash = Column(String(64), index=True)  # 上传文件内容 SHA-256
+
+    # 查重时的题库版本（题目数 + 最后更新时间），变化后需重新查重
+    bank_version = Column(String)
+
+    # Import options (JSON)
+    options = Column(Text)
+
+    # Progress
+    total_count = Column(Integer, default=0)
+    parsed_count = Column(Integer, default=0)
+    deduped_count = Column(Integer, default=0)
+    inserted_count = Column(Integer, default=0)
+    updated_count = Column(Integer, default=0)  # upsert 模式下更新的已有题目
+    skipped_count = Column(Integer, default=0)
+    failed_count = Column(Integer, default=0)
+
+    # Parse statistics and error
+    statistics = Column(Text)
+    error_message = Column(Text)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    completed_at = Column(DateTime)
+
+    def __repr__(self):
+        return f"<ImportJob {self.id} {self.status}>"
+
+
+class ImportJobItem(Base):
+    """Per-question result of an import job"""
+    __tablename__ = "import_job_items"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(String, ForeignKey("import_jobs.id", ondelete="CASCADE"), nullable=False)
+    line = Column(Integer, nullable=False)
+    status = Column(String, nullable=False)  # pending/imported/updated/skipped/failed/excluded
+    is_duplicate = Column(Boolean, default=False)
+    question_id = Column(String)
+    message = Column(Text)
+    data = Column(Text)  # Parsed question (JSON)
+
+    __table_args__ = (
+        Index("ix_import_job_items_job_line", "job_id", "line"),
+    )
@@ -0,0 +1,225 @@
+"""
+版本化数据库迁移
+
+启动时在 create_all 之后执行：新建的库由 create_all 直接建出最新结构，已有部署按版本号
+依次补齐列和索引。已执行的版本记录在 schema_migrations 表中，每个迁移在独立事务中执行。
+迁移需可重复执行（新库上 create_all 已建好的列/索引直接跳过）。
+"""
+import json
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import inspect, text, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.engine import Connection, Engine
+
+
+def _columns(conn: Connection, table: str) -> set:
+    return {c["name"] for c in inspect(conn).get_columns(table)}
+
+
+def _add_column(conn: Connection, table: str, column: str, ddl: str):
+    if column not in _columns(conn, table):
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+
+def _create_indexes(conn: Connection, model, names: List[str]):
+    """按模型中定义的索引创建（已存在则跳过）"""
+    indexes = {index.name: index for index in model.__table__.indexes}
+    for name in names:
+        indexes[name].create(conn, checkfirst=True)
+
+
+def _invalid_json_ids(conn: Connection, table: str, column: str) -> List[str]:
+    """列中无法解析为 JSON 的行（按 id 游标分批扫描）"""
+    invalid = []
+    after = ""
+    while True:
+        rows = conn.execute(text(
+            f"SELECT id, {column} FROM {table} WHERE {column} IS NOT NULL AND id > :after ORDER BY id LIMIT 500"
+        ), {"after": after}).all()
+        if not rows:
+            break
+        for row_id, value in rows:
+            try:
+                json.loads(value)
+            except (TypeError, ValueError):
+                invalid.append(row_id)
+        after = rows[-1][0]
+    return invalid
+
+
+def _convert_json_column(conn: Connection, table: str, column: str, fallback: Optional[str] = None):
+    """
+    Text 中的 JSON 字符串转为 JSON 列：无法解析的旧值置为 fallback（默认 NULL）
+
+    PostgreSQL 将列类型改为 JSONB；SQLite 的 JSON 列按文本存储，只需清理无效值
+    """
+    if conn.dialect.name == "postgresql":
+        column_type = {c["name"]: c["type"] for c in inspect(conn).get_columns(table)}[column]
+        if isinstance(column_type, JSONB):
+            return
+        invalid = _invalid_json_ids(conn, table, column)
+        if invalid:
+            conn.execute(
+                text(f"UPDATE {table} SET {column} = :fallback WHERE id = :id"),
+                [{"fallback": fallback, "id": row_id} for row_id in invalid]
+            )
+        conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE JSONB USING {column}::jsonb"))
+    else:
+        conn.execute(
+            text(f"UPDATE {table} SET {column} = :fallback WHERE {column} IS NOT NULL AND json_valid({column}) = 0"),
+            {"fallback": fallback}
+        )
+
+
+# ============ Migrations ============
+
+def _001_questions_content_hash(conn: Connection):
+    """questions.content_hash 列、索引及回填"""
+    from utils.helpers import content_hash
+
+    _add_column(conn, "questions", "content_hash", "VARCHAR(64)")
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_questions_content_hash ON questions (content_hash)"))
+
+    # 题干规范化后为空的题目哈希保持为 NULL，按 id 游标推进避免重复扫描
+    after = ""
+    while True:
+        rows = conn.execute(text(
+            "SELECT id, content FROM questions WHERE content_hash IS NULL AND id > :after "
+            "ORDER BY id LIMIT 500"
+        ), {"after": after}).all()
+        if not rows:
+            break
+        params = [
+            {"id": qid, "content_hash": content_hash(content)}
+            for qid, content in rows
+        ]
+        params = [p for p in params if p["content_hash"]]
+        if params:
+            conn.execute(
+                text("UPDATE questions SET content_hash = :content_hash WHERE id = :id"),
+                params
+            )
+        after = rows[-1][0]
+
+
+def _002_import_session_columns(conn: Connection):
+    """导入预览会话所需的 import_jobs 列"""
+    _add_column(conn, "import_jobs", "mode", "VARCHAR DEFAULT 'import'")
+    _add_column(conn, "import_jobs", "file_hash", "VARCHAR(64)")
+    _add_column(conn, "import_jobs", "bank_version", "VARCHAR")
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_import_jobs_file_hash ON import_jobs (file_hash)"))
+
+
+def _003_query_indexes(conn: Connection):
+    """常用筛选/排序列的组合索引（与 api/*.py 中的查询形态对应）"""
+    from models.question import Question
+    from models.exam import Exam, WrongQuestion
+    from models.ai_task import AITask
+
+    _create_indexes(conn, Question, [
+        "ix_questions_created_id",
+        "ix_questions_category_created",
+        "ix_questions_type_difficulty",
+        "ix_questions_answer_explanation_status",
+    ])
+    _create_indexes(conn, Exam, [
+        "ix_exams_created",
+        "ix_exams_status_created",
+        "ix_exams_status_submit_time",
+    ])
+    _create_indexes(conn, WrongQuestion, [
+        "ix_wrong_questions_question_id",
+        "ix_wrong_questions_last_wrong",
+        "ix_wrong_questions_mastered_last_wrong",
+    ])
+    _create_indexes(conn, AITask, [
+        "ix_ai_tasks_created",
+        "ix_ai_tasks_status_created",
+    ])
+
+
+def _004_json_columns(conn: Connection):
+    """结构化字段改为 JSON/JSONB 列，PostgreSQL 上为题目列表建 GIN 索引"""
+    from models.exam import Exam
+    from models.ai_task import AITask
+
+    _convert_json_column(conn, "questions", "options")
+    _convert_json_column(conn, "questions", "tags")
+    _convert_json_column(conn, "exams", "config")
+    _convert_json_column(conn, "exams", "question_ids", fallback="[]")
+    _convert_json_column(conn, "exams", "answers")
+    _convert_json_column(conn, "ai_tasks", "question_ids")
+
+    if conn.dialect.name == "postgresql":
+        _create_indexes(conn, Exam, ["ix_exams_question_ids_gin"])
+        _create_indexes(conn, AITask, ["ix_ai_tasks_question_ids_gin"])
+
+
+def _005_change_feed(conn: Connection):
+    """增量同步：questions (updated_at, id) 索引（墓碑表由 create_all 创建）"""
+    from models.question import Question
+
+    _create_indexes(conn, Question, ["ix_questions_updated_id"])
+
+
+def _006_import_job_updated_count(conn: Connection):
+    """import_jobs.updated_count（upsert 导入更新的题目数）"""
+    _add_column(conn, "import_jobs", "updated_count", "INTEGER DEFAULT 0")
+
+
+def _007_change_seq(conn: Connection):
+    """
+    增量同步改按变更序号读取：questions/question_tombstones.change_seq 列、索引及序号计数器
+
+    已有的题目和墓碑序号为 0（早于所有新写入）；旧同步令牌失效，客户端需重新全量同步
+    """
+    from models.question import Question
+    from models.question_tombstone import QuestionTombstone
+
+    _add_column(conn, "questions", "change_seq", "BIGINT NOT NULL DEFAULT 0")
+    _add_column(conn, "question_tombstones", "change_seq", "BIGINT NOT NULL DEFAULT 0")
+    _create_indexes(conn, Question, ["ix_questions_change_seq"])
+    _create_indexes(conn, QuestionTombstone, ["ix_question_tombstones_change_seq"])
+    for key in ("seq", "purged"):
+        conn.execute(text(
+            "INSERT INTO change_sequence (key, value) SELECT :key, 0 "
+            "WHERE NOT EXISTS (SELECT 1 FROM change_sequence WHERE key = :key)"
+        ), {"key": key})
+
+
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "questions_content_hash", _001_questions_content_hash),
+    (2, "import_session_columns", _002_import_session_columns),
+    (3, "query_indexes", _003_query_indexes),
+    (4, "json_columns", _004_json_columns),
+    (5, "change_feed", _005_change_feed),
+    (6, "import_job_updated_count", _006_import_job_updated_count),
+    (7, "change_seq", _007_change_seq),
+]
+
+
+def run_migrations(engine: Engine) -> List[int]:
+    """执行尚未执行的迁移，返回本次执行的版本号"""
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version INTEGER PRIMARY KEY, "
+            "name VARCHAR(200) NOT NULL, "
+            "applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+        ))
+        applied = {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+    executed = []
+    for version, name, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+        with engine.begin() as conn:
+            migrate(conn)
+            conn.execute(
+                text("INSERT INTO schema_migrations (version, name) VALUES (:version, :name)"),
+                {"version": version, "name": name}
+            )
+        print(f"Applied migration {version:03d}_{name}")
+        executed.append(version)
+    return executed
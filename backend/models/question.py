@@ -1,9 +1,11 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text, CheckConstraint
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, DateTime, BigInteger, ForeignKey, Text, CheckConstraint, Index
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
 import uuid
 
 from models.database import Base
+from models.types import JSONType
+from utils.helpers import content_hash
 
 
 class Question(Base):
@@ -16,7 +18,8 @@ class Question(Base):
     type = Column(String, nullable=False)  # single/multiple/judge/essay
     difficulty = Column(String, default="medium")  # easy/medium/hard
     content = Column(Text, nullable=False)
-    options = Column(Text, nullable=True)  # JSON string
+    content_hash = Column(String(64), nullable=True, index=True)  # 规范化题干的哈希，用于精确查重
+    options = Column(JSONType, nullable=True)  # {"A": "..."}
     
     # Answer and explanation
     answer = Column(Text, nullable=True)
@@ -25,11 +28,13 @@ class Question(Base):
     explanation_status = Column(String, default="none")
     
     # Metadata
-    tags = Column(Text, nullable=True)  # JSON string
+    tags = Column(JSONType, nullable=True)  # ["tag", ...]
     source = Column(String, nullable=True)
     
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    # 增量同步的变更序号（按提交顺序递增，每次写入时由 services.change_feed 分配）
+    change_seq = Column(BigInteger, nullable=False)
     
     # Constraints
     __table_args__ = (
@@ -37,8 +42,23 @@ class Question(Base):
         CheckConstraint("difficulty IN ('easy', 'medium', 'hard')", name="check_difficulty"),
         CheckConstraint("answer_status IN ('none', 'ai_pending', 'ai_generated', 'confirmed')", name="check_answer_status"),
         CheckConstraint("explanation_status IN ('none', 'ai_pending', 'ai_generated', 'confirmed')", name="check_explanation_status"),
+        # 列表默认排序 / 游标分页 (created_at, id)，按分类筛选后排序
+        Index("ix_questions_created_id", "created_at", "id"),
+        # 按更新时间排序 / 游标分页 (updated_at, id)
+        Index("ix_questions_updated_id", "updated_at", "id"),
+        # 增量同步按 (change_seq, id) 读取变更
+        Index("ix_questions_change_seq", "change_seq", "id"),
+        Index("ix_questions_category_created", "category_id", "created_at"),
+        # 题型/难度筛选、组卷；补全状态筛选、AI 批量补全
+        Index("ix_questions_type_difficulty", "type", "difficulty"),
+        Index("ix_questions_answer_explanation_status", "answer_status", "explanation_status"),
     )
     
     # Relationships
     category = relationship("Category", back_populates="questions")
     wrong_questions = relationship("WrongQuestion", back_populates="question", cascade="all, delete-orphan")
+    
+    @validates("content")
+    def _update_content_hash(self, key, value):
+        self.content_hash = content_hash(value)
+        return value
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, String, Integer
+
+from models.database import Base
+
+
+class QuestionCounter(Base):
+    """题库统计计数器（反范式化，供仪表盘 O(1) 读取）"""
+    __tablename__ = "question_counters"
+
+    # total / type:<type> / difficulty:<difficulty> / status:complete|incomplete
+    key = Column(String, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
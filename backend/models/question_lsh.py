@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, BigInteger, ForeignKey, Index
+
+from models.database import Base
+
+
+class QuestionLSHBucket(Base):
+    """题干 MinHash 签名的 LSH 分桶（用于近似重复检测的候选召回）"""
+    __tablename__ = "question_lsh_buckets"
+
+    question_id = Column(String, ForeignKey("questions.id", ondelete="CASCADE"), primary_key=True)
+    bucket = Column(BigInteger, primary_key=True)
+
+    __table_args__ = (
+        Index("ix_question_lsh_buckets_bucket", "bucket"),
+    )
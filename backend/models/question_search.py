@@ -0,0 +1,13 @@
+from sqlalchemy import Column, String, Integer, Text, ForeignKey
+
+from models.database import Base
+
+
+class QuestionSearch(Base):
+    """题目检索文档（分词后的题干，供 FTS5 / tsvector 索引使用）"""
+    __tablename__ = "question_search"
+
+    # 显式整型主键，作为 SQLite FTS5 外部内容表的稳定 rowid
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    question_id = Column(String, ForeignKey("questions.id", ondelete="CASCADE"), nullable=False, unique=True)
+    tokens = Column(Text, nullable=False, default="")
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, DateTime, BigInteger
+from sqlalchemy.sql import func
+
+from models.database import Base
+
+
+class QuestionTombstone(Base):
+    """已删除题目的墓碑（供增量同步下发删除），超过保留期后清理"""
+    __tablename__ = "question_tombstones"
+
+    question_id = Column(String, primary_key=True)
+    deleted_at = Column(DateTime, server_default=func.now(), nullable=False, index=True)
+    # 变更序号（每条墓碑单独分配，不重复）
+    change_seq = Column(BigInteger, nullable=False, index=True)
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, String, Integer, ForeignKey, Index
+
+from models.database import Base
+
+
+class Tag(Base):
+    """标签字典"""
+    __tablename__ = "tags"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(100), nullable=False, unique=True)
+
+
+class QuestionTag(Base):
+    """题目-标签关联（由 questions.tags 派生，写入路径上同步维护）"""
+    __tablename__ = "question_tags"
+
+    question_id = Column(String, ForeignKey("questions.id", ondelete="CASCADE"), primary_key=True)
+    tag_id = Column(Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True)
+
+    __table_args__ = (
+        Index("ix_question_tags_tag_question", "tag_id", "question_id"),
+    )
@@ -0,0 +1,25 @@
+"""
+结构化字段的列类型与库内查询
+
+题目选项/标签、考试配置/题目列表/答案、AI 任务题目列表使用 JSONType：PostgreSQL 上为 JSONB
+（可建 GIN 索引，在库内按包含关系筛选），其他数据库为 JSON（SQLite 按文本存储，可用 json_each 查询）。
+读写时为 Python 的 dict/list，不再手动 json.loads/json.dumps。
+"""
+from sqlalchemy import JSON, select, literal, type_coerce
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+
+# None 写入为 SQL NULL（而不是 JSON 'null'），与原 Text 列的空值一致
+JSONType = JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), "postgresql")
+
+
+def json_array_contains(dialect_name: str, column, value):
+    """
+    JSON 数组列包含某个元素的筛选条件
+
+    PostgreSQL 使用 @>（可走 jsonb_path_ops GIN 索引），SQLite 使用 json_each 子查询
+    """
+    if dialect_name == "postgresql":
+        return type_coerce(column, JSONB).contains([value])
+    elements = func.json_each(column).table_valued("value")
+    return select(literal(1)).select_from(elements).where(elements.c.value == value).exists()
@@ -20,6 +20,15 @@ class PageResponse(BaseModel, Generic[T]):
     totalPages: int
 
 
+class CursorPageResponse(BaseModel, Generic[T]):
+    """Keyset (cursor) paginated response"""
+    items: List[T]
+    pageSize: int
+    nextCursor: Optional[str] = None
+    hasMore: bool = False
+    total: Optional[int] = None
+
+
 class PagedResponse(BaseModel):
     """Standard paginated API response"""
     code: int = 0
@@ -2,6 +2,8 @@ from pydantic import BaseModel, Field
 from typing import Optional, List, Dict
 from datetime import datetime
 
+from schemas.common import PageResponse, CursorPageResponse
+
 
 class QuestionBase(BaseModel):
     categoryId: Optional[str] = Field(None, description="分类ID")
@@ -56,6 +58,22 @@ class QuestionListQuery(BaseModel):
     sortOrder: str = "desc"
 
 
+class QuestionFacets(BaseModel):
+    """当前筛选条件下各维度的题目数（每个维度不受自身筛选条件限制）"""
+    categoryId: Dict[str, int]
+    type: Dict[str, int]
+    difficulty: Dict[str, int]
+    status: Dict[str, int]
+
+
+class QuestionPageResponse(PageResponse):
+    facets: Optional[QuestionFacets] = None
+
+
+class QuestionCursorPageResponse(CursorPageResponse):
+    facets: Optional[QuestionFacets] = None
+
+
 class QuestionStatsResponse(BaseModel):
     total: int
     byType: Dict[str, int]
@@ -67,3 +85,37 @@ class QuestionStatsResponse(BaseModel):
 class BatchUpdateCategoryRequest(BaseModel):
     question_ids: List[str] = Field(..., description="题目ID列表")
     category_id: str = Field(..., description="目标分类ID")
+
+
+class BatchGetRequest(BaseModel):
+    ids: List[str] = Field(..., description="题目ID列表（按此顺序返回）")
+
+
+class ImportSessionRequest(BaseModel):
+    token: str = Field(..., description="导入预览会话 token")
+    excludedIndices: List[int] = Field(default_factory=list, description="不导入的题目序号（预览中的 index）")
+    categoryOverrides: Dict[int, str] = Field(default_factory=dict, description="按题目序号单独指定分类")
+
+
+class QuestionFilter(BaseModel):
+    """与题目列表接口相同的筛选条件"""
+    keyword: Optional[str] = None
+    categoryId: Optional[str] = None
+    type: Optional[str] = None
+    difficulty: Optional[str] = None
+    status: Optional[str] = Field(None, pattern="^(complete|incomplete)$", description="complete/incomplete")
+    answerStatus: Optional[str] = None
+    explanationStatus: Optional[str] = None
+    tag: Optional[str] = None
+
+
+class BulkQuestionUpdate(BaseModel):
+    categoryId: Optional[str] = Field(None, description="目标分类ID")
+    difficulty: Optional[str] = Field(None, pattern="^(easy|medium|hard)$", description="目标难度")
+
+
+class BulkMutationRequest(BaseModel):
+    filter: QuestionFilter = Field(..., description="筛选条件（至少一项）")
+    action: str = Field(..., pattern="^(update|delete)$", description="update/delete")
+    update: Optional[BulkQuestionUpdate] = Field(None, description="action=update 时要修改的字段")
+    dryRun: bool = Field(False, description="只返回匹配数量，不修改")
@@ -0,0 +1,71 @@
+"""
+题库离线包 - 供客户端缓存后本地练习
+
+已有答案的题目按导出筛选条件打包为 msgpack（题目为按 BUNDLE_FIELDS 排列的数组，不重复字段名），
+再 gzip 压缩。同一题库版本 + 筛选条件只生成一次，结果缓存在进程内；ETag 为压缩前内容的哈希，
+内容不变时（如只修改了未纳入离线包的题目）ETag 不变，客户端无需重新下载。
+"""
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterable, NamedTuple, Tuple
+
+import msgpack
+
+BUNDLE_FORMAT_VERSION = 1
+BUNDLE_FIELDS = ["id", "type", "difficulty", "content", "options", "answer", "explanation", "tags", "source"]
+# 进程内缓存的离线包个数（不同筛选条件各占一个）
+BUNDLE_CACHE_SIZE = 8
+
+
+class Bundle(NamedTuple):
+    etag: str
+    data: bytes  # gzip 压缩后的 msgpack
+    count: int
+
+
+_cache: "OrderedDict[Tuple, Bundle]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def build(questions: Iterable[dict]) -> Bundle:
+    """打包题目（dict，字段同导出格式）"""
+    rows = [[q[field] for field in BUNDLE_FIELDS] for q in questions]
+    payload = msgpack.packb({
+        "format": BUNDLE_FORMAT_VERSION,
+        "fields": BUNDLE_FIELDS,
+        "questions": rows
+    }, use_bin_type=True)
+    etag = hashlib.sha256(payload).hexdigest()[:32]
+    # mtime 固定为 0，相同内容压缩结果一致
+    return Bundle(etag=etag, data=gzip.compress(payload, compresslevel=6, mtime=0), count=len(rows))
+
+
+def get(key: Tuple, bank_version: Callable[[], str], questions_factory) -> Bundle:
+    """
+    取缓存的离线包，题库版本变化后重新生成
+
+    key 为筛选条件；questions_factory() 返回要打包的题目（仅在需要生成时调用）。
+    bank_version() 与 questions_factory 读取同一数据库会话，在生成前后各读一次：
+    生成期间有写入提交（版本变化）时，包内容不一定对应读到的版本，只返回不缓存
+    """
+    version = bank_version()
+    cache_key = (key, version)
+    with _lock:
+        bundle = _cache.get(cache_key)
+        if bundle is not None:
+            _cache.move_to_end(cache_key)
+            return bundle
+
+        # 同一把锁内生成，避免并发请求重复打包
+        bundle = build(questions_factory())
+        if bank_version() != version:
+            return bundle
+        # 同一筛选条件只保留最新版本
+        for stale in [k for k in _cache if k[0] == key]:
+            del _cache[stale]
+        _cache[cache_key] = bundle
+        while len(_cache) > BUNDLE_CACHE_SIZE:
+            _cache.popitem(last=False)
+        return bundle
@@ -0,0 +1,180 @@
+"""
+题目增量同步（变更流）
+
+每次写入题目时分配变更序号 change_seq，新建/修改的题目按 (change_seq, id) 顺序读取；删除的题目记录在
+question_tombstones 中，每条墓碑单独分配序号，按 change_seq 读取。同步令牌记录两者的读取位置，单调前进。
+
+序号来自 change_sequence 表的计数器行：分配时更新该行，行锁（SQLite 为库级写锁）持有到事务结束，
+写入题目的事务按序号顺序依次提交。读到某个序号时更小的序号均已提交（或已回滚），长事务中的写入
+不会落在已下发的令牌之前。写入路径需在修改/锁定题目行之前分配序号，避免与其他写入事务互相等待。
+
+墓碑保留 CHANGE_FEED_RETENTION_DAYS 天（在写入新墓碑时清理，读取变更不修改数据），
+令牌早于已清理的墓碑时客户端需全量重新同步。
+"""
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select, func, or_, and_, text, bindparam, insert, type_coerce, String
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from config import settings
+from models.question import Question
+from models.question_tombstone import QuestionTombstone
+from utils.exceptions import ParameterError
+from utils.helpers import encode_cursor, decode_cursor
+
+BATCH_SIZE = 500
+
+Position = Tuple[int, str]
+
+
+def next_seq(conn: Connection, count: int = 1) -> int:
+    """
+    分配 count 个连续的变更序号，返回第一个
+
+    计数器行在当前事务提交前保持锁定，并发的写入事务在此排队
+    """
+    conn.execute(
+        text("UPDATE change_sequence SET value = value + :count WHERE key = 'seq'"),
+        {"count": count}
+    )
+    return _read(conn, "seq") - count + 1
+
+
+def _read(conn: Connection, key: str) -> int:
+    return conn.execute(text("SELECT value FROM change_sequence WHERE key = :key"), {"key": key}).scalar()
+
+
+def record_deleted(conn: Connection, question_ids: Sequence[str]):
+    """记录删除的题目（覆盖同 id 的旧墓碑，并清理超过保留期的墓碑），需在 DELETE 语句之前调用"""
+    ids = list(question_ids)
+    if not ids:
+        return
+    seq = next_seq(conn, len(ids))
+    _purge_tombstones(conn)
+    for i in range(0, len(ids), BATCH_SIZE):
+        chunk = ids[i:i + BATCH_SIZE]
+        conn.execute(
+            text("DELETE FROM question_tombstones WHERE question_id IN :ids").bindparams(
+                bindparam("ids", expanding=True)
+            ),
+            {"ids": chunk}
+        )
+        conn.execute(
+            insert(QuestionTombstone.__table__),
+            [{"question_id": qid, "change_seq": seq + i + j} for j, qid in enumerate(chunk)]
+        )
+
+
+def forget_deleted(conn: Connection, question_ids: Sequence[str]):
+    """题目按原 id 重新写入后删除其墓碑（避免客户端按墓碑删掉恢复的题目）"""
+    ids = list(question_ids)
+    for i in range(0, len(ids), BATCH_SIZE):
+        conn.execute(
+            text("DELETE FROM question_tombstones WHERE question_id IN :ids").bindparams(
+                bindparam("ids", expanding=True)
+            ),
+            {"ids": ids[i:i + BATCH_SIZE]}
+        )
+
+
+def bank_version(db: Session) -> str:
+    """题库版本：最后分配的变更序号（依赖题库内容的缓存/查重结果随之失效）"""
+    return str(_read(db.connection(), "seq"))
+
+
+def db_now(conn: Connection) -> datetime:
+    """数据库当前时间（与 server_default now() 写入的时间同一时钟/时区）"""
+    now = func.now() if conn.dialect.name == "sqlite" else func.localtimestamp()
+    return conn.execute(select(now)).scalar()
+
+
+def _purge_tombstones(conn: Connection):
+    """清理超过保留期的墓碑，记录已清理墓碑的最大序号"""
+    retention = db_now(conn) - timedelta(days=settings.CHANGE_FEED_RETENTION_DAYS)
+    if conn.dialect.name == "sqlite":
+        # SQLite 中时间以文本存储，按原样比较
+        retention = type_coerce(retention.isoformat(sep=" "), String)
+
+    cutoff = conn.execute(
+        select(func.max(QuestionTombstone.change_seq)).where(QuestionTombstone.deleted_at < retention)
+    ).scalar()
+    if cutoff is not None:
+        conn.execute(QuestionTombstone.__table__.delete().where(QuestionTombstone.change_seq <= cutoff))
+        conn.execute(
+            text("UPDATE change_sequence SET value = :cutoff WHERE key = 'purged' AND value < :cutoff"),
+            {"cutoff": cutoff}
+        )
+
+
+def encode_token(questions: Position, tombstones: int) -> str:
+    return encode_cursor([questions[0], questions[1], tombstones])
+
+
+def decode_token(token: str) -> Optional[Tuple[Position, int]]:
+    """解析同步令牌，迁移前按更新时间记录位置的旧令牌返回 None（需全量重新同步）"""
+    values = decode_cursor(token)
+    if values and len(values) == 4:
+        return None
+    if not values or len(values) != 3:
+        raise ParameterError("无效的同步令牌")
+    try:
+        return (int(values[0]), str(values[1])), int(values[2])
+    except (TypeError, ValueError):
+        raise ParameterError("无效的同步令牌")
+
+
+def changes(db: Session, since: Optional[str], limit: int) -> Dict:
+    """
+    读取 since 之后的变更
+
+    since 为空时从头读取全部题目（初次同步，不含删除）。返回：
+    questions（新建/修改的 Question）、deleted（删除的题目ID）、nextToken、hasMore、
+    fullResync（令牌早于已清理的墓碑，或晚于当前序号（如从备份恢复），需清空本地数据后不带 since 重新同步）
+    """
+    conn = db.connection()
+    purged = _read(conn, "purged")
+    # 先读当前序号再读题目：初次同步之后提交的删除序号更大，会在后续同步中下发
+    current = _read(conn, "seq")
+
+    if since:
+        position = decode_token(since)
+        if position is None or position[1] < purged or max(position[0][0], position[1]) > current:
+            return {"questions": [], "deleted": [], "nextToken": None, "hasMore": False, "fullResync": True}
+        question_pos, tombstone_pos = position
+    else:
+        question_pos, tombstone_pos = (-1, ""), current
+
+    # 多取一条判断是否还有更多
+    last_seq, last_id = question_pos
+    questions: List[Question] = db.query(Question).filter(
+        or_(Question.change_seq > last_seq, and_(Question.change_seq == last_seq, Question.id > last_id))
+    ).order_by(Question.change_seq, Question.id).limit(limit + 1).all()
+
+    tombstones = []
+    if since:
+        tombstones = conn.execute(
+            select(QuestionTombstone.change_seq, QuestionTombstone.question_id).where(
+                QuestionTombstone.change_seq > tombstone_pos
+            ).order_by(QuestionTombstone.change_seq).limit(limit + 1)
+        ).all()
+
+    more_questions = len(questions) > limit
+    more_tombstones = len(tombstones) > limit
+    questions = questions[:limit]
+    tombstones = tombstones[:limit]
+
+    # 只推进到已下发的最后一条，没有新变更的一侧保持原位置
+    if questions:
+        question_pos = (questions[-1].change_seq, questions[-1].id)
+    if tombstones:
+        tombstone_pos = tombstones[-1][0]
+
+    return {
+        "questions": questions,
+        "deleted": [qid for _, qid in tombstones],
+        "nextToken": encode_token(question_pos, tombstone_pos),
+        "hasMore": more_questions or more_tombstones,
+        "fullResync": False
+    }
@@ -0,0 +1,165 @@
+"""
+题库统计服务 - 单次聚合扫描 + 反范式化计数器
+
+- aggregate: 一次 SELECT 内用 CASE 表达式完成全部分组计数
+- 计数器表 question_counters 在写入路径上按增量维护，仪表盘直接读取
+"""
+from collections import Counter
+from typing import Dict, Iterable, Optional, Sequence
+
+from sqlalchemy import case, func, or_, select, text, bindparam
+from sqlalchemy.engine import Connection
+
+from models.question import Question
+
+QUESTION_TYPES = ["single", "multiple", "judge", "essay"]
+DIFFICULTIES = ["easy", "medium", "hard"]
+COUNTER_ATTRS = ("type", "difficulty", "answer_status", "explanation_status")
+
+
+def _is_incomplete(answer_status: Optional[str], explanation_status: Optional[str]) -> bool:
+    # 只有 none 状态才算待补全
+    return answer_status == "none" or explanation_status == "none"
+
+
+def question_keys(type: str, difficulty: str, answer_status: str, explanation_status: str) -> list:
+    """单道题目对应的计数器键"""
+    status = "incomplete" if _is_incomplete(answer_status, explanation_status) else "complete"
+    return ["total", f"type:{type}", f"difficulty:{difficulty}", f"status:{status}"]
+
+
+def _incomplete_expr():
+    return or_(
+        Question.answer_status == "none",
+        Question.explanation_status == "none"
+    )
+
+
+def aggregate(conn: Connection, *filters) -> Dict:
+    """单次扫描计算统计数据"""
+    columns = [func.count().label("total")]
+    columns += [
+        func.sum(case((Question.type == t, 1), else_=0)).label(f"type_{t}")
+        for t in QUESTION_TYPES
+    ]
+    columns += [
+        func.sum(case((Question.difficulty == d, 1), else_=0)).label(f"difficulty_{d}")
+        for d in DIFFICULTIES
+    ]
+    columns.append(func.sum(case((_incomplete_expr(), 1), else_=0)).label("incomplete"))
+
+    row = conn.execute(select(*columns).select_from(Question).where(*filters)).mappings().one()
+
+    total = row["total"] or 0
+    incomplete = row["incomplete"] or 0
+    return _build_stats(
+        total,
+        {t: row[f"type_{t}"] or 0 for t in QUESTION_TYPES},
+        {d: row[f"difficulty_{d}"] or 0 for d in DIFFICULTIES},
+        incomplete
+    )
+
+
+def _build_stats(total: int, by_type: Dict, by_difficulty: Dict, incomplete: int) -> Dict:
+    return {
+        "total": total,
+        "byType": by_type,
+        "byDifficulty": by_difficulty,
+        "byStatus": {
+            "complete": total - incomplete,
+            "incomplete": incomplete
+        },
+        "incomplete": incomplete
+    }
+
+
+def read(conn: Connection) -> Optional[Dict]:
+    """从计数器表读取统计数据，未建立时返回 None"""
+    counters = dict(conn.execute(text("SELECT key, value FROM question_counters")).all())
+    if "total" not in counters:
+        return None
+
+    return _build_stats(
+        counters["total"],
+        {t: counters.get(f"type:{t}", 0) for t in QUESTION_TYPES},
+        {d: counters.get(f"difficulty:{d}", 0) for d in DIFFICULTIES},
+        counters.get("status:incomplete", 0)
+    )
+
+
+def rebuild(conn: Connection) -> Dict:
+    """以一次分组扫描重建计数器表"""
+    counts = Counter({key: 0 for key in _all_keys()})
+    rows = conn.execute(
+        select(
+            Question.type, Question.difficulty, Question.answer_status,
+            Question.explanation_status, func.count()
+        ).group_by(
+            Question.type, Question.difficulty, Question.answer_status, Question.explanation_status
+        )
+    ).all()
+    for type_, difficulty, answer_status, explanation_status, count in rows:
+        for key in question_keys(type_, difficulty, answer_status, explanation_status):
+            counts[key] += count
+
+    conn.execute(text("DELETE FROM question_counters"))
+    conn.execute(
+        text("INSERT INTO question_counters (key, value) VALUES (:key, :value)"),
+        [{"key": k, "value": v} for k, v in counts.items()]
+    )
+    return read(conn)
+
+
+def _all_keys() -> list:
+    keys = ["total", "status:complete", "status:incomplete"]
+    keys += [f"type:{t}" for t in QUESTION_TYPES]
+    keys += [f"difficulty:{d}" for d in DIFFICULTIES]
+    return keys
+
+
+def apply_delta(conn: Connection, delta: Counter):
+    """按增量更新计数器"""
+    for key, value in delta.items():
+        if not value:
+            continue
+        result = conn.execute(
+            text("UPDATE question_counters SET value = value + :value WHERE key = :key"),
+            {"key": key, "value": value}
+        )
+        if result.rowcount == 0:
+            conn.execute(
+                text("INSERT INTO question_counters (key, value) VALUES (:key, :value)"),
+                {"key": key, "value": value}
+            )
+
+
+def keys_for_ids(conn: Connection, question_ids: Sequence[str]) -> Counter:
+    """统计一批已存在题目的计数器键（用于删除前计算负增量）"""
+    counts = Counter()
+    ids = list(question_ids)
+    for i in range(0, len(ids), 500):
+        rows = conn.execute(
+            select(
+                Question.type, Question.difficulty, Question.answer_status,
+                Question.explanation_status, func.count()
+            ).where(
+                Question.id.in_(bindparam("ids", expanding=True))
+            ).group_by(
+                Question.type, Question.difficulty, Question.answer_status, Question.explanation_status
+            ),
+            {"ids": ids[i:i + 500]}
+        ).all()
+        for type_, difficulty, answer_status, explanation_status, count in rows:
+            for key in question_keys(type_, difficulty, answer_status, explanation_status):
+                counts[key] += count
+    return counts
+
+
+def keys_for_rows(rows: Iterable[Dict]) -> Counter:
+    """统计一批题目数据（dict）的计数器键"""
+    counts = Counter()
+    for row in rows:
+        counts.update(question_keys(
+            row["type"], row["difficulty"], row["answer_status"], row["explanation_status"]
+        ))
+    return counts
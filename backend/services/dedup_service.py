@@ -0,0 +1,228 @@
+"""
+题目查重服务 - MinHash + LSH 候选召回
+
+题干规范化后切分为相邻二字（bigram）集合，计算 NUM_PERM 维 MinHash 签名，
+按 BANDS 个分段（每段 ROWS 维）散列为分桶键持久化到 question_lsh_buckets。
+完全相同的题目通过 content_hash 索引查找；模糊匹配只对与新题目共享至少一个分桶的
+已有题目计算 SequenceMatcher 相似度，复杂度与导入题目数量成线性关系，而不是 导入数 × 题库规模。
+"""
+import hashlib
+import struct
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import AbstractSet, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import text, bindparam, insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from models.question import Question
+from models.question_lsh import QuestionLSHBucket
+from utils.helpers import normalize_text, content_hash
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+# 仅对较长的题干做模糊匹配，避免短题误判
+FUZZY_MIN_LENGTH = 20
+FUZZY_MAX_LENGTH_DIFF = 10
+SIMILARITY_THRESHOLD = 0.95
+
+BATCH_SIZE = 500
+
+DUPLICATE_EXACT = "exact"
+DUPLICATE_SIMILAR = "similar"
+
+_BAND_FORMAT = f"<I{ROWS}Q"
+_DENSIFY_OFFSET = 1 << 58
+
+
+@lru_cache(maxsize=65536)
+def _shingle_hash(shingle: str) -> int:
+    return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def signature(norm: str) -> List[int]:
+    """
+    规范化文本的 MinHash 签名
+
+    采用单次排列哈希（one permutation hashing）：每个二字片段只计算一次 64 位散列，
+    低位决定所属分箱、高位作为取最小值的比较值；空箱按环形向后借用最近的非空箱（densification）。
+    """
+    shingles = {norm[i:i + 2] for i in range(len(norm) - 1)} or {norm}
+
+    sig: List[Optional[int]] = [None] * NUM_PERM
+    for shingle in shingles:
+        h = _shingle_hash(shingle)
+        slot, value = h % NUM_PERM, h // NUM_PERM
+        current = sig[slot]
+        if current is None or value < current:
+            sig[slot] = value
+
+    if None in sig:
+        original = list(sig)
+        # 从后向前扫描，nearest 为环形意义上最近的后继非空箱（初值即首个非空箱）
+        nearest = next(i for i, v in enumerate(original) if v is not None)
+        for i in range(NUM_PERM - 1, -1, -1):
+            if original[i] is not None:
+                nearest = i
+            else:
+                sig[i] = original[nearest] + ((nearest - i) % NUM_PERM) * _DENSIFY_OFFSET
+    return sig
+
+
+def buckets(norm: str) -> List[int]:
+    """规范化文本的 LSH 分桶键（带分段序号，有符号 64 位整数）"""
+    if not norm:
+        return []
+    sig = signature(norm)
+    keys = []
+    for band in range(BANDS):
+        packed = struct.pack(_BAND_FORMAT, band, *sig[band * ROWS:(band + 1) * ROWS])
+        digest = hashlib.blake2b(packed, digest_size=8).digest()
+        keys.append(int.from_bytes(digest, "little", signed=True))
+    return keys
+
+
+def index_rows(conn: Connection, rows: Iterable[Tuple[str, str]]):
+    """写入/覆盖题目的分桶，rows 为 (question_id, content)"""
+    rows = list(rows)
+    if not rows:
+        return
+    remove_ids(conn, [qid for qid, _ in rows])
+    params = [
+        {"question_id": qid, "bucket": key}
+        for qid, content in rows
+        for key in set(buckets(normalize_text(content)))
+    ]
+    if params:
+        # Core insert() 按多行 VALUES 批量发送（PostgreSQL 上 text() 的 executemany 为逐行执行）
+        conn.execute(insert(QuestionLSHBucket.__table__), params)
+
+
+def remove_ids(conn: Connection, question_ids: Sequence[str]):
+    """删除题目的分桶"""
+    for i in range(0, len(question_ids), BATCH_SIZE):
+        conn.execute(
+            text("DELETE FROM question_lsh_buckets WHERE question_id IN :ids").bindparams(
+                bindparam("ids", expanding=True)
+            ),
+            {"ids": list(question_ids[i:i + BATCH_SIZE])}
+        )
+
+
+def backfill(conn: Connection):
+    """为尚未建立分桶的题目补建索引（题干为空的题目没有分桶，按 id 游标推进）"""
+    after = ""
+    while True:
+        rows = conn.execute(text(
+            "SELECT q.id, q.content FROM questions q "
+            "WHERE q.id > :after AND NOT EXISTS ("
+            "SELECT 1 FROM question_lsh_buckets b WHERE b.question_id = q.id) "
+            "ORDER BY q.id LIMIT :limit"
+        ), {"after": after, "limit": BATCH_SIZE}).all()
+        if not rows:
+            break
+        index_rows(conn, rows)
+        after = rows[-1][0]
+
+
+class DuplicateDetector:
+    """基于 LSH 候选集的题库查重"""
+
+    def __init__(self, db: Session, threshold: float = SIMILARITY_THRESHOLD):
+        self.db = db
+        self.threshold = threshold
+
+    def _candidate_ids(self, keys: Set[int]) -> Dict[int, List[str]]:
+        """分桶键 -> 已有题目ID"""
+        result: Dict[int, List[str]] = {}
+        keys = list(keys)
+        conn = self.db.connection()
+        for i in range(0, len(keys), BATCH_SIZE):
+            rows = conn.execute(
+                text("SELECT bucket, question_id FROM question_lsh_buckets WHERE bucket IN :keys").bindparams(
+                    bindparam("keys", expanding=True)
+                ),
+                {"keys": keys[i:i + BATCH_SIZE]}
+            ).all()
+            for key, qid in rows:
+                result.setdefault(key, []).append(qid)
+        return result
+
+    def _load_norms(self, question_ids: Set[str]) -> Dict[str, str]:
+        norms = {}
+        ids = list(question_ids)
+        for i in range(0, len(ids), BATCH_SIZE):
+            rows = self.db.query(Question.id, Question.content).filter(
+                Question.id.in_(ids[i:i + BATCH_SIZE])
+            ).all()
+            for qid, content in rows:
+                norms[qid] = normalize_text(content)
+        return norms
+
+    def is_similar(self, a: str, b: str) -> bool:
+        """Check if two normalized strings are similar"""
+        if len(a) <= FUZZY_MIN_LENGTH or abs(len(a) - len(b)) > FUZZY_MAX_LENGTH_DIFF:
+            return False
+        return SequenceMatcher(None, a, b).ratio() > self.threshold
+
+    def _existing_hashes(self, hashes: Set[str], ignore_ids: AbstractSet[str] = frozenset()) -> Set[str]:
+        """已存在于题库中的 content_hash（走索引的 IN 查询），忽略 ignore_ids 中的题目"""
+        found = set()
+        hashes = list(hashes)
+        for i in range(0, len(hashes), BATCH_SIZE):
+            chunk = hashes[i:i + BATCH_SIZE]
+            if ignore_ids:
+                rows = self.db.query(Question.content_hash, Question.id).filter(
+                    Question.content_hash.in_(chunk)
+                ).all()
+                found.update(h for h, qid in rows if qid not in ignore_ids)
+            else:
+                rows = self.db.query(Question.content_hash).filter(
+                    Question.content_hash.in_(chunk)
+                ).distinct().all()
+                found.update(h for (h,) in rows)
+        return found
+
+    def find_duplicates(
+        self,
+        contents: Sequence[Optional[str]],
+        ignore_ids: AbstractSet[str] = frozenset()
+    ) -> List[Optional[str]]:
+        """
+        检查一批题干是否与题库中已有题目重复
+
+        ignore_ids 中的题目不参与比较（分批导入时排除本次导入已写入的题目）
+
+        Returns:
+            与 contents 一一对应：None / DUPLICATE_EXACT / DUPLICATE_SIMILAR
+        """
+        norms = [normalize_text(c) for c in contents]
+        hashes = [content_hash(c) for c in contents]
+
+        # Strategy 1: 规范化后完全相同，content_hash 索引查找
+        existing_hashes = self._existing_hashes({h for h in hashes if h}, ignore_ids)
+        results: List[Optional[str]] = [
+            DUPLICATE_EXACT if h and h in existing_hashes else None
+            for h in hashes
+        ]
+
+        # Strategy 2: 较长题干的模糊匹配，只比较 LSH 候选
+        fuzzy = [
+            i for i, norm in enumerate(norms)
+            if results[i] is None and len(norm) > FUZZY_MIN_LENGTH
+        ]
+        incoming_keys = {i: buckets(norms[i]) for i in fuzzy}
+        key_map = self._candidate_ids({k for keys in incoming_keys.values() for k in keys})
+        candidates = {
+            i: {qid for k in keys for qid in key_map.get(k, ()) if qid not in ignore_ids}
+            for i, keys in incoming_keys.items()
+        }
+        existing = self._load_norms(set().union(*candidates.values()) if candidates else set())
+
+        for i, cand_ids in candidates.items():
+            if any(self.is_similar(norms[i], existing[qid]) for qid in cand_ids if qid in existing):
+                results[i] = DUPLICATE_SIMILAR
+        return results
@@ -2,20 +2,210 @@
 Document Parser Service for importing questions from various formats
 Enhanced version v2 with improved tolerance for various input formats
 """
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Union, BinaryIO, Iterable, Iterator, Generator
+import os
 import re
 import json
+import math
+import mmap
+import multiprocessing
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from io import BytesIO
+from itertools import chain, islice
 
 from docx import Document
+from lxml import etree
 from openpyxl import load_workbook
 import logging
 
+from config import settings
+
 logger = logging.getLogger(__name__)
 
+# 并行解析时每块的最少行数（块太小时进程间传输的开销超过解析本身）
+PARALLEL_MIN_CHUNK_LINES = 2000
+
+
+# 解析器输入：文件路径、二进制文件对象或 bytes
+DocumentSource = Union[str, os.PathLike, BinaryIO, bytes]
+
+
+def _as_file(source: DocumentSource):
+    """python-docx / openpyxl 可直接接受路径或文件对象，bytes 包装为 BytesIO"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return BytesIO(source)
+    return source
+
+
+# ============ docx 流式读取（word/document.xml） ============
+W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+W_BODY = W_NS + 'body'
+W_P = W_NS + 'p'
+W_TBL = W_NS + 'tbl'
+W_TC = W_NS + 'tc'
+W_R = W_NS + 'r'
+W_HYPERLINK = W_NS + 'hyperlink'
+W_T = W_NS + 't'
+W_BR = W_NS + 'br'
+W_TYPE = W_NS + 'type'
+# 与 python-docx Run.text 一致：w:br 仅换行符类型（默认）为 "\n"，分页/分栏为空
+W_RUN_TEXT = {
+    W_NS + 'tab': '\t',
+    W_NS + 'ptab': '\t',
+    W_NS + 'cr': '\n',
+    W_NS + 'noBreakHyphen': '-',
+}
+
+
+def _docx_run_text(run) -> str:
+    parts = []
+    for child in run:
+        tag = child.tag
+        if tag == W_T:
+            parts.append(child.text or '')
+        elif tag == W_BR:
+            if child.get(W_TYPE, 'textWrapping') == 'textWrapping':
+                parts.append('\n')
+        else:
+            parts.append(W_RUN_TEXT.get(tag, ''))
+    return ''.join(parts)
+
+
+def _docx_paragraph_text(p) -> str:
+    """段落文本（同 python-docx Paragraph.text：直接子级 w:r 与 w:hyperlink 中的 w:r）"""
+    parts = []
+    for child in p:
+        if child.tag == W_R:
+            parts.append(_docx_run_text(child))
+        elif child.tag == W_HYPERLINK:
+            parts.extend(_docx_run_text(r) for r in child if r.tag == W_R)
+    return ''.join(parts)
+
+
+def iter_docx_lines(source: DocumentSource) -> Iterator[str]:
+    """
+    按文档顺序逐行产出 docx 正文段落和表格单元格内段落的文本
+
+    直接从 zip 中 iterparse word/document.xml，处理完的正文元素随即清除，不构建整篇文档树。
+    文本框等嵌在段落内部的段落不单独产出（与 python-docx 的 doc.paragraphs 一致）。
+    """
+    with zipfile.ZipFile(_as_file(source)) as archive:
+        with archive.open('word/document.xml') as xml:
+            for _, elem in etree.iterparse(xml, events=('end',), tag=(W_P, W_TBL)):
+                parent = elem.getparent()
+                parent_tag = parent.tag if parent is not None else None
+                if elem.tag == W_P and parent_tag in (W_BODY, W_TC):
+                    yield _docx_paragraph_text(elem)
+                if parent_tag == W_BODY:
+                    # 正文级段落/表格处理完毕，释放它和之前的兄弟节点
+                    elem.clear()
+                    while elem.getprevious() is not None:
+                        del parent[0]
+
+
+# ============ 行解析模式（模块加载时编译一次） ============
+
+# 题目编号
+QUESTION_START = (
+    r'(?:[\(（\[]?\d+[\)）\]]?[.、．:\s])'
+    r'|(?:第\s*\d+\s*题[.、．:\s]*)'
+    r'|(?:题目\s*\d+[.、．:\s]*)'
+    r'|(?:Question\s*\d+[.、．:\s]*)'
+)
+QUESTION_START_RE = re.compile(r'^(?:' + QUESTION_START + r')', re.IGNORECASE)
+# 去除题目编号（编号后的分隔符全部去掉）
+QUESTION_NUMBER_RE = re.compile(
+    r'^(?:'
+    r'[\(（\[]?\d+[\)）\]]?[.、．:\s]+'
+    r'|第\s*\d+\s*题[.、．:\s]*'
+    r'|题目\s*\d+[.、．:\s]*'
+    r'|Question\s*\d+[.、．:\s]*'
+    r')',
+    re.IGNORECASE
+)
+
+# 题型标签（整行，用于跳过）
+TYPE_LABEL = (
+    r'[一二三四五六七八九十百]+\s*[、.．:：\s]\s*(?:单选|多选|判断|简答|填空|选择|问答|论述|混合)?(?:格式)?(?:测试)?(?:题)?'
+    r'|[\(（]?[一二三四五六七八九十]+[\)）]?\s*$'
+    r'|(?:单选|多选|判断|简答|填空|选择|问答|论述)(?:题)?\s*[:：]?\s*$'
+    r'|第[一二三四五六七八九十]+(?:部分|章|节)'
+)
+TYPE_LABEL_RE = re.compile(r'^(?:' + TYPE_LABEL + r')$', re.IGNORECASE)
+
+# 行首分类：题型标签优先，否则题目编号（等价于依次尝试上面两个模式）
+LINE_HEAD_RE = re.compile(
+    r'(?P<label>(?:' + TYPE_LABEL + r')$)|(?P<start>' + QUESTION_START + r')',
+    re.IGNORECASE
+)
+
+# 答案匹配模式（增强版，按顺序尝试）
+ANSWER_PATTERNS = [
+    # 标准格式: 答案：A / 【答案】AB / (答案) C / [答案]D
+    re.compile(r'[\[【\(（]\s*(?:参考|正确|标准)?\s*答案\s*[\]】\)）]\s*[:：]?\s*([A-Fa-f]+)', re.IGNORECASE),
+    re.compile(r'(?:参考|正确|标准)?\s*答案\s*[:：]\s*([A-Fa-f]+)', re.IGNORECASE),
+    re.compile(r'Answer\s*[:：]?\s*([A-Fa-f]+)', re.IGNORECASE),
+    # 判断题答案
+    re.compile(r'[\[【\(（]\s*(?:参考|正确|标准)?\s*答案\s*[\]】\)）]\s*[:：]?\s*(正确|错误|对|错|√|×|T|F|Y|N|True|False|YES|NO)', re.IGNORECASE),
+    re.compile(r'(?:参考|正确|标准)?\s*答案\s*[:：]\s*(正确|错误|对|错|√|×|T|F|Y|N|True|False|YES|NO)', re.IGNORECASE),
+    # 简洁格式: 答案A / 答案:A（紧凑）
+    re.compile(r'^答案\s*[:：]?\s*([A-Fa-f]+)\s*$', re.IGNORECASE),
+    re.compile(r'^答案\s*[:：]?\s*(正确|错误|对|错|√|×|T|F|Y|N)\s*$', re.IGNORECASE),
+]
+# 每个答案模式都包含 "答案" 或 "Answer"
+ANSWER_MENTION_RE = re.compile(r'答案|answer', re.IGNORECASE)
+
+# 解析匹配模式
+EXPLANATION_PATTERNS = [
+    re.compile(r'[\[【\(（]\s*(?:答案)?\s*(?:解析|分析|说明|详解|解答)\s*[\]】\)）]\s*[:：]?\s*(.+)', re.IGNORECASE | re.DOTALL),
+    re.compile(r'(?:解析|分析|详解|解答)\s*[:：]\s*(.+)', re.IGNORECASE | re.DOTALL),
+]
+EXPLANATION_HINT_RE = re.compile(r'解析|分析|详解|说明|explanation')  # 在小写后的行中查找
+
+# 判断题独立答案行（Y/N 也支持）
+JUDGE_ANSWER_LINE_RE = re.compile(
+    r'^[\s　]*(正确|错误|对|错|√|×|T|F|True|False|YES|NO|Y|N|是|否)[\s　]*$',
+    re.IGNORECASE
+)
+TRUE_ANSWERS = frozenset(['正确', '对', '√', 't', 'true', 'yes', 'y', '是'])
+FALSE_ANSWERS = frozenset(['错误', '错', '×', 'f', 'false', 'no', 'n', '否'])
+
+# 选项提取
+OPTION_LETTER_RE = re.compile(r'[A-Fa-f]')
+OPTION_STARTS_RE = re.compile(r'(?:^|[\s　]+)[\(（\[]?([A-Fa-f])[\]\)）]?[.、．:：\s]')
+OPTION_MULTI_RE = re.compile(
+    r'[\(（\[]?([A-Fa-f])[\]\)）]?[.、．:：]?\s*([^A-Fa-f\(（\[\s][^\s]*(?:\s+[^A-Fa-f\(（\[\s][^\s]*)*)'
+)
+OPTION_SINGLE_RE = re.compile(r'^[\s　]*[\(（\[]?([A-Fa-f])[\]\)）]?[.、．:：\s]\s*(.+)$')
+OPTION_LOOSE_RE = re.compile(r'^[\s　]*([A-Fa-f])\s*([^\sA-Fa-f].{2,})$')
+CJK_RE = re.compile(r'[\u4e00-\u9fff]')
+
+# 题型判断
+NON_LETTER_RE = re.compile(r'[^A-Z]')
+LETTER_ANSWER_RE = re.compile(r'^[A-F]+$')
+TRAILING_BLANK_RE = re.compile(r'[（\(]\s*[)）]\s*$')
+BLANK_RE = re.compile(r'[（\(]\s*[)）]')
+
+# 行分类结果（DocumentParser._classify_line）
+LINE_SKIP = "skip"
+LINE_QUESTION = "question"
+LINE_ANSWER = "answer"
+LINE_EXPLANATION = "explanation"
+LINE_OPTIONS = "options"
+LINE_JUDGE = "judge"
+LINE_TEXT = "text"
+
 
 class ParsedQuestion:
-    """Parsed question data structure"""
+    """Parsed question data structure（__slots__：大批量解析时每题不带 __dict__）"""
+    __slots__ = (
+        "index", "type", "content", "options", "answer", "explanation", "difficulty",
+        "tags", "source", "parse_status", "parse_message", "question_id", "is_duplicate"
+    )
+
     def __init__(
         self,
         index: int,
@@ -28,7 +218,8 @@ class ParsedQuestion:
         tags: Optional[List[str]] = None,
         source: Optional[str] = None,
         parse_status: str = "success",
-        parse_message: Optional[str] = None
+        parse_message: Optional[str] = None,
+        question_id: Optional[str] = None
     ):
         self.index = index
         self.type = type
@@ -41,10 +232,13 @@ class ParsedQuestion:
         self.source = source
         self.parse_status = parse_status
         self.parse_message = parse_message
+        self.question_id = question_id  # 题库中的题目ID（导出后再导入时，upsert 按此更新）
+        self.is_duplicate = False  # 与题库中已有题目重复（导入查重时标记）
 
     def to_dict(self) -> Dict[str, Any]:
         return {
             "index": self.index,
+            "id": self.question_id,
             "type": self.type,
             "content": self.content,
             "options": self.options if self.options else None,
@@ -68,53 +262,12 @@ class DocumentParser:
     JUDGE_KEYWORDS_STRICT = ['正确', '错误', '对', '错', '√', '×']
 
     def __init__(self):
-        # ============ 题目编号模式 ============
-        self.question_start_pattern = re.compile(
-            r'^(?:'
-            r'(?:[\(（\[]?\d+[\)）\]]?[.、．:\s])'
-            r'|(?:第\s*\d+\s*题[.、．:\s]*)'
-            r'|(?:题目\s*\d+[.、．:\s]*)'
-            r'|(?:Question\s*\d+[.、．:\s]*)'
-            r')',
-            re.IGNORECASE
-        )
-
-        # ============ 答案匹配模式（增强版） ============
-        self.answer_patterns = [
-            # 标准格式: 答案：A / 【答案】AB / (答案) C / [答案]D
-            re.compile(r'[\[【\(（]\s*(?:参考|正确|标准)?\s*答案\s*[\]】\)）]\s*[:：]?\s*([A-Fa-f]+)', re.IGNORECASE),
-            re.compile(r'(?:参考|正确|标准)?\s*答案\s*[:：]\s*([A-Fa-f]+)', re.IGNORECASE),
-            re.compile(r'Answer\s*[:：]?\s*([A-Fa-f]+)', re.IGNORECASE),
-            # 判断题答案
-            re.compile(r'[\[【\(（]\s*(?:参考|正确|标准)?\s*答案\s*[\]】\)）]\s*[:：]?\s*(正确|错误|对|错|√|×|T|F|Y|N|True|False|YES|NO)', re.IGNORECASE),
-            re.compile(r'(?:参考|正确|标准)?\s*答案\s*[:：]\s*(正确|错误|对|错|√|×|T|F|Y|N|True|False|YES|NO)', re.IGNORECASE),
-            # 简洁格式: 答案A / 答案:A（紧凑）
-            re.compile(r'^答案\s*[:：]?\s*([A-Fa-f]+)\s*$', re.IGNORECASE),
-            re.compile(r'^答案\s*[:：]?\s*(正确|错误|对|错|√|×|T|F|Y|N)\s*$', re.IGNORECASE),
-        ]
-
-        # ============ 解析匹配模式 ============
-        self.explanation_patterns = [
-            re.compile(r'[\[【\(（]\s*(?:答案)?\s*(?:解析|分析|说明|详解|解答)\s*[\]】\)）]\s*[:：]?\s*(.+)', re.IGNORECASE | re.DOTALL),
-            re.compile(r'(?:解析|分析|详解|解答)\s*[:：]\s*(.+)', re.IGNORECASE | re.DOTALL),
-        ]
-
-        # ============ 题型标签模式（用于跳过） ============
-        self.type_label_pattern = re.compile(
-            r'^(?:'
-            r'[一二三四五六七八九十百]+\s*[、.．:：\s]\s*(?:单选|多选|判断|简答|填空|选择|问答|论述|混合)?(?:格式)?(?:测试)?(?:题)?'
-            r'|[\(（]?[一二三四五六七八九十]+[\)）]?\s*$'
-            r'|(?:单选|多选|判断|简答|填空|选择|问答|论述)(?:题)?\s*[:：]?\s*$'
-            r'|第[一二三四五六七八九十]+(?:部分|章|节)'
-            r')$',
-            re.IGNORECASE
-        )
-
-        # ============ 判断题独立答案行（Y/N 也支持） ============
-        self.judge_answer_line_pattern = re.compile(
-            r'^[\s　]*(正确|错误|对|错|√|×|T|F|True|False|YES|NO|Y|N|是|否)[\s　]*$',
-            re.IGNORECASE
-        )
+        # 模式在模块加载时编译一次，各实例共用
+        self.question_start_pattern = QUESTION_START_RE
+        self.answer_patterns = ANSWER_PATTERNS
+        self.explanation_patterns = EXPLANATION_PATTERNS
+        self.type_label_pattern = TYPE_LABEL_RE
+        self.judge_answer_line_pattern = JUDGE_ANSWER_LINE_RE
 
     def _extract_options_from_line(self, line: str) -> Dict[str, str]:
         """
@@ -128,10 +281,7 @@ class DocumentParser:
 
         # 策略1：检测是否是一行多选项格式（通过统计选项字母数量）
         # 匹配所有可能的选项开头位置
-        option_starts = list(re.finditer(
-            r'(?:^|[\s　]+)[\(（\[]?([A-Fa-f])[\]\)）]?[.、．:：\s]',
-            line
-        ))
+        option_starts = list(OPTION_STARTS_RE.finditer(line))
 
         if len(option_starts) >= 2:
             # 一行有多个选项，按位置切分
@@ -150,10 +300,7 @@ class DocumentParser:
 
         # 策略2：尝试用更宽松的多选项分隔模式
         # 支持 "A.xxx  B.xxx" 或 "A xxx  B xxx" 格式（多空格分隔）
-        multi_match = re.findall(
-            r'[\(（\[]?([A-Fa-f])[\]\)）]?[.、．:：]?\s*([^A-Fa-f\(（\[\s][^\s]*(?:\s+[^A-Fa-f\(（\[\s][^\s]*)*)',
-            line
-        )
+        multi_match = OPTION_MULTI_RE.findall(line)
         if len(multi_match) >= 2:
             for opt_key, opt_val in multi_match:
                 opt_val = opt_val.strip()
@@ -163,21 +310,18 @@ class DocumentParser:
 
         # 策略3：单选项匹配
         # 标准格式: A. A、 A） (A) [A] 等
-        match = re.match(
-            r'^[\s　]*[\(（\[]?([A-Fa-f])[\]\)）]?[.、．:：\s]\s*(.+)$',
-            line
-        )
+        match = OPTION_SINGLE_RE.match(line)
         if match:
             options[match.group(1).upper()] = match.group(2).strip()
             return options
 
         # 策略4：宽松格式 - 字母后直接跟中文内容（无分隔符）
-        match = re.match(r'^[\s　]*([A-Fa-f])\s*([^\sA-Fa-f].{2,})$', line)
+        match = OPTION_LOOSE_RE.match(line)
         if match:
             opt_key = match.group(1).upper()
             opt_val = match.group(2).strip()
             # 验证：内容应该包含中文或者是合理的选项内容
-            if re.search(r'[\u4e00-\u9fff]', opt_val) or len(opt_val) >= 2:
+            if CJK_RE.search(opt_val) or len(opt_val) >= 2:
                 options[opt_key] = opt_val
                 return options
 
@@ -186,15 +330,15 @@ class DocumentParser:
     def _try_match_answer(self, line: str) -> Optional[str]:
         """尝试匹配答案"""
         line = line.strip()
-        for pattern in self.answer_patterns:
+        for pattern in ANSWER_PATTERNS:
             match = pattern.search(line)
             if match:
                 ans = match.group(1).strip()
                 # 规范化判断题答案
                 ans_lower = ans.lower()
-                if ans_lower in ['正确', '对', '√', 't', 'true', 'yes', 'y', '是']:
+                if ans_lower in TRUE_ANSWERS:
                     return '正确'
-                elif ans_lower in ['错误', '错', '×', 'f', 'false', 'no', 'n', '否']:
+                elif ans_lower in FALSE_ANSWERS:
                     return '错误'
                 return ans.upper()
         return None
@@ -202,7 +346,7 @@ class DocumentParser:
     def _try_match_explanation(self, line: str) -> Optional[str]:
         """尝试匹配解析"""
         line = line.strip()
-        for pattern in self.explanation_patterns:
+        for pattern in EXPLANATION_PATTERNS:
             match = pattern.search(line)
             if match:
                 return match.group(1).strip()
@@ -210,144 +354,209 @@ class DocumentParser:
 
     def _is_judge_answer_line(self, line: str) -> Optional[str]:
         """检查是否是判断题的独立答案行"""
-        match = self.judge_answer_line_pattern.match(line.strip())
+        match = JUDGE_ANSWER_LINE_RE.match(line.strip())
         if match:
             ans = match.group(1).strip()
             ans_lower = ans.lower()
-            if ans_lower in ['正确', '对', '√', 't', 'true', 'yes', 'y', '是']:
+            if ans_lower in TRUE_ANSWERS:
                 return '正确'
-            elif ans_lower in ['错误', '错', '×', 'f', 'false', 'no', 'n', '否']:
+            elif ans_lower in FALSE_ANSWERS:
                 return '错误'
         return None
 
     def _is_question_start(self, line: str) -> bool:
         """检查是否是题目开始行"""
-        return bool(self.question_start_pattern.match(line.strip()))
+        return bool(QUESTION_START_RE.match(line.strip()))
 
     def _remove_question_number(self, line: str) -> str:
         """移除题目编号，返回纯题干"""
-        line = line.strip()
-        result = re.sub(
-            r'^(?:'
-            r'[\(（\[]?\d+[\)）\]]?[.、．:\s]+'
-            r'|第\s*\d+\s*题[.、．:\s]*'
-            r'|题目\s*\d+[.、．:\s]*'
-            r'|Question\s*\d+[.、．:\s]*'
-            r')',
-            '', line, flags=re.IGNORECASE
-        ).strip()
-        return result
+        return QUESTION_NUMBER_RE.sub('', line.strip()).strip()
 
     def _should_skip_line(self, line: str) -> bool:
         """检查是否应该跳过该行"""
         line = line.strip()
         if not line:
             return True
-        if self.type_label_pattern.match(line):
+        if TYPE_LABEL_RE.match(line):
             return True
         return False
 
     def _is_likely_answer_line(self, line: str) -> bool:
         """检查该行是否可能包含答案（用于提前检测）"""
         line = line.strip().lower()
-        return bool(re.search(r'答案|answer', line))
+        return '答案' in line or 'answer' in line
 
     def _is_likely_explanation_line(self, line: str) -> bool:
         """检查该行是否可能包含解析"""
         line = line.strip().lower()
-        return bool(re.search(r'解析|分析|详解|说明|explanation', line))
+        return bool(EXPLANATION_HINT_RE.search(line))
+
+    def _classify_line(self, line: str, in_question: bool) -> Tuple[str, Any]:
+        """
+        单行分类（line 已 strip），返回 (LINE_* 类别, 数据)
+
+        判断顺序：空行/题型标签 -> 题目开头 -> 答案 -> 解析 -> 选项 -> 判断题答案行 -> 答案/解析（宽松）-> 题干续行。
+        行首的题型标签与题目编号由 LINE_HEAD_RE 一次匹配；其余各步先用关键词/选项字母等廉价条件
+        排除不可能匹配的行，结果与逐项尝试全部模式一致。
+        """
+        if not line:
+            return LINE_SKIP, None
+        head = LINE_HEAD_RE.match(line)
+        if head:
+            if head.lastgroup == "label":
+                return LINE_SKIP, None
+            return LINE_QUESTION, self._remove_question_number(line)
+        if not in_question:
+            return LINE_SKIP, None
+
+        # 优先检查答案行（因为答案行可能包含选项字母如 "答案：A"）
+        lower = line.lower()
+        if '答案' in lower or 'answer' in lower:
+            answer = self._try_match_answer(line)
+            if answer:
+                return LINE_ANSWER, answer
+
+        # 检查解析行
+        explanation_hint = EXPLANATION_HINT_RE.search(lower) is not None
+        if explanation_hint:
+            explanation = self._try_match_explanation(line)
+            if explanation:
+                return LINE_EXPLANATION, explanation
+
+        # 尝试提取选项（各策略都需要选项字母）
+        if OPTION_LETTER_RE.search(line):
+            options = self._extract_options_from_line(line)
+            if options:
+                return LINE_OPTIONS, options
+
+        # 检查是否是判断题的独立答案行
+        judge_ans = self._is_judge_answer_line(line)
+        if judge_ans:
+            return LINE_JUDGE, judge_ans
+
+        # 宽松匹配答案：答案模式都含 "答案"/"answer"（忽略大小写），上面已按小写关键词尝试过的行不会再匹配
+        if ANSWER_MENTION_RE.search(line):
+            answer = self._try_match_answer(line)
+            if answer:
+                return LINE_ANSWER, answer
+
+        # 宽松匹配解析：只有含 "解答" 而不含上面关键词的行可能在这里匹配
+        if not explanation_hint and '解答' in line:
+            explanation = self._try_match_explanation(line)
+            if explanation:
+                return LINE_EXPLANATION, explanation
+
+        return LINE_TEXT, None
 
     def _parse_lines(self, lines: List[str]) -> List[ParsedQuestion]:
         """通用的行解析逻辑"""
-        questions = []
+        return list(self._iter_lines(lines))
+
+    def _iter_lines(self, lines: Iterable[str]) -> Iterator[ParsedQuestion]:
+        """逐题解析文本行：遇到下一题开头（或文本结束）时确定上一题的题型、校验后产出"""
         current_question = None
         question_index = 0
         pending_judge_options = []
 
         for line_num, line in enumerate(lines):
             line = line.strip()
+            kind, value = self._classify_line(line, current_question is not None)
 
-            # 跳过空行和题型标签
-            if self._should_skip_line(line):
+            # 跳过空行、题型标签和第一题之前的内容
+            if kind == LINE_SKIP:
                 continue
 
-            # 检查是否是新题目开头
-            if self._is_question_start(line):
-                # 处理上一题的判断题选项
-                if current_question and pending_judge_options:
-                    self._process_pending_judge_options(current_question, pending_judge_options)
-                    pending_judge_options = []
-
-                # 保存上一题
+            if kind == LINE_QUESTION:
+                # 完成上一题（包括暂存的判断题选项）
                 if current_question:
-                    questions.append(current_question)
+                    yield self._finish_question(current_question, pending_judge_options)
+                    pending_judge_options = []
 
                 # 开始新题目
                 question_index += 1
-                content = self._remove_question_number(line)
                 current_question = ParsedQuestion(
                     index=question_index,
-                    content=content
+                    content=value
                 )
-                continue
+            elif kind == LINE_ANSWER:
+                current_question.answer = value
+            elif kind == LINE_EXPLANATION:
+                current_question.explanation = value
+            elif kind == LINE_OPTIONS:
+                current_question.options.update(value)
+            elif kind == LINE_JUDGE:
+                pending_judge_options.append((line_num, value, line))
+            elif not current_question.options and not pending_judge_options:
+                # 都不匹配，追加到题目内容（仅当还没有选项时）
+                current_question.content += " " + line
 
-            if not current_question:
-                continue
+        # 处理最后一题
+        if current_question:
+            yield self._finish_question(current_question, pending_judge_options)
 
-            # 优先检查答案行（因为答案行可能包含选项字母如 "答案：A"）
-            if self._is_likely_answer_line(line):
-                answer = self._try_match_answer(line)
-                if answer:
-                    current_question.answer = answer
-                    continue
-
-            # 检查解析行
-            if self._is_likely_explanation_line(line):
-                explanation = self._try_match_explanation(line)
-                if explanation:
-                    current_question.explanation = explanation
-                    continue
-
-            # 尝试提取选项
-            options = self._extract_options_from_line(line)
-            if options:
-                current_question.options.update(options)
-                continue
+    def _finish_question(self, question: ParsedQuestion, pending_judge_options: List[Tuple[int, str, str]]) -> ParsedQuestion:
+        """处理判断题选项，确定题型并验证"""
+        if pending_judge_options:
+            self._process_pending_judge_options(question, pending_judge_options)
+        question.type = self._determine_type(question)
+        self._validate_question(question)
+        return question
 
-            # 检查是否是判断题的独立答案行
-            judge_ans = self._is_judge_answer_line(line)
-            if judge_ans:
-                pending_judge_options.append((line_num, judge_ans, line))
-                continue
+    def parse_lines(self, lines: List[str]) -> List[ParsedQuestion]:
+        """解析文本行（见 iter_lines）"""
+        return list(self.iter_lines(lines))
 
-            # 尝试匹配答案（非明显答案行）
-            answer = self._try_match_answer(line)
-            if answer:
-                current_question.answer = answer
-                continue
-
-            # 尝试匹配解析（非明显解析行）
-            explanation = self._try_match_explanation(line)
-            if explanation:
-                current_question.explanation = explanation
-                continue
-
-            # 都不匹配，追加到题目内容（仅当还没有选项时）
-            if not current_question.options and not pending_judge_options:
-                current_question.content += " " + line
+    def iter_lines(self, lines: List[str]) -> Iterator[ParsedQuestion]:
+        """
+        逐题解析文本行；行数达到 PARSER_PARALLEL_MIN_LINES 时按题目边界分块，在进程池中并行解析
 
-        # 处理最后一题
-        if current_question:
-            if pending_judge_options:
-                self._process_pending_judge_options(current_question, pending_judge_options)
-            questions.append(current_question)
+        每块（除第一块外）都从题目开头行开始，而解析器遇到新题目时会结束上一题（包括暂存的判断题选项），
+        所以各块互不依赖；合并时按块顺序重新编号，结果与顺序解析一致。
+        """
+        workers = _parser_workers()
+        if workers < 2 or len(lines) < settings.PARSER_PARALLEL_MIN_LINES:
+            yield from self._iter_lines(lines)
+            return
 
-        # 确定题型和验证
-        for q in questions:
-            q.type = self._determine_type(q)
-            self._validate_question(q)
+        chunk_lines = max(PARALLEL_MIN_CHUNK_LINES, math.ceil(len(lines) / (workers * 4)))
+        chunks = self._split_at_questions(lines, chunk_lines)
+        if len(chunks) < 2:
+            yield from self._iter_lines(lines)
+            return
 
-        return questions
+        # 按块顺序取结果，前面的块解析完即可产出
+        futures = [_get_pool().submit(_parse_chunk, chunk) for chunk in chunks]
+        offset = 0
+        for i, future in enumerate(futures):
+            try:
+                chunk_questions = future.result()
+            except BrokenProcessPool:
+                logger.exception("Parser process pool broken, parsing remaining chunks sequentially")
+                _reset_pool()
+                for q in self._iter_lines([line for chunk in chunks[i:] for line in chunk]):
+                    q.index += offset
+                    yield q
+                return
+            for q in chunk_questions:
+                q.index += offset
+                yield q
+            offset += len(chunk_questions)
+
+    def _split_at_questions(self, lines: List[str], chunk_lines: int) -> List[List[str]]:
+        """按约 chunk_lines 行切分，切分点为其后的第一个题目开头行"""
+        chunks = []
+        start = 0
+        pos = chunk_lines
+        while pos < len(lines):
+            head = LINE_HEAD_RE.match(lines[pos].strip())
+            if head and head.lastgroup == "start":
+                chunks.append(lines[start:pos])
+                start = pos
+                pos += chunk_lines
+            else:
+                pos += 1
+        chunks.append(lines[start:])
+        return chunks
 
     def _process_pending_judge_options(self, question: ParsedQuestion, pending_options: List[Tuple[int, str, str]]):
         """处理暂存的判断题选项"""
@@ -377,7 +586,7 @@ class DocumentParser:
 
             # 根据答案判断单选/多选
             if question.answer:
-                answer_clean = re.sub(r'[^A-Z]', '', question.answer.upper())
+                answer_clean = NON_LETTER_RE.sub('', question.answer.upper())
                 if len(answer_clean) > 1:
                     return 'multiple'
                 elif len(answer_clean) == 1:
@@ -394,14 +603,14 @@ class DocumentParser:
             ans = question.answer.strip()
             if ans in self.JUDGE_KEYWORDS_STRICT or ans.upper() in ['T', 'F', 'TRUE', 'FALSE', 'Y', 'N', 'YES', 'NO', '正确', '错误']:
                 return 'judge'
-            if re.match(r'^[A-F]+$', ans.upper()):
+            if LETTER_ANSWER_RE.match(ans.upper()):
                 return 'single' if len(ans) == 1 else 'multiple'
 
         # 题干内容启发式
         content = question.content
-        if re.search(r'[（\(]\s*[)）]\s*$', content):
+        if TRAILING_BLANK_RE.search(content):
             return 'judge'
-        if re.search(r'[（\(]\s*[)）]', content):
+        if BLANK_RE.search(content):
             return 'single'
 
         return 'essay'
@@ -428,100 +637,200 @@ class DocumentParser:
             question.parse_status = 'warning'
             question.parse_message = '；'.join(warnings)
 
-    def parse_txt(self, file_content: bytes) -> List[ParsedQuestion]:
+    def _decode_text(self, data) -> str:
+        for encoding in ['utf-8', 'gbk', 'gb2312', 'utf-16', 'latin-1']:
+            try:
+                return str(data, encoding)
+            except (UnicodeDecodeError, LookupError):
+                continue
+        raise Exception("无法识别文件编码")
+
+    def _read_text(self, source: DocumentSource) -> str:
+        """读取文本文件；路径通过 mmap 直接解码，不额外复制一份 bytes"""
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return self._decode_text(source)
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return ""
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return self._decode_text(mm)
+        return self._decode_text(source.read())
+
+    def parse_txt(self, source: DocumentSource) -> List[ParsedQuestion]:
         """Parse text file (.txt)"""
-        try:
-            text = None
-            for encoding in ['utf-8', 'gbk', 'gb2312', 'utf-16', 'latin-1']:
-                try:
-                    text = file_content.decode(encoding)
-                    break
-                except (UnicodeDecodeError, LookupError):
-                    continue
+        return list(self.iter_txt(source))
 
-            if text is None:
-                raise Exception("无法识别文件编码")
+    def iter_txt(self, source: DocumentSource) -> Iterator[ParsedQuestion]:
+        return _reraise_as("文本文件解析失败", self._iter_txt(source))
 
-            lines = text.split('\n')
-            return self._parse_lines(lines)
+    def _iter_txt(self, source: DocumentSource) -> Iterator[ParsedQuestion]:
+        text = self._read_text(source)
+        yield from self.iter_lines(text.split('\n'))
 
-        except Exception as e:
-            logger.error(f"Failed to parse text file: {e}")
-            raise Exception(f"文本文件解析失败: {str(e)}")
-
-    def parse_word(self, file_content: bytes) -> List[ParsedQuestion]:
+    def parse_word(self, source: DocumentSource) -> List[ParsedQuestion]:
         """Parse Word document (.docx)"""
+        return list(self.iter_word(source))
+
+    def iter_word(self, source: DocumentSource) -> Iterator[ParsedQuestion]:
+        return _reraise_as("Word文档解析失败", self._iter_word(source))
+
+    def _iter_word(self, source: DocumentSource) -> Iterator[ParsedQuestion]:
+        lines = iter_docx_lines(source)
         try:
-            doc = Document(BytesIO(file_content))
-            lines = [para.text for para in doc.paragraphs]
-            return self._parse_lines(lines)
+            # 打开 zip 和主文档在取第一行时发生
+            first = list(islice(lines, 1))
+        except (zipfile.BadZipFile, KeyError, etree.XMLSyntaxError) as e:
+            # 非标准结构（如主文档不在 word/document.xml）交给 python-docx 处理
+            logger.warning(f"Streaming docx read failed, falling back to python-docx: {e}")
+            if hasattr(source, 'seek'):
+                source.seek(0)
+            doc = Document(_as_file(source))
+            yield from self.iter_lines([para.text for para in doc.paragraphs])
+            return
+        lines = chain(first, lines)
 
-        except Exception as e:
-            logger.error(f"Failed to parse Word document: {e}")
-            raise Exception(f"Word文档解析失败: {str(e)}")
+        # 不会并行解析时边读边解析；否则先读出 PARSER_PARALLEL_MIN_LINES 行判断是否达到并行阈值，
+        # 达到时需要整篇文本行才能分块
+        if _parser_workers() < 2:
+            yield from self._iter_lines(lines)
+            return
+        head = list(islice(lines, settings.PARSER_PARALLEL_MIN_LINES))
+        if len(head) < settings.PARSER_PARALLEL_MIN_LINES:
+            yield from self._iter_lines(head)
+            return
+        head.extend(lines)
+        yield from self.iter_lines(head)
 
-    def parse_excel(self, file_content: bytes) -> List[ParsedQuestion]:
+    def parse_excel(self, source: DocumentSource, all_sheets: Optional[bool] = None) -> List[ParsedQuestion]:
         """Parse Excel document (.xlsx)"""
-        try:
-            wb = load_workbook(BytesIO(file_content))
-            ws = wb.active
-            questions = []
+        return list(self.iter_excel(source, all_sheets))
+
+    def iter_excel(self, source: DocumentSource, all_sheets: Optional[bool] = None) -> Iterator[ParsedQuestion]:
+        return _reraise_as("Excel文档解析失败", self._iter_excel(source, all_sheets))
 
-            headers = []
-            for cell in ws[1]:
-                headers.append(str(cell.value).lower() if cell.value else "")
+    def _iter_excel(self, source: DocumentSource, all_sheets: Optional[bool] = None) -> Iterator[ParsedQuestion]:
+        """
+        逐题产出 Excel 中的题目（openpyxl 只读模式按行流式读取，不在内存中构建整张表）
 
-            col_map = self._map_excel_columns(headers)
+        all_sheets 为 True 时解析所有工作表（默认取 EXCEL_IMPORT_ALL_SHEETS），否则只解析活动工作表；
+        多个工作表时在解析进程池中并行解析（源为文件路径或 bytes 时）。
+        题目序号为数据行号，多个工作表按表顺序连续编号。
+        """
+        if all_sheets is None:
+            all_sheets = settings.EXCEL_IMPORT_ALL_SHEETS
 
-            for row_idx, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=1):
-                if not any(row):
-                    continue
+        wb = load_workbook(_as_file(source), read_only=True)
+        try:
+            if not all_sheets:
+                yield from self._iter_sheet(wb.active, 0)
+                return
+            sheet_names = wb.sheetnames
+        finally:
+            wb.close()
+
+        parallel = (
+            len(sheet_names) > 1
+            and _parser_workers() > 1
+            and isinstance(source, (str, os.PathLike, bytes, bytearray))
+        )
+        if not parallel:
+            yield from self._iter_sheets(source, sheet_names, 0)
+            return
 
-                question = ParsedQuestion(index=row_idx)
+        futures = [_get_pool().submit(_parse_excel_sheet, source, name) for name in sheet_names]
+        offset = 0
+        for i, future in enumerate(futures):
+            try:
+                questions, rows = future.result()
+            except BrokenProcessPool:
+                logger.exception("Parser process pool broken, parsing remaining sheets sequentially")
+                _reset_pool()
+                yield from self._iter_sheets(source, sheet_names[i:], offset)
+                return
+            for q in questions:
+                q.index += offset
+                yield q
+            offset += rows
+
+    def _iter_sheets(self, source: DocumentSource, sheet_names: List[str], offset: int) -> Iterator[ParsedQuestion]:
+        """顺序解析多个工作表"""
+        wb = load_workbook(_as_file(source), read_only=True)
+        try:
+            for name in sheet_names:
+                offset += yield from self._iter_sheet(wb[name], offset)
+        finally:
+            wb.close()
+
+    def _iter_sheet(self, ws, offset: int) -> Generator[ParsedQuestion, None, int]:
+        """解析一个工作表（首行为表头），序号为 offset + 数据行号；返回数据行数"""
+        # 只读模式默认只读取文件中 <dimension> 记录的范围，部分工具写出的范围与实际数据不符
+        # （如只有 A1），重置后按实际的行逐行扫描
+        ws.reset_dimensions()
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return 0
+
+        headers = [str(value).lower() if value else "" for value in header]
+        col_map = self._map_excel_columns(headers)
+        width = len(headers)
+
+        row_count = 0
+        for row_count, row in enumerate(rows, start=1):
+            if not any(row):
+                continue
+            # 只读模式下每行只包含实际存在的单元格，不足时补齐
+            if len(row) < width:
+                row = row + (None,) * (width - len(row))
+            yield self._excel_row_question(row, col_map, offset + row_count)
+        return row_count
 
-                if col_map.get('content') is not None:
-                    question.content = str(row[col_map['content']]) if row[col_map['content']] else ""
+    def _excel_row_question(self, row: tuple, col_map: Dict[str, int], index: int) -> ParsedQuestion:
+        """表格中的一行转换为题目"""
+        question = ParsedQuestion(index=index)
 
-                if col_map.get('type') is not None:
-                    question.type = self._normalize_type(str(row[col_map['type']])) if row[col_map['type']] else "unknown"
+        if col_map.get('id') is not None:
+            qid = row[col_map['id']]
+            question.question_id = str(qid).strip() if qid and str(qid).strip() else None
 
-                if col_map.get('difficulty') is not None:
-                    question.difficulty = self._normalize_difficulty(str(row[col_map['difficulty']])) if row[col_map['difficulty']] else "medium"
+        if col_map.get('content') is not None:
+            question.content = str(row[col_map['content']]) if row[col_map['content']] else ""
 
-                if col_map.get('options') is not None:
-                    options_str = str(row[col_map['options']]) if row[col_map['options']] else ""
-                    question.options = self._parse_options_string(options_str)
-                else:
-                    for opt_key in ['A', 'B', 'C', 'D', 'E', 'F']:
-                        col_key = f'option_{opt_key}'
-                        if col_map.get(col_key) is not None:
-                            opt_value = str(row[col_map[col_key]]) if row[col_map[col_key]] else ""
-                            if opt_value and opt_value.lower() != 'none':
-                                question.options[opt_key] = opt_value
+        if col_map.get('type') is not None:
+            question.type = self._normalize_type(str(row[col_map['type']])) if row[col_map['type']] else "unknown"
 
-                if col_map.get('answer') is not None:
-                    ans = row[col_map['answer']]
-                    question.answer = str(ans).strip().upper() if ans else None
+        if col_map.get('difficulty') is not None:
+            question.difficulty = self._normalize_difficulty(str(row[col_map['difficulty']])) if row[col_map['difficulty']] else "medium"
 
-                if col_map.get('explanation') is not None:
-                    exp = row[col_map['explanation']]
-                    question.explanation = str(exp).strip() if exp and str(exp).lower() != 'none' else None
+        if col_map.get('options') is not None:
+            options_str = str(row[col_map['options']]) if row[col_map['options']] else ""
+            question.options = self._parse_options_string(options_str)
+        else:
+            for opt_key in ['A', 'B', 'C', 'D', 'E', 'F']:
+                col_key = f'option_{opt_key}'
+                if col_map.get(col_key) is not None:
+                    opt_value = str(row[col_map[col_key]]) if row[col_map[col_key]] else ""
+                    if opt_value and opt_value.lower() != 'none':
+                        question.options[opt_key] = opt_value
 
-                if col_map.get('source') is not None:
-                    src = row[col_map['source']]
-                    question.source = str(src).strip() if src and str(src).lower() != 'none' else None
+        if col_map.get('answer') is not None:
+            ans = row[col_map['answer']]
+            question.answer = str(ans).strip().upper() if ans else None
 
-                if question.type == "unknown":
-                    question.type = self._determine_type(question)
+        if col_map.get('explanation') is not None:
+            exp = row[col_map['explanation']]
+            question.explanation = str(exp).strip() if exp and str(exp).lower() != 'none' else None
 
-                self._validate_question(question)
-                questions.append(question)
+        if col_map.get('source') is not None:
+            src = row[col_map['source']]
+            question.source = str(src).strip() if src and str(src).lower() != 'none' else None
 
-            return questions
+        if question.type == "unknown":
+            question.type = self._determine_type(question)
 
-        except Exception as e:
-            logger.error(f"Failed to parse Excel document: {e}")
-            raise Exception(f"Excel文档解析失败: {str(e)}")
+        self._validate_question(question)
+        return question
 
     def _map_excel_columns(self, headers: List[str]) -> Dict[str, int]:
         """Map Excel column headers to field names"""
@@ -530,7 +839,10 @@ class DocumentParser:
         for idx, header in enumerate(headers):
             header_lower = header.lower().strip()
 
-            if any(k in header_lower for k in ['题目', '内容', 'content', 'question', '题干', '问题']):
+            # 题目ID列需在题干列之前判断（"题目id" 包含 "题目"）
+            if header_lower in ['id', '题目id', 'question id', 'questionid', 'question_id']:
+                col_map['id'] = idx
+            elif any(k in header_lower for k in ['题目', '内容', 'content', 'question', '题干', '问题']):
                 col_map['content'] = idx
             elif any(k in header_lower for k in ['题型', 'type', '类型']):
                 col_map['type'] = idx
@@ -612,6 +924,65 @@ class DocumentParser:
             return 'medium'
 
 
+# ============ 并行解析进程池 ============
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _parser_workers() -> int:
+    return settings.PARSER_WORKERS or os.cpu_count() or 1
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """解析进程池（首次使用时创建，进程内共用）；以 spawn 方式启动，避免在多线程的服务进程中 fork"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=_parser_workers(),
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _reraise_as(message: str, questions: Iterator[ParsedQuestion]) -> Iterator[ParsedQuestion]:
+    """解析过程中的异常统一包装为 "<message>: <原因>"（生成器在迭代时才会抛出）"""
+    try:
+        yield from questions
+    except Exception as e:
+        logger.error(f"{message}: {e}")
+        raise Exception(f"{message}: {str(e)}")
+
+
+def _parse_chunk(lines: List[str]) -> List[ParsedQuestion]:
+    """进程池任务：顺序解析一块行"""
+    return DocumentParser()._parse_lines(lines)
+
+
+def _parse_excel_sheet(source: DocumentSource, sheet_name: str) -> Tuple[List[ParsedQuestion], int]:
+    """进程池任务：解析 Excel 的一个工作表，返回 (题目, 数据行数)"""
+    wb = load_workbook(_as_file(source), read_only=True)
+    try:
+        sheet = DocumentParser()._iter_sheet(wb[sheet_name], 0)
+        questions = []
+        while True:
+            try:
+                questions.append(next(sheet))
+            except StopIteration as stop:
+                return questions, stop.value
+    finally:
+        wb.close()
+
+
 def get_document_parser() -> DocumentParser:
     """Get document parser instance"""
     return DocumentParser()
@@ -2,13 +2,13 @@
 考试服务 - 智能组卷算法
 """
 import random
-import json
 from typing import List, Dict, Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_
 
 from models.question import Question
 from models.exam import Exam
+from services import tag_service
 
 
 class ExamConfig:
@@ -20,6 +20,7 @@ class ExamConfig:
         category_ids: Optional[List[str]] = None,
         question_types: Optional[List[str]] = None,
         difficulties: Optional[List[str]] = None,
+        tags: Optional[List[str]] = None,
         type_counts: Optional[Dict[str, int]] = None,
         time_limit: Optional[int] = None,
         shuffle_options: bool = True,
@@ -30,6 +31,7 @@ class ExamConfig:
         self.category_ids = category_ids or []
         self.question_types = question_types or []
         self.difficulties = difficulties or []
+        self.tags = tags or []
         self.type_counts = type_counts or {}  # {type: count}
         self.time_limit = time_limit
         self.shuffle_options = shuffle_options
@@ -104,6 +106,10 @@ class ExamService:
         if config.difficulties:
             filters.append(Question.difficulty.in_(config.difficulties))
         
+        # 标签筛选（包含任一标签）
+        if config.tags:
+            filters.append(tag_service.tag_filter(config.tags))
+        
         # 查询符合条件的题目
         questions = self.db.query(Question).filter(and_(*filters)).all()
         
@@ -158,7 +164,7 @@ class ExamService:
             
             if config.shuffle_options and q.options:
                 try:
-                    options = json.loads(q.options)
+                    options = q.options
                     if isinstance(options, dict):
                         # 保存原始答案
                         original_answer = q.answer
@@ -178,7 +184,7 @@ class ExamService:
                             answer_mapping[old_label] = new_label
                         
                         # 更新选项
-                        q.options = json.dumps(new_options, ensure_ascii=False)
+                        q.options = new_options
                         
                         # 更新答案映射
                         if q.type == "single":
@@ -202,15 +208,16 @@ class ExamService:
         exam = Exam(
             title=config.title,
             mode=config.mode,
-            config=json.dumps({
+            config={
                 "category_ids": config.category_ids,
                 "question_types": config.question_types,
                 "difficulties": config.difficulties,
+                "tags": config.tags,
                 "type_counts": config.type_counts,
                 "shuffle_options": config.shuffle_options,
                 "shuffle_questions": config.shuffle_questions
-            }, ensure_ascii=False),
-            question_ids=json.dumps(question_ids),
+            },
+            question_ids=question_ids,
             total_count=len(questions),
             total_score=total_score,
             time_limit=config.time_limit,
@@ -233,7 +240,7 @@ class ExamService:
         Returns:
             List[Question]: 题目列表
         """
-        question_ids = json.loads(exam.question_ids)
+        question_ids = exam.question_ids or []
         questions = self.db.query(Question).filter(Question.id.in_(question_ids)).all()
         
         # 按照试卷中的顺序排序
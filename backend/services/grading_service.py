@@ -1,7 +1,6 @@
 """
 评分服务 - 自动评分算法
 """
-import json
 from typing import Dict, List, Tuple
 from sqlalchemy.orm import Session
 from datetime import datetime
@@ -27,7 +26,7 @@ class GradingService:
         Returns:
             Dict: 评分结果
         """
-        question_ids = json.loads(exam.question_ids)
+        question_ids = exam.question_ids or []
         questions = self.db.query(Question).filter(Question.id.in_(question_ids)).all()
         question_map = {q.id: q for q in questions}
         
@@ -67,7 +66,7 @@ class GradingService:
         score = correct_count
         
         # 更新考试记录
-        exam.answers = json.dumps(answers, ensure_ascii=False)
+        exam.answers = dict(answers)
         exam.status = "completed"
         exam.score = score
         exam.correct_count = correct_count
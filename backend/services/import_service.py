@@ -0,0 +1,957 @@
+"""
+题目导入服务 - 文件解析、查重、批量写入、后台导入任务
+
+题目在内存中构建为行数据（客户端生成 UUID），按批次写入：
+- PostgreSQL: COPY ... FROM STDIN
+- 其他数据库: insert().values() executemany
+写入后显式同步检索索引、查重索引和统计计数器（批量写入不经过 ORM flush 钩子）。
+
+upsert 模式按题目ID（无ID时按题干哈希）匹配题库中已有的题目，以
+INSERT ... ON CONFLICT (id) DO UPDATE 一次写入整批新建和更新的题目（PostgreSQL / SQLite）。
+
+后台任务（ImportJob）复用同一套解析与导入逻辑，按分块提交并记录进度，
+每道题的结果写入 import_job_items 供分页查询。
+
+导入预览会话（mode="preview"）把解析与查重结果暂存在同样的两张表中，按文件内容哈希复用；
+客户端分页查看后只需提交会话 token 和排除的题目序号。会话按 解析 -> 查重 -> 序列化 的生成器流水线
+分批写入，也可以边解析边把预览结果流式返回（stream_session）。
+"""
+import io
+import json
+import logging
+import math
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import AbstractSet, Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from collections import Counter
+
+from sqlalchemy import insert, select, case, func, bindparam
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from models.database import SessionLocal
+from models.question import Question
+from models.import_job import ImportJob, ImportJobItem
+from services import question_sync, counter_service, change_feed
+from services.dedup_service import DuplicateDetector, DUPLICATE_EXACT, DUPLICATE_SIMILAR
+from services.document_parser import get_document_parser, ParsedQuestion, DocumentSource
+from config import settings
+from utils.exceptions import ParameterError, NotFoundError
+from utils.helpers import to_json, from_json, normalize_text, content_hash
+from utils.upload import remove_file
+
+logger = logging.getLogger(__name__)
+
+INSERT_BATCH_SIZE = 1000
+# 写入的分块大小（后台任务按块提交并更新进度）
+IMPORT_CHUNK_SIZE = 500
+# 导入预览每批查重/写入的题目数
+PREVIEW_BATCH_SIZE = 500
+
+SUPPORTED_EXTENSIONS = ['.docx', '.xlsx', '.txt', '.json']
+
+DUPLICATE_MESSAGES = {
+    DUPLICATE_EXACT: "内容完全相同（忽略标点）",
+    DUPLICATE_SIMILAR: "内容高度相似（疑似OCR误差）",
+}
+
+JOB_TERMINAL_STATUSES = ("completed", "failed")
+
+QUESTION_TYPES = {"single", "multiple", "judge", "essay"}
+DIFFICULTIES = {"easy", "medium", "hard"}
+
+# 批量写入的列（created_at/updated_at 使用数据库默认值，change_seq 在写入时分配）
+INSERT_COLUMNS = [
+    "id", "category_id", "type", "difficulty", "content", "content_hash", "options",
+    "answer", "answer_status", "explanation", "explanation_status", "tags", "source", "change_seq"
+]
+
+# upsert 时为空则保留原值的列（导入文件中缺少的列不会清空已有数据）
+UPSERT_KEPT_COLUMNS = ["category_id", "options", "answer", "explanation", "tags", "source"]
+
+
+def _clean_text(value: Any) -> Optional[str]:
+    if value and str(value).strip():
+        return str(value).strip()
+    return None
+
+
+def _copy_literal(value: Any) -> str:
+    # CSV 格式中未加引号的空字段为 NULL，加引号的字段按原样（包括空字符串）；JSON 列写入 JSON 文本
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        value = to_json(value)
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def iter_file(filename: str, source: DocumentSource) -> Iterator[ParsedQuestion]:
+    """
+    按文件扩展名逐题解析上传的题目文件（source 为临时文件路径、文件对象或 bytes）
+
+    格式不支持时立即抛出 ParameterError
+    """
+    filename = filename.lower()
+    parser = get_document_parser()
+
+    if filename.endswith('.docx'):
+        return parser.iter_word(source)
+    if filename.endswith('.xlsx'):
+        return parser.iter_excel(source)
+    if filename.endswith('.txt'):
+        return parser.iter_txt(source)
+    if filename.endswith('.json'):
+        return _iter_json(source)
+    raise ParameterError("不支持的文件格式")
+
+
+def _iter_json(source: DocumentSource) -> Iterator[ParsedQuestion]:
+    # Parse JSON format
+    if isinstance(source, (bytes, bytearray)):
+        data = json.loads(source.decode('utf-8'))
+    elif isinstance(source, (str, os.PathLike)):
+        with open(source, encoding='utf-8') as f:
+            data = json.load(f)
+    else:
+        data = json.load(source)
+    for idx, q in enumerate(data.get('questions', []), 1):
+        yield ParsedQuestion(
+            index=idx,
+            type=q.get('type', 'unknown'),
+            content=q.get('content', ''),
+            options=q.get('options'),
+            answer=q.get('answer'),
+            explanation=q.get('explanation'),
+            difficulty=q.get('difficulty', 'medium'),
+            tags=q.get('tags', []),
+            source=q.get('source'),
+            question_id=q.get('id')
+        )
+
+
+def _batched(items: Iterable, size: int) -> Iterator[List]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _duplicate_message(reason: Optional[str]) -> Optional[str]:
+    return f"系统已存在相似题目: {DUPLICATE_MESSAGES[reason]}" if reason else None
+
+
+def mark_duplicates(
+    db: Session,
+    parsed_questions: List[ParsedQuestion],
+    ignore_ids: AbstractSet[str] = frozenset()
+) -> List[Optional[str]]:
+    """
+    标记与题库中已有题目重复的解析结果（LSH 候选，再精确/模糊匹配），返回每道题的重复原因
+
+    ignore_ids 中的题目不参与比较（分批导入时为本次已写入的题目）
+    """
+    dup_reasons = DuplicateDetector(db).find_duplicates([q.content for q in parsed_questions], ignore_ids)
+    for q, reason in zip(parsed_questions, dup_reasons):
+        q.is_duplicate = reason is not None
+        if reason:
+            q.parse_message = _duplicate_message(reason)
+            q.parse_status = "warning"
+    return dup_reasons
+
+
+class ParseStatistics:
+    """解析结果统计（逐题累加，查重标记之后调用 add）"""
+
+    def __init__(self):
+        self.total = 0
+        self.success = 0
+        self.warning = 0
+        self.duplicate = 0
+        self.complete = 0
+        self.has_answer = 0
+        self.only_content = 0
+        self.by_type: Dict[str, int] = {}
+
+    def add(self, q: ParsedQuestion):
+        has_answer = bool(q.answer and str(q.answer).strip())
+        has_explanation = bool(q.explanation and str(q.explanation).strip())
+        self.total += 1
+        self.success += q.parse_status == "success"
+        self.warning += q.parse_status == "warning"
+        self.duplicate += q.is_duplicate
+        self.complete += has_answer and has_explanation
+        self.has_answer += has_answer
+        self.only_content += not has_answer and not has_explanation
+        self.by_type[q.type] = self.by_type.get(q.type, 0) + 1
+
+    def to_dict(self) -> Dict:
+        return {
+            "total": self.total,
+            "success": self.success,
+            "warning": self.warning,
+            "duplicate": self.duplicate,
+            "complete": self.complete,
+            "hasAnswer": self.has_answer,
+            "onlyContent": self.only_content,
+            "byType": self.by_type
+        }
+
+
+def preview_dict(q: ParsedQuestion) -> Dict:
+    """解析结果转为预览数据（带 isDuplicate 标记）"""
+    d = q.to_dict()
+    d['isDuplicate'] = q.is_duplicate
+    return d
+
+
+def _upsert_statement(dialect_name: str):
+    """INSERT ... ON CONFLICT (id) DO UPDATE（题干/题型/难度覆盖，其余列为空时保留原值）"""
+    if dialect_name == "postgresql":
+        stmt = postgresql.insert(Question.__table__)
+    elif dialect_name == "sqlite":
+        stmt = sqlite.insert(Question.__table__)
+    else:
+        raise ParameterError("当前数据库不支持更新导入")
+
+    table = Question.__table__
+    excluded = stmt.excluded
+    set_ = {col: excluded[col] for col in ("type", "difficulty", "content", "content_hash")}
+    set_.update({col: func.coalesce(excluded[col], table.c[col]) for col in UPSERT_KEPT_COLUMNS})
+    # 未提供答案/解析时保留原状态（如 AI 生成待确认）
+    set_["answer_status"] = case(
+        (excluded.answer.is_(None), table.c.answer_status), else_=excluded.answer_status
+    )
+    set_["explanation_status"] = case(
+        (excluded.explanation.is_(None), table.c.explanation_status), else_=excluded.explanation_status
+    )
+    set_["updated_at"] = func.now()
+    set_["change_seq"] = excluded.change_seq
+    return stmt.on_conflict_do_update(index_elements=[table.c.id], set_=set_)
+
+
+class ImportService:
+    """题目导入服务"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def build_row(
+        self,
+        q_data: Dict,
+        category_id: str,
+        default_type: str,
+        default_difficulty: str
+    ) -> Dict:
+        """
+        将导入数据转换为 questions 表的行
+
+        题型/难度为空或为 unknown 时使用默认值
+
+        Raises:
+            ValueError: 题干为空，或题型/难度不是表约束允许的值
+        """
+        content = q_data.get('content')
+        if not content:
+            raise ValueError("题目内容为空")
+
+        # 未提供或解析器未识别（unknown）的题型使用默认题型
+        q_type = q_data.get('type')
+        if not q_type or q_type == "unknown":
+            q_type = default_type
+        if q_type not in QUESTION_TYPES:
+            raise ValueError(f"无效的题型: {q_type}")
+
+        difficulty = q_data.get('difficulty') or default_difficulty
+        if difficulty not in DIFFICULTIES:
+            raise ValueError(f"无效的难度: {difficulty}")
+
+        # Determine status & Clean data
+        answer = _clean_text(q_data.get('answer'))
+        explanation = _clean_text(q_data.get('explanation'))
+
+        return {
+            "id": str(uuid.uuid4()),
+            "category_id": q_data.get('categoryId') or category_id,
+            "type": q_type,
+            "difficulty": difficulty,
+            "content": content,
+            "content_hash": content_hash(content),
+            "options": q_data.get('options'),
+            "answer": answer,
+            "answer_status": "confirmed" if answer else "none",
+            "explanation": explanation,
+            "explanation_status": "confirmed" if explanation else "none",
+            "tags": q_data.get('tags', []),
+            "source": q_data.get('source')
+        }
+
+    def import_questions(
+        self,
+        questions: List[Dict],
+        category_id: str = "default",
+        default_type: str = "single",
+        default_difficulty: str = "medium",
+        skip_errors: bool = True,
+        skip_duplicates: bool = True,
+        duplicates: Optional[Sequence[bool]] = None,
+        lines: Optional[Sequence[int]] = None,
+        on_chunk: Optional[Callable[[List[Dict]], None]] = None,
+        upsert: bool = False,
+        seen_norms: Optional[Set[str]] = None
+    ) -> Dict:
+        """
+        导入题目（调用方负责提交事务）
+
+        duplicates 为已计算的查重结果（与 questions 一一对应）时不再重复查重；
+        lines 为结果中报告的行号（默认 1..n）；
+        seen_norms 为分批调用时共享的已写入题干（规范化），同一文件中跨批重复的题目同样跳过；
+        查重一次完成后按 IMPORT_CHUNK_SIZE 分块写入；on_chunk 在每块写入后以该块每道题的结果调用：
+        {"line", "status": imported/updated/skipped/failed, "questionId", "message"}
+
+        upsert 为 True 时按题目 id（无 id 时按题干哈希）匹配已有题目并更新，不参与查重；
+        category_id 只作为新题目的默认分类，已有题目仅在单独指定 categoryId 时修改分类。
+        题目带有题库中不存在的 id 时按该 id 新建。
+
+        Returns:
+            Dict: 导入结果
+        """
+        # Check all incoming questions against the bank in one pass (LSH candidates only),
+        # before any chunk is written so rows from this import never count as duplicates
+        if skip_duplicates and duplicates is None:
+            duplicates = [
+                reason is not None
+                for reason in DuplicateDetector(self.db).find_duplicates([q.get('content') for q in questions])
+            ]
+
+        matches = self.match_existing(questions) if upsert else None
+
+        created = []
+        updated = []
+        errors = []
+        skipped = []
+        # Track normalized content in current batch to prevent self-duplication
+        batch_norms = seen_norms if seen_norms is not None else set()
+        batch_ids = set()
+
+        for start in range(0, len(questions), IMPORT_CHUNK_SIZE):
+            chunk = questions[start:start + IMPORT_CHUNK_SIZE]
+            rows = []
+            new_rows = []
+            results = []
+            for offset, q_data in enumerate(chunk):
+                pos = start + offset
+                idx = lines[pos] if lines else pos + 1
+                try:
+                    row = self.build_row(q_data, category_id, default_type, default_difficulty)
+                except ValueError as e:
+                    if skip_errors:
+                        errors.append({"line": idx, "message": str(e)})
+                        results.append({"line": idx, "status": "failed", "questionId": None, "message": str(e)})
+                        continue
+                    raise ParameterError(f"第 {idx} 题：{str(e)}")
+
+                existing = matches[pos] if upsert else None
+                if upsert:
+                    if existing:
+                        row["id"] = existing
+                        # 空值保留原值（见 _upsert_statement）
+                        row["category_id"] = q_data.get('categoryId')
+                        row["options"] = row["options"] or None
+                        row["tags"] = row["tags"] or None
+                    elif q_data.get('id'):
+                        row["id"] = str(q_data['id'])
+                    # 同一条语句中不能两次更新同一行
+                    if row["id"] in batch_ids:
+                        message = "题目ID在导入数据中重复，跳过导入"
+                        skipped.append({"line": idx, "message": message})
+                        results.append({"line": idx, "status": "skipped", "questionId": None, "message": message})
+                        continue
+                    batch_ids.add(row["id"])
+
+                # Check for duplicate
+                if skip_duplicates and existing:
+                    batch_norms.add(normalize_text(row["content"]))
+                elif skip_duplicates:
+                    q_norm = normalize_text(row["content"])
+                    if duplicates[pos] or q_norm in batch_norms:
+                        message = "题目已存在或高度相似，跳过导入"
+                        skipped.append({"line": idx, "message": message})
+                        results.append({"line": idx, "status": "skipped", "questionId": None, "message": message})
+                        continue
+                    batch_norms.add(q_norm)
+
+                rows.append(row)
+                if existing:
+                    updated.append(row["id"])
+                    results.append({"line": idx, "status": "updated", "questionId": row["id"], "message": None})
+                else:
+                    new_rows.append(row)
+                    results.append({"line": idx, "status": "imported", "questionId": row["id"], "message": None})
+
+            if upsert:
+                self.upsert_rows(rows)
+            else:
+                self.insert_rows(rows)
+            created.extend(
+                {
+                    "id": row["id"],
+                    "content": row["content"][:50] + "..." if len(row["content"]) > 50 else row["content"]
+                }
+                for row in new_rows
+            )
+            if on_chunk:
+                on_chunk(results)
+
+        return {
+            "total": len(questions),
+            "success": len(created) + len(updated),
+            "updated": len(updated),
+            "failed": len(errors),
+            "skipped": len(skipped),
+            "created": created[:10],  # Return first 10
+            "importedIds": [c["id"] for c in created],  # 所有新建的题目ID
+            "updatedIds": updated,
+            "errors": errors,
+            "skippedDetails": skipped
+        }
+
+    def insert_rows(self, rows: List[Dict]):
+        """批量写入题目行并同步派生数据"""
+        if not rows:
+            return
+
+        conn = self.db.connection()
+        seq = change_feed.next_seq(conn)
+        for row in rows:
+            row["change_seq"] = seq
+        for i in range(0, len(rows), INSERT_BATCH_SIZE):
+            batch = rows[i:i + INSERT_BATCH_SIZE]
+            if conn.dialect.name == "postgresql":
+                self._copy_rows(conn, batch)
+            else:
+                conn.execute(insert(Question.__table__), batch)
+
+        question_sync.questions_written(conn, [(row["id"], row["content"]) for row in rows])
+        question_sync.tags_written(conn, [(row["id"], row["tags"]) for row in rows])
+        question_sync.counters_changed(conn, counter_service.keys_for_rows(rows))
+
+    def match_existing(self, questions: List[Dict]) -> List[Optional[str]]:
+        """
+        upsert 匹配：带 id 且题库中存在该 id 的按 id，没有 id 的按题干哈希（多道相同时取最早创建的）
+
+        Returns:
+            与 questions 一一对应的已有题目 id（未匹配为 None）
+        """
+        conn = self.db.connection()
+        ids = list({str(q['id']) for q in questions if q.get('id')})
+        hashes = list({content_hash(q['content']) for q in questions if not q.get('id') and q.get('content')})
+
+        found_ids = set()
+        for i in range(0, len(ids), INSERT_BATCH_SIZE):
+            found_ids.update(conn.execute(
+                select(Question.id).where(Question.id.in_(bindparam("ids", expanding=True))),
+                {"ids": ids[i:i + INSERT_BATCH_SIZE]}
+            ).scalars())
+
+        by_hash = {}
+        for i in range(0, len(hashes), INSERT_BATCH_SIZE):
+            rows = conn.execute(
+                select(Question.content_hash, Question.id).where(
+                    Question.content_hash.in_(bindparam("hashes", expanding=True))
+                ).order_by(Question.created_at.desc(), Question.id.desc()),
+                {"hashes": hashes[i:i + INSERT_BATCH_SIZE]}
+            ).all()
+            # 按创建时间倒序覆盖，最终保留最早的
+            by_hash.update({h: qid for h, qid in rows})
+
+        matches = []
+        for q in questions:
+            if q.get('id'):
+                matches.append(str(q['id']) if str(q['id']) in found_ids else None)
+            elif q.get('content'):
+                matches.append(by_hash.get(content_hash(q['content'])))
+            else:
+                matches.append(None)
+        return matches
+
+    def upsert_rows(self, rows: List[Dict]):
+        """按 id 批量新建/更新题目行并同步派生数据"""
+        if not rows:
+            return
+
+        conn = self.db.connection()
+        ids = [row["id"] for row in rows]
+        # 计数器增量 = 写入后 - 写入前（更新的题目可能保留原状态，不能按行数据计算）
+        delta = question_sync.removal_delta(conn, ids)
+
+        seq = change_feed.next_seq(conn)
+        for row in rows:
+            row["change_seq"] = seq
+        stmt = _upsert_statement(conn.dialect.name)
+        for i in range(0, len(rows), INSERT_BATCH_SIZE):
+            conn.execute(stmt, rows[i:i + INSERT_BATCH_SIZE])
+
+        if settings.QUESTION_COUNTERS_ENABLED:
+            delta.update(counter_service.keys_for_ids(conn, ids))
+        question_sync.questions_written(conn, [(row["id"], row["content"]) for row in rows])
+        question_sync.tags_written(conn, [(row["id"], row["tags"]) for row in rows if row["tags"] is not None])
+        question_sync.counters_changed(conn, delta)
+        # 按原 id 重新导入已删除的题目时撤销删除墓碑
+        change_feed.forget_deleted(conn, ids)
+
+    def _copy_rows(self, conn, rows: List[Dict]):
+        """PostgreSQL COPY FROM STDIN (CSV)"""
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write(",".join(_copy_literal(row[col]) for col in INSERT_COLUMNS))
+            buffer.write("\n")
+        buffer.seek(0)
+
+        cursor = conn.connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY questions ({', '.join(INSERT_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                buffer
+            )
+        finally:
+            cursor.close()
+
+
+# ============ 后台导入任务 ============
+
+def job_to_dict(job: ImportJob) -> Dict:
+    """导入任务状态"""
+    return {
+        "id": job.id,
+        "status": job.status,
+        "filename": job.filename,
+        "totalCount": job.total_count,
+        "parsedCount": job.parsed_count,
+        "dedupedCount": job.deduped_count,
+        "insertedCount": job.inserted_count,
+        "updatedCount": job.updated_count or 0,
+        "skippedCount": job.skipped_count,
+        "failedCount": job.failed_count,
+        "progress": (
+            job.inserted_count + (job.updated_count or 0) + job.skipped_count + job.failed_count
+        ) / job.total_count if job.total_count else 0,
+        "statistics": from_json(job.statistics),
+        "errorMessage": job.error_message,
+        "createdAt": job.created_at.isoformat() if job.created_at else None,
+        "startedAt": job.started_at.isoformat() if job.started_at else None,
+        "updatedAt": job.updated_at.isoformat() if job.updated_at else None,
+        "completedAt": job.completed_at.isoformat() if job.completed_at else None
+    }
+
+
+def job_item_to_dict(item: ImportJobItem) -> Dict:
+    """导入任务中单道题目的结果"""
+    return {
+        "line": item.line,
+        "status": item.status,
+        "isDuplicate": item.is_duplicate,
+        "questionId": item.question_id,
+        "message": item.message,
+        "question": from_json(item.data)
+    }
+
+
+def create_job(db: Session, filename: str, options: Dict) -> ImportJob:
+    """创建导入任务（调用方随后调度 run_job）"""
+    job = ImportJob(filename=filename, status="pending", options=to_json(options))
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def run_job(job_id: str, path: str):
+    """
+    执行导入任务：逐批 解析 -> 查重 -> 分块写入
+
+    同步函数，由 BackgroundTasks 放到线程池中运行，使用独立的数据库会话。
+    path 为上传时写入的临时文件，任务结束后删除。
+    文件按 PREVIEW_BATCH_SIZE 道题一批流式解析，内存中只保留当前一批；题目总数在解析完之前未知，
+    total_count 随解析逐批增加。查重时排除本次已写入的题目，与一次性查重的结果一致。
+    """
+    db = SessionLocal()
+    try:
+        job = db.query(ImportJob).filter(ImportJob.id == job_id).first()
+        if not job:
+            return
+        options = from_json(job.options, {})
+
+        job.status = "importing"
+        job.started_at = datetime.utcnow()
+        db.commit()
+
+        default_type = options.get("defaultType", "single")
+        importer = ImportService(db)
+        stats = ParseStatistics()
+        imported_ids: Set[str] = set()
+        seen_norms: Set[str] = set()
+        batch_by_line: Dict[int, ParsedQuestion] = {}
+
+        def on_chunk(results: List[Dict]):
+            for r in results:
+                q = batch_by_line[r["line"]]
+                db.add(ImportJobItem(
+                    job_id=job_id,
+                    line=r["line"],
+                    status=r["status"],
+                    is_duplicate=q.is_duplicate,
+                    question_id=r["questionId"],
+                    message=r["message"] or q.parse_message,
+                    data=to_json(preview_dict(q))
+                ))
+            job.inserted_count += sum(1 for r in results if r["status"] == "imported")
+            job.skipped_count += sum(1 for r in results if r["status"] == "skipped")
+            job.failed_count += sum(1 for r in results if r["status"] == "failed")
+            db.commit()
+
+        line = 0
+        for batch in _batched(iter_file(job.filename, path), PREVIEW_BATCH_SIZE):
+            dup_reasons = mark_duplicates(db, batch, imported_ids)
+            for q in batch:
+                stats.add(q)
+            job.total_count += len(batch)
+            job.parsed_count += len(batch)
+            job.deduped_count += len(batch)
+            job.statistics = to_json(stats.to_dict())
+            db.commit()
+
+            lines = list(range(line + 1, line + len(batch) + 1))
+            batch_by_line = dict(zip(lines, batch))
+            result = importer.import_questions(
+                [q.to_dict() for q in batch],
+                category_id=options.get("categoryId") or "default",
+                default_type=default_type,
+                default_difficulty=options.get("defaultDifficulty", "medium"),
+                skip_errors=True,
+                skip_duplicates=options.get("skipDuplicates", True),
+                duplicates=[reason is not None for reason in dup_reasons],
+                lines=lines,
+                on_chunk=on_chunk,
+                seen_norms=seen_norms
+            )
+            imported_ids.update(result["importedIds"])
+            line += len(batch)
+
+        job.status = "completed"
+        job.completed_at = datetime.utcnow()
+        db.commit()
+
+    except Exception as e:
+        logger.exception("Import job %s failed", job_id)
+        db.rollback()
+        job = db.query(ImportJob).filter(ImportJob.id == job_id).first()
+        if job:
+            job.status = "failed"
+            job.error_message = str(e)
+            job.completed_at = datetime.utcnow()
+            db.commit()
+    finally:
+        db.close()
+        remove_file(path)
+
+
+# ============ 导入预览会话 ============
+
+def _purge_expired_sessions(db: Session):
+    expire_before = datetime.utcnow() - timedelta(hours=settings.IMPORT_SESSION_TTL_HOURS)
+    expired = db.query(ImportJob).filter(
+        ImportJob.mode == "preview",
+        ImportJob.created_at < expire_before
+    )
+    expired_ids = expired.with_entities(ImportJob.id).scalar_subquery()
+    db.query(ImportJobItem).filter(ImportJobItem.job_id.in_(expired_ids)).delete(synchronize_session=False)
+    expired.delete(synchronize_session=False)
+
+
+def _item_question(item: ImportJobItem) -> ParsedQuestion:
+    """暂存的解析结果还原为 ParsedQuestion（查重标记除外）"""
+    d = from_json(item.data, {})
+    return ParsedQuestion(
+        index=d.get("index", item.line),
+        type=d.get("type", "unknown"),
+        content=d.get("content", ""),
+        options=d.get("options"),
+        answer=d.get("answer"),
+        explanation=d.get("explanation"),
+        difficulty=d.get("difficulty", "medium"),
+        tags=d.get("tags"),
+        source=d.get("source"),
+        parse_status=d.get("parseStatus", "success"),
+        parse_message=d.get("parseMessage"),
+        question_id=d.get("id")
+    )
+
+
+def _session_question(data: Dict, is_duplicate: bool, message: Optional[str]) -> Dict:
+    data["isDuplicate"] = is_duplicate
+    if is_duplicate:
+        data["parseStatus"] = "warning"
+        data["parseMessage"] = message
+    return data
+
+
+def session_item_to_dict(item: ImportJobItem) -> Dict:
+    """预览会话中的一道题（与 /import/preview 原有的题目格式一致）"""
+    return _session_question(from_json(item.data, {}), bool(item.is_duplicate), item.message)
+
+
+def _apply_duplicates(db: Session, job: ImportJob, items: List[ImportJobItem], parsed_questions: List[ParsedQuestion]):
+    """查重并写回会话（items 与 parsed_questions 一一对应，parsed_questions 为未标记的解析结果）"""
+    dup_reasons = DuplicateDetector(db).find_duplicates([q.content for q in parsed_questions])
+    stats = ParseStatistics()
+    for item, q, reason in zip(items, parsed_questions, dup_reasons):
+        item.is_duplicate = reason is not None
+        item.message = _duplicate_message(reason)
+        q.is_duplicate = reason is not None
+        if reason:
+            q.parse_status = "warning"
+        stats.add(q)
+    job.statistics = to_json(stats.to_dict())
+    job.deduped_count = len(items)
+    job.bank_version = change_feed.bank_version(db)
+
+
+def _session_items(db: Session, job: ImportJob) -> List[ImportJobItem]:
+    return db.query(ImportJobItem).filter(ImportJobItem.job_id == job.id).order_by(ImportJobItem.line).all()
+
+
+def refresh_session(db: Session, job: ImportJob):
+    """题库在预览后有变化时重新查重（不重新解析文件）"""
+    if job.bank_version == change_feed.bank_version(db):
+        return
+    items = _session_items(db, job)
+    _apply_duplicates(db, job, items, [_item_question(item) for item in items])
+    db.commit()
+
+
+def find_session(db: Session, filename: str, file_hash: str) -> Optional[ImportJob]:
+    """同一文件（内容哈希）未使用的预览会话，题库有变化时先重新查重"""
+    _purge_expired_sessions(db)
+    db.commit()
+
+    ext = os.path.splitext(filename)[1]
+    for job in db.query(ImportJob).filter(
+        ImportJob.mode == "preview",
+        ImportJob.file_hash == file_hash,
+        ImportJob.status == "ready"
+    ).order_by(ImportJob.created_at.desc()):
+        if job.filename.endswith(ext):
+            refresh_session(db, job)
+            return job
+    return None
+
+
+def fill_session(db: Session, job: ImportJob, questions: Iterable[ParsedQuestion]) -> Iterator[Dict]:
+    """
+    解析结果逐批查重、写入会话，逐题产出预览数据（格式同 session_item_to_dict）
+
+    解析 -> 查重 -> 序列化在同一趟中完成，每次只保留 PREVIEW_BATCH_SIZE 道题；统计逐题累加。
+    每批写入后立即提交、再产出该批结果，调用方按自己的节奏读取时不会一直占用数据库写锁；
+    全部完成后会话状态改为 ready（之前不能用于导入）。出错时删除已写入的部分并重新抛出；
+    调用方中途停止读取时会话保持 parsing 状态，过期后清理。
+    """
+    job_id = job.id
+    detector = DuplicateDetector(db)
+    stats = ParseStatistics()
+    line = 0
+    try:
+        for batch in _batched(questions, PREVIEW_BATCH_SIZE):
+            dup_reasons = detector.find_duplicates([q.content for q in batch])
+            rows = []
+            previews = []
+            for q, reason in zip(batch, dup_reasons):
+                line += 1
+                # 暂存未标记的解析结果，查重标记单独保存（题库变化后重新查重）
+                data = q.to_dict()
+                message = _duplicate_message(reason)
+                rows.append({
+                    "job_id": job_id,
+                    "line": line,
+                    "status": "pending",
+                    "is_duplicate": reason is not None,
+                    "message": message,
+                    "data": to_json(data)
+                })
+                q.is_duplicate = reason is not None
+                if reason:
+                    q.parse_status = "warning"
+                stats.add(q)
+                previews.append(_session_question(data, reason is not None, message))
+            db.execute(insert(ImportJobItem), rows)
+            db.commit()
+            yield from previews
+
+        job.total_count = job.parsed_count = job.deduped_count = stats.total
+        job.statistics = to_json(stats.to_dict())
+        job.bank_version = change_feed.bank_version(db)
+        job.status = "ready"
+        db.commit()
+    except Exception:
+        db.rollback()
+        _discard_session(db, job_id)
+        raise
+
+
+def _new_session(db: Session, filename: str, file_hash: str) -> ImportJob:
+    job = ImportJob(mode="preview", status="parsing", filename=filename, file_hash=file_hash)
+    db.add(job)
+    db.commit()
+    return job
+
+
+def _discard_session(db: Session, job_id: str):
+    db.query(ImportJobItem).filter(ImportJobItem.job_id == job_id).delete(synchronize_session=False)
+    db.query(ImportJob).filter(ImportJob.id == job_id).delete(synchronize_session=False)
+    db.commit()
+
+
+def create_session(db: Session, filename: str, path: str, file_hash: str) -> Tuple[ImportJob, bool]:
+    """
+    创建导入预览会话；同一文件（内容哈希）已有未使用的会话时直接复用
+
+    Returns:
+        (会话, 是否复用缓存)
+    """
+    job = find_session(db, filename, file_hash)
+    if job:
+        return job, True
+
+    questions = iter_file(filename, path)
+    job = _new_session(db, filename, file_hash)
+    for _ in fill_session(db, job, questions):
+        pass
+    db.refresh(job)
+    return job, False
+
+
+def stream_session(db: Session, filename: str, path: str, file_hash: str) -> Iterator[Dict]:
+    """
+    创建导入预览会话并逐行产出结果：每道题 {"question": {...}}，最后一行
+    {"summary": {token, statistics, total, cached}}；复用已有会话时按序读出暂存的结果
+    """
+    job = find_session(db, filename, file_hash)
+    cached = job is not None
+    if cached:
+        items = db.query(ImportJobItem).filter(
+            ImportJobItem.job_id == job.id
+        ).order_by(ImportJobItem.line).yield_per(PREVIEW_BATCH_SIZE)
+        for item in items:
+            yield {"question": session_item_to_dict(item)}
+    else:
+        questions = iter_file(filename, path)
+        job = _new_session(db, filename, file_hash)
+        for question in fill_session(db, job, questions):
+            yield {"question": question}
+
+    yield {"summary": {
+        "token": job.id,
+        "statistics": from_json(job.statistics),
+        "total": job.total_count,
+        "cached": cached
+    }}
+
+
+def get_session(db: Session, token: str) -> ImportJob:
+    job = db.query(ImportJob).filter(ImportJob.id == token, ImportJob.mode == "preview").first()
+    if not job:
+        raise NotFoundError("导入会话不存在或已过期")
+    return job
+
+
+def session_page(db: Session, job: ImportJob, page: int, page_size: int) -> Dict:
+    """预览会话的分页数据"""
+    items = db.query(ImportJobItem).filter(
+        ImportJobItem.job_id == job.id
+    ).order_by(ImportJobItem.line).offset((page - 1) * page_size).limit(page_size).all()
+
+    total = job.total_count
+    return {
+        "token": job.id,
+        "statistics": from_json(job.statistics),
+        "questions": [session_item_to_dict(item) for item in items],
+        "total": total,
+        "page": page,
+        "pageSize": page_size,
+        "totalPages": math.ceil(total / page_size) if total > 0 else 0
+    }
+
+
+def import_session(
+    db: Session,
+    job: ImportJob,
+    excluded_indices: Sequence[int] = (),
+    category_overrides: Optional[Dict[int, str]] = None,
+    category_id: str = "default",
+    default_type: str = "single",
+    default_difficulty: str = "medium",
+    skip_errors: bool = True,
+    skip_duplicates: bool = True,
+    upsert: bool = False
+) -> Dict:
+    """
+    导入预览会话中的题目（排除 excluded_indices 中的题目序号）
+
+    沿用会话中的查重结果，题库在预览后有变化时只重新查重一次。
+    """
+    if job.status != "ready":
+        raise ParameterError("导入会话已使用")
+
+    if skip_duplicates:
+        refresh_session(db, job)
+
+    excluded = set(excluded_indices)
+    category_overrides = category_overrides or {}
+
+    items, questions = [], []
+    for item in _session_items(db, job):
+        d = from_json(item.data, {})
+        index = d.get("index", item.line)
+        if index in excluded:
+            item.status = "excluded"
+            continue
+        if category_overrides.get(index):
+            d["categoryId"] = category_overrides[index]
+        items.append(item)
+        questions.append(d)
+
+    items_by_line = {d.get("index", item.line): item for item, d in zip(items, questions)}
+
+    def on_chunk(results: List[Dict]):
+        for r in results:
+            item = items_by_line[r["line"]]
+            item.status = r["status"]
+            item.question_id = r["questionId"]
+            if r["status"] != "skipped":
+                item.message = r["message"]
+        job.inserted_count += sum(1 for r in results if r["status"] == "imported")
+        job.updated_count = (job.updated_count or 0) + sum(1 for r in results if r["status"] == "updated")
+        job.skipped_count += sum(1 for r in results if r["status"] == "skipped")
+        job.failed_count += sum(1 for r in results if r["status"] == "failed")
+
+    result = ImportService(db).import_questions(
+        questions,
+        category_id=category_id,
+        default_type=default_type,
+        default_difficulty=default_difficulty,
+        skip_errors=skip_errors,
+        skip_duplicates=skip_duplicates,
+        duplicates=[bool(item.is_duplicate) for item in items],
+        lines=[d.get("index", item.line) for item, d in zip(items, questions)],
+        on_chunk=on_chunk,
+        upsert=upsert
+    )
+
+    job.status = "completed"
+    job.completed_at = datetime.utcnow()
+    return result
@@ -0,0 +1,154 @@
+"""
+题目派生数据同步
+
+所有通过 ORM 写入的题目（新建/修改/删除）在 flush 时统一同步到派生的索引结构；
+绕过 ORM 的批量写入（query.update/delete、批量插入）需显式调用对应的函数。
+
+写入题目前先分配变更序号（change_feed.next_seq / record_deleted），再更新计数器等共享行，
+所有写入事务按同一顺序加锁。
+"""
+from collections import Counter
+from typing import Sequence, Tuple, Iterable
+
+from sqlalchemy import event, inspect
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from config import settings
+from models.question import Question
+from services import search_service, counter_service, dedup_service, tag_service, change_feed
+
+
+def questions_written(conn: Connection, rows: Iterable[Tuple[str, str]]):
+    """题目新建或题干变更，rows 为 (question_id, content)"""
+    rows = list(rows)
+    search_service.index_rows(conn, rows)
+    dedup_service.index_rows(conn, rows)
+
+
+def tags_written(conn: Connection, rows: Iterable[Tuple[str, str]]):
+    """题目新建或标签变更，rows 为 (question_id, tags)"""
+    tag_service.index_rows(conn, rows)
+
+
+def questions_deleted(conn: Connection, question_ids: Sequence[str]):
+    """题目即将删除（需在 DELETE 语句执行前调用）"""
+    if not question_ids:
+        return
+    change_feed.record_deleted(conn, question_ids)
+    counters_changed(conn, removal_delta(conn, question_ids))
+    derived_removed(conn, question_ids)
+
+
+def removal_delta(conn: Connection, question_ids: Sequence[str]) -> Counter:
+    """删除一批题目对计数器的增量（需在 DELETE 语句执行前计算）"""
+    if not settings.QUESTION_COUNTERS_ENABLED or not question_ids:
+        return Counter()
+    delta = counter_service.keys_for_ids(conn, question_ids)
+    return Counter({k: -v for k, v in delta.items()})
+
+
+def derived_removed(conn: Connection, question_ids: Sequence[str]):
+    """
+    删除题目的全文索引、查重索引和标签关联
+
+    按筛选条件批量删除时（条件可能依赖这些表），在 DELETE 语句之后调用；删除墓碑（change_feed.record_deleted）
+    和计数器增量（removal_delta）需在 DELETE 之前处理
+    """
+    search_service.remove_ids(conn, list(question_ids))
+    dedup_service.remove_ids(conn, list(question_ids))
+    tag_service.remove_ids(conn, list(question_ids))
+
+
+def counters_changed(conn: Connection, delta: Counter):
+    """计数器增量（批量插入等路径使用）"""
+    if settings.QUESTION_COUNTERS_ENABLED and delta:
+        counter_service.apply_delta(conn, delta)
+
+
+def _changed(question: Question, attr: str) -> bool:
+    return inspect(question).attrs[attr].history.has_changes()
+
+
+def _counter_delta(question: Question, is_new: bool) -> Tuple[Counter, bool]:
+    """
+    计算单道题目的计数器增量
+    返回 (增量, 是否无法确定旧值需要重建)
+    """
+    state = inspect(question)
+    before, after = {}, {}
+    changed = is_new
+    for attr in counter_service.COUNTER_ATTRS:
+        history = state.attrs[attr].history
+        if not is_new and history.has_changes():
+            if not history.deleted:
+                return Counter(), True
+            changed = True
+            before[attr] = history.deleted[0]
+        after[attr] = getattr(question, attr)
+        before.setdefault(attr, after[attr])
+
+    if not changed:
+        return Counter(), False
+
+    delta = Counter(counter_service.question_keys(**after))
+    if not is_new:
+        delta.subtract(counter_service.question_keys(**before))
+    return delta, False
+
+
+def _before_flush(session: Session, flush_context, instances):
+    deleted = [q.id for q in session.deleted if isinstance(q, Question)]
+    if deleted:
+        questions_deleted(session.connection(), deleted)
+
+    # 新建/修改的题目在本次 flush 的 INSERT/UPDATE 中写入变更序号
+    written = [q for q in session.new if isinstance(q, Question)]
+    written += [
+        q for q in session.dirty
+        if isinstance(q, Question) and session.is_modified(q, include_collections=False)
+    ]
+    if written:
+        seq = change_feed.next_seq(session.connection())
+        for q in written:
+            q.change_seq = seq
+
+
+def _after_flush(session: Session, flush_context):
+    conn = None
+    written = []
+    tagged = []
+    delta = Counter()
+    needs_rebuild = False
+
+    for q in list(session.new) + list(session.dirty):
+        if not isinstance(q, Question):
+            continue
+        is_new = q in session.new
+        if is_new or _changed(q, "content"):
+            written.append((q.id, q.content))
+        if is_new or _changed(q, "tags"):
+            tagged.append((q.id, q.tags))
+        if settings.QUESTION_COUNTERS_ENABLED:
+            q_delta, unknown = _counter_delta(q, is_new)
+            delta.update(q_delta)
+            needs_rebuild = needs_rebuild or unknown
+
+    if written:
+        conn = session.connection()
+        questions_written(conn, written)
+    if tagged:
+        conn = conn or session.connection()
+        tags_written(conn, tagged)
+
+    if needs_rebuild:
+        counter_service.rebuild(conn or session.connection())
+    elif any(delta.values()):
+        counters_changed(conn or session.connection(), delta)
+
+
+def register(session_factory):
+    """在 Session 工厂上注册同步钩子（重复调用无副作用）"""
+    for name, fn in (("before_flush", _before_flush), ("after_flush", _after_flush)):
+        if not event.contains(session_factory, name, fn):
+            event.listen(session_factory, name, fn)
@@ -0,0 +1,241 @@
+"""
+全文检索服务 - SQLite FTS5 / PostgreSQL tsvector
+
+题干先在 Python 侧切分为检索词：中文按相邻二字（bigram）切分，
+英文/数字按单词切分，然后写入 question_search 表。
+中文片段按相邻二字短语匹配（等价于子串匹配）；英文/数字按词前缀匹配（func 命中 function），
+没有任何前缀命中时回退到 LIKE 子串匹配（unction 命中 function）。
+- SQLite: question_search 作为 FTS5 外部内容表，由触发器同步到 questions_fts
+- PostgreSQL: 在 to_tsvector('simple', tokens) 上建立 GIN 表达式索引
+"""
+import html
+import logging
+import re
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select, text, bindparam, insert, Float, String
+from sqlalchemy.engine import Connection, Engine
+
+from models.question_search import QuestionSearch
+
+logger = logging.getLogger(__name__)
+
+CJK_CHARS = r'\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff'
+_RUN_PATTERN = re.compile(rf'[{CJK_CHARS}]+|[^\W{CJK_CHARS}_]+')
+_CJK_RUN_PATTERN = re.compile(rf'^[{CJK_CHARS}]')
+
+SNIPPET_LENGTH = 80
+BATCH_SIZE = 500
+
+# None 表示尚未检测
+_fts_ready: Optional[bool] = None
+
+
+def _split_runs(content: str) -> List[Tuple[bool, str]]:
+    """切分为 (是否中文, 片段) 序列"""
+    return [
+        (bool(_CJK_RUN_PATTERN.match(run)), run)
+        for run in _RUN_PATTERN.findall((content or "").lower())
+    ]
+
+
+def _run_tokens(is_cjk: bool, run: str) -> List[str]:
+    if not is_cjk or len(run) == 1:
+        return [run]
+    return [run[i:i + 2] for i in range(len(run) - 1)]
+
+
+def tokenize(content: str) -> str:
+    """将题干转换为以空格分隔的检索词"""
+    tokens = []
+    for is_cjk, run in _split_runs(content):
+        tokens.extend(_run_tokens(is_cjk, run))
+    return " ".join(tokens)
+
+
+def build_match_query(keyword: str, dialect: str) -> Optional[str]:
+    """
+    构建全文检索表达式
+
+    每个连续片段转换为一个短语（二字词需相邻出现，等价于子串匹配；英文/数字片段的最后一个词按前缀匹配），
+    多个片段之间为 AND 关系。单个汉字无法用二字索引命中，返回 None 由调用方回退到 LIKE。
+    """
+    runs = _split_runs(keyword)
+    if not runs:
+        return None
+
+    clauses = []
+    for is_cjk, run in runs:
+        if is_cjk and len(run) == 1:
+            return None
+        tokens = _run_tokens(is_cjk, run)
+        if dialect == "postgresql":
+            clause = " <-> ".join(tokens)
+            if not is_cjk:
+                clause += ":*"
+            clauses.append(f"({clause})" if len(tokens) > 1 else clause)
+        else:
+            phrase = '"' + " ".join(tokens) + '"'
+            clauses.append(phrase if is_cjk else phrase + " *")
+
+    return (" & " if dialect == "postgresql" else " ").join(clauses)
+
+
+def is_available(conn: Connection) -> bool:
+    """当前数据库是否可用全文索引"""
+    global _fts_ready
+    if _fts_ready is None:
+        dialect = conn.dialect.name
+        if dialect == "sqlite":
+            _fts_ready = conn.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'questions_fts'"
+            )).first() is not None
+        else:
+            _fts_ready = dialect == "postgresql"
+    return _fts_ready
+
+
+def ensure_search_index(engine: Engine):
+    """创建方言相关的全文索引结构，并回填缺失的检索文档"""
+    global _fts_ready
+
+    with engine.begin() as conn:
+        dialect = conn.dialect.name
+        if dialect == "sqlite":
+            try:
+                conn.execute(text(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS questions_fts USING fts5("
+                    "tokens, content='question_search', content_rowid='id')"
+                ))
+            except Exception as e:
+                logger.warning(f"SQLite FTS5 unavailable, keyword search falls back to LIKE: {e}")
+                _fts_ready = False
+            else:
+                conn.execute(text(
+                    "CREATE TRIGGER IF NOT EXISTS question_search_ai AFTER INSERT ON question_search BEGIN "
+                    "INSERT INTO questions_fts(rowid, tokens) VALUES (new.id, new.tokens); END"
+                ))
+                conn.execute(text(
+                    "CREATE TRIGGER IF NOT EXISTS question_search_ad AFTER DELETE ON question_search BEGIN "
+                    "INSERT INTO questions_fts(questions_fts, rowid, tokens) VALUES ('delete', old.id, old.tokens); END"
+                ))
+                conn.execute(text(
+                    "CREATE TRIGGER IF NOT EXISTS question_search_au AFTER UPDATE ON question_search BEGIN "
+                    "INSERT INTO questions_fts(questions_fts, rowid, tokens) VALUES ('delete', old.id, old.tokens); "
+                    "INSERT INTO questions_fts(rowid, tokens) VALUES (new.id, new.tokens); END"
+                ))
+                _fts_ready = True
+        elif dialect == "postgresql":
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_question_search_tsv "
+                "ON question_search USING GIN (to_tsvector('simple', tokens))"
+            ))
+            _fts_ready = True
+        else:
+            _fts_ready = False
+
+    with engine.begin() as conn:
+        backfill(conn)
+
+
+def backfill(conn: Connection):
+    """为尚未建立检索文档的题目补建索引"""
+    while True:
+        rows = conn.execute(text(
+            "SELECT q.id, q.content FROM questions q "
+            "LEFT JOIN question_search s ON s.question_id = q.id "
+            "WHERE s.id IS NULL LIMIT :limit"
+        ), {"limit": BATCH_SIZE}).all()
+        if not rows:
+            break
+        index_rows(conn, rows)
+
+
+def index_rows(conn: Connection, rows: Iterable[Tuple[str, str]]):
+    """写入/覆盖题目的检索文档，rows 为 (question_id, content)"""
+    params = [{"question_id": qid, "tokens": tokenize(content)} for qid, content in rows]
+    if not params:
+        return
+    remove_ids(conn, [p["question_id"] for p in params])
+    conn.execute(insert(QuestionSearch.__table__), params)
+
+
+def remove_ids(conn: Connection, question_ids: Sequence[str]):
+    """删除题目的检索文档"""
+    for i in range(0, len(question_ids), BATCH_SIZE):
+        chunk = list(question_ids[i:i + BATCH_SIZE])
+        conn.execute(
+            text("DELETE FROM question_search WHERE question_id IN :ids").bindparams(
+                bindparam("ids", expanding=True)
+            ),
+            {"ids": chunk}
+        )
+
+
+def ranked_matches(conn: Connection, keyword: str):
+    """
+    返回 (question_id, rank) 子查询，rank 越小越相关；
+    全文索引不可用、关键词无法转换，或含英文/数字的关键词没有任何词前缀命中时返回 None
+    （由调用方回退到 LIKE，词中间的子串如 unction 仍能命中 function）
+    """
+    if not is_available(conn):
+        return None
+
+    dialect = conn.dialect.name
+    match_query = build_match_query(keyword, dialect)
+    if not match_query:
+        return None
+
+    if dialect == "postgresql":
+        stmt = text(
+            "SELECT s.question_id AS question_id, "
+            "-ts_rank(to_tsvector('simple', s.tokens), to_tsquery('simple', :match_query)) AS rank "
+            "FROM question_search s "
+            "WHERE to_tsvector('simple', s.tokens) @@ to_tsquery('simple', :match_query)"
+        )
+    else:
+        stmt = text(
+            "SELECT s.question_id AS question_id, bm25(questions_fts) AS rank "
+            "FROM questions_fts JOIN question_search s ON s.id = questions_fts.rowid "
+            "WHERE questions_fts MATCH :match_query"
+        )
+
+    matches = stmt.bindparams(match_query=match_query).columns(
+        question_id=String, rank=Float
+    ).subquery("search_matches")
+
+    if any(not is_cjk for is_cjk, _ in _split_runs(keyword)):
+        if conn.execute(select(matches.c.question_id).limit(1)).first() is None:
+            return None
+    return matches
+
+
+def highlight(content: str, keyword: str, length: int = SNIPPET_LENGTH) -> Optional[str]:
+    """截取命中位置附近的片段，命中词以 <mark> 包裹（其余内容已转义）"""
+    if not content or not keyword:
+        return None
+
+    terms = sorted({t for t in keyword.split() if t}, key=len, reverse=True)
+    if not terms:
+        return None
+    pattern = re.compile("|".join(re.escape(t) for t in terms), re.IGNORECASE)
+
+    first = pattern.search(content)
+    start = max(0, first.start() - length // 4) if first else 0
+    end = min(len(content), start + length)
+    window = content[start:end]
+
+    parts = []
+    last = 0
+    for match in pattern.finditer(window):
+        parts.append(html.escape(window[last:match.start()]))
+        parts.append(f"<mark>{html.escape(match.group(0))}</mark>")
+        last = match.end()
+    parts.append(html.escape(window[last:]))
+
+    snippet = "".join(parts)
+    if start > 0:
+        snippet = "…" + snippet
+    if end < len(content):
+        snippet += "…"
+    return snippet
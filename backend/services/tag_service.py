@@ -0,0 +1,129 @@
+"""
+题目标签服务 - 规范化的 tags / question_tags 表
+
+questions.tags 仍保存题目的标签列表（接口格式不变），question_tags 由写入路径同步维护，
+用于按标签筛选（走 tag_id 索引）和标签计数（一次 GROUP BY）。
+"""
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import text, bindparam, select, func, insert
+from sqlalchemy.engine import Connection
+
+from models.question import Question
+from models.tag import Tag, QuestionTag
+from utils.helpers import from_json
+
+BATCH_SIZE = 500
+MAX_TAG_LENGTH = 100
+
+
+def parse_tags(value) -> List[str]:
+    """questions.tags（列表，或原生 SQL 在 SQLite 上读出的 JSON 字符串）转为去重后的标签名列表"""
+    if isinstance(value, str):
+        value = from_json(value, [])
+    if not isinstance(value, list):
+        return []
+
+    names = []
+    for tag in value:
+        if tag is None:
+            continue
+        name = str(tag).strip()[:MAX_TAG_LENGTH]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def _tag_ids(conn: Connection, names: Iterable[str]) -> Dict[str, int]:
+    """标签名 -> id，不存在的标签自动创建"""
+    names = list(set(names))
+    ids: Dict[str, int] = {}
+    for i in range(0, len(names), BATCH_SIZE):
+        rows = conn.execute(
+            text("SELECT name, id FROM tags WHERE name IN :names").bindparams(
+                bindparam("names", expanding=True)
+            ),
+            {"names": names[i:i + BATCH_SIZE]}
+        ).all()
+        ids.update(rows)
+
+    missing = [name for name in names if name not in ids]
+    if missing:
+        conn.execute(text("INSERT INTO tags (name) VALUES (:name)"), [{"name": n} for n in missing])
+        for i in range(0, len(missing), BATCH_SIZE):
+            rows = conn.execute(
+                text("SELECT name, id FROM tags WHERE name IN :names").bindparams(
+                    bindparam("names", expanding=True)
+                ),
+                {"names": missing[i:i + BATCH_SIZE]}
+            ).all()
+            ids.update(rows)
+    return ids
+
+
+def index_rows(conn: Connection, rows: Iterable[Tuple[str, Optional[str]]]):
+    """写入/覆盖题目的标签关联，rows 为 (question_id, tags)"""
+    rows = [(qid, parse_tags(tags)) for qid, tags in rows]
+    if not rows:
+        return
+    remove_ids(conn, [qid for qid, _ in rows])
+
+    ids = _tag_ids(conn, (name for _, names in rows for name in names))
+    params = [
+        {"question_id": qid, "tag_id": ids[name]}
+        for qid, names in rows
+        for name in names
+    ]
+    if params:
+        conn.execute(insert(QuestionTag.__table__), params)
+
+
+def remove_ids(conn: Connection, question_ids: Sequence[str]):
+    """删除题目的标签关联"""
+    for i in range(0, len(question_ids), BATCH_SIZE):
+        conn.execute(
+            text("DELETE FROM question_tags WHERE question_id IN :ids").bindparams(
+                bindparam("ids", expanding=True)
+            ),
+            {"ids": list(question_ids[i:i + BATCH_SIZE])}
+        )
+
+
+def backfill(conn: Connection):
+    """从 questions.tags 补建尚未建立的标签关联（按 id 游标推进）"""
+    after = ""
+    while True:
+        rows = conn.execute(text(
+            "SELECT q.id, q.tags FROM questions q "
+            "WHERE q.id > :after AND q.tags IS NOT NULL AND CAST(q.tags AS TEXT) NOT IN ('', '[]', 'null') "
+            "AND NOT EXISTS (SELECT 1 FROM question_tags t WHERE t.question_id = q.id) "
+            "ORDER BY q.id LIMIT :limit"
+        ), {"after": after, "limit": BATCH_SIZE}).all()
+        if not rows:
+            break
+        index_rows(conn, rows)
+        after = rows[-1][0]
+
+
+def tag_filter(names: Sequence[str]):
+    """题目包含任一标签的筛选条件（用于 Question 查询）"""
+    return Question.id.in_(
+        select(QuestionTag.question_id).join(Tag, Tag.id == QuestionTag.tag_id).where(Tag.name.in_(list(names)))
+    )
+
+
+def counts(conn: Connection, filters: Sequence = (), limit: Optional[int] = None) -> List[Dict]:
+    """
+    各标签的题目数（按数量降序）
+
+    filters 为附加的 Question 条件（如分类），有条件时关联 questions 表
+    """
+    query = select(Tag.name, func.count(QuestionTag.question_id).label("count")).join(
+        QuestionTag, QuestionTag.tag_id == Tag.id
+    )
+    if filters:
+        query = query.join(Question, Question.id == QuestionTag.question_id).where(*filters)
+    query = query.group_by(Tag.id, Tag.name).order_by(func.count(QuestionTag.question_id).desc(), Tag.name)
+    if limit:
+        query = query.limit(limit)
+    return [{"name": name, "count": count} for name, count in conn.execute(query).all()]
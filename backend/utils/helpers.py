@@ -1,6 +1,30 @@
+import base64
+import hashlib
 import json
+import re
 from typing import Any, Optional, Dict, List
 
+import orjson
+
+
+_NORMALIZE_PATTERN = re.compile(r'[^\w\u4e00-\u9fff]')
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Remove punctuation and whitespace, keep chars only"""
+    if not text:
+        return ""
+    # Keep only Chinese, letters, numbers
+    return _NORMALIZE_PATTERN.sub('', str(text)).lower()
+
+
+def content_hash(text: Optional[str]) -> Optional[str]:
+    """SHA-256 of normalized content, used for exact duplicate lookups"""
+    norm = normalize_text(text)
+    if not norm:
+        return None
+    return hashlib.sha256(norm.encode("utf-8")).hexdigest()
+
 
 def to_json(data: Any) -> Optional[str]:
     """Convert data to JSON string"""
@@ -14,11 +38,27 @@ def from_json(json_str: Optional[str], default: Any = None) -> Any:
     if not json_str:
         return default
     try:
-        return json.loads(json_str)
-    except (json.JSONDecodeError, TypeError):
+        return orjson.loads(json_str)
+    except (orjson.JSONDecodeError, TypeError):
         return default
 
 
+def encode_cursor(values: List[Any]) -> str:
+    """Encode keyset values as an opaque cursor token"""
+    raw = json.dumps(values, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> Optional[List[Any]]:
+    """Decode a cursor token, returns None if malformed"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError):
+        return None
+    return values if isinstance(values, list) else None
+
+
 def snake_to_camel(snake_str: str) -> str:
     """Convert snake_case to camelCase"""
     components = snake_str.split('_')
@@ -0,0 +1,26 @@
+"""
+响应序列化
+
+应用默认使用 ORJSONResponse。列表接口返回的数据由服务端从 ORM 行直接构造，字段和类型已确定，
+用 trusted_response 直接交给 orjson 序列化，跳过 response_model 对每一项的 Pydantic 校验和
+jsonable_encoder 转换（response_model 仍保留用于接口文档）。
+"""
+from typing import Any, Iterable, List
+
+from fastapi.responses import ORJSONResponse
+
+
+def trusted_response(content: Any, status_code: int = 200) -> ORJSONResponse:
+    """直接序列化已构造好的数据（dict/list/datetime 等 orjson 原生支持的类型）"""
+    return ORJSONResponse(content, status_code=status_code)
+
+
+def ok(data: Any = None, message: str = "success") -> ORJSONResponse:
+    """标准响应 {code, message, data}，不经过 Response[...] 校验"""
+    return trusted_response({"code": 0, "message": message, "data": data})
+
+
+def rows_to_dicts(rows: Iterable[Any], fields: Iterable[str]) -> List[dict]:
+    """按字段名取 ORM 对象属性，字段名与响应模型一致"""
+    fields = list(fields)
+    return [{name: getattr(row, name) for name in fields} for row in rows]
@@ -0,0 +1,58 @@
+"""
+上传文件处理 - 分块写入临时文件，避免整个文件读入内存
+"""
+import hashlib
+import os
+import tempfile
+from typing import NamedTuple, Optional
+
+from fastapi import UploadFile
+
+from config import settings
+from utils.exceptions import ParameterError
+
+
+class SpooledUpload(NamedTuple):
+    path: str
+    size: int
+    sha256: str
+
+
+async def spool_upload(file: UploadFile, max_mb: int, suffix: Optional[str] = None) -> SpooledUpload:
+    """
+    将上传文件按 UPLOAD_CHUNK_SIZE 分块写入临时文件，同时计算 SHA-256
+
+    Returns:
+        SpooledUpload: 临时文件路径（调用方负责删除）、大小和内容哈希
+
+    Raises:
+        ParameterError: 文件超过大小上限
+    """
+    max_size = max_mb * 1024 * 1024
+    fd, path = tempfile.mkstemp(suffix=suffix, dir=settings.UPLOAD_TEMP_DIR or None)
+    size = 0
+    digest = hashlib.sha256()
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await file.read(settings.UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_size:
+                    raise ParameterError(f"文件过大，最大支持 {max_mb} MB")
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        remove_file(path)
+        raise
+    return SpooledUpload(path, size, digest.hexdigest())
+
+
+def remove_file(path: Optional[str]):
+    """删除临时文件（不存在时忽略）"""
+    if path:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -52,9 +52,9 @@ export const aiApi = {
   },
   
   // Get tasks list
-  getTasks(status?: string) {
+  getTasks(status?: string, questionId?: string) {
     return api.get<any, { data: { items: AITask[]; total: number } }>('/ai/tasks', {
-      params: { status }
+      params: { status, questionId }
     })
   },
   
@@ -16,6 +16,7 @@ export interface CustomExamRequest {
   category_ids?: string[]
   question_types?: string[]
   difficulties?: string[]
+  tags?: string[]
   type_counts?: TypeCount[]
   time_limit?: number
   shuffle_options: boolean
@@ -88,6 +89,7 @@ export const examsApi = {
   listExams(params?: {
     status?: string
     mode?: string
+    question_id?: string
     skip?: number
     limit?: number
   }) {
@@ -44,6 +44,9 @@ export interface QuestionUpdate {
 export interface QuestionListQuery {
   page?: number
   pageSize?: number
+  pagination?: 'page' | 'cursor'
+  cursor?: string
+  includeTotal?: boolean
   keyword?: string
   categoryId?: string
   type?: string
@@ -51,8 +54,41 @@ export interface QuestionListQuery {
   status?: string
   answerStatus?: string
   explanationStatus?: string
+  tag?: string
   sortBy?: string
   sortOrder?: string
+  facets?: boolean
+}
+
+export interface QuestionFilter {
+  keyword?: string
+  categoryId?: string
+  type?: string
+  difficulty?: string
+  status?: string
+  answerStatus?: string
+  explanationStatus?: string
+  tag?: string
+}
+
+export interface BulkMutationResult {
+  matched: number
+  updated?: number
+  deleted?: number
+  wrongQuestionsDeleted?: number
+}
+
+export interface QuestionChanges {
+  items: Question[]
+  deleted: string[]
+  nextToken: string | null
+  hasMore: boolean
+  fullResync: boolean
+}
+
+export interface TagCount {
+  name: string
+  count: number
 }
 
 export interface QuestionStats {
@@ -71,10 +107,62 @@ export interface PageResponse<T> {
   totalPages: number
 }
 
+// Question counts per filter option under the current filters (each facet ignores its own filter)
+export interface QuestionFacets {
+  categoryId: Record<string, number>
+  type: Record<string, number>
+  difficulty: Record<string, number>
+  status: Record<string, number>
+}
+
+export interface CursorPageResponse<T> {
+  items: T[]
+  pageSize: number
+  nextCursor: string | null
+  hasMore: boolean
+  total: number | null
+}
+
+export interface ImportJob {
+  id: string
+  status: 'pending' | 'parsing' | 'deduplicating' | 'importing' | 'completed' | 'failed'
+  filename: string
+  totalCount: number
+  parsedCount: number
+  dedupedCount: number
+  insertedCount: number
+  updatedCount: number
+  skippedCount: number
+  failedCount: number
+  progress: number
+  statistics: Record<string, any> | null
+  errorMessage: string | null
+  createdAt: string | null
+  startedAt: string | null
+  updatedAt: string | null
+  completedAt: string | null
+}
+
+export interface ImportJobItem {
+  line: number
+  status: 'imported' | 'updated' | 'skipped' | 'failed'
+  isDuplicate: boolean
+  questionId: string | null
+  message: string | null
+  question: Record<string, any>
+}
+
+// One line of the streamed import preview
+export interface ImportPreviewStreamEntry {
+  question?: Record<string, any>
+  summary?: { token: string; statistics: Record<string, any>; total: number; cached: boolean }
+  error?: string
+}
+
 export const questionsApi = {
   // Get question list
   getQuestions(params: QuestionListQuery) {
-    return api.get<any, { data: PageResponse<Question> }>('/questions', { params })
+    return api.get<any, { data: PageResponse<Question> & { facets?: QuestionFacets } }>('/questions', { params })
   },
   
   // Get question stats
@@ -82,6 +170,16 @@ export const questionsApi = {
     return api.get<any, { data: QuestionStats }>('/questions/stats')
   },
   
+  // Get tags with question counts
+  getQuestionTags(params: { categoryId?: string; limit?: number } = {}) {
+    return api.get<any, { data: { items: TagCount[]; total: number } }>('/questions/tags', { params })
+  },
+  
+  // Incremental sync: changes since a token (omit since for the initial sync)
+  getQuestionChanges(params: { since?: string; limit?: number } = {}) {
+    return api.get<any, { data: QuestionChanges }>('/questions/changes', { params })
+  },
+  
   // Get question details
   getQuestion(id: string) {
     return api.get<any, { data: Question }>(`/questions/${id}`)
@@ -112,6 +210,16 @@ export const questionsApi = {
     return api.post<any, { data: { updated: number } }>('/questions/batch-update-category', { question_ids: ids, category_id: categoryId })
   },
 
+  // Update or delete every question matching a filter (server-side, no ID lists)
+  bulkMutateQuestions(data: {
+    filter: QuestionFilter
+    action: 'update' | 'delete'
+    update?: { categoryId?: string; difficulty?: string }
+    dryRun?: boolean
+  }) {
+    return api.post<any, { data: BulkMutationResult }>('/questions/bulk', data)
+  },
+
   // Confirm answer
   confirmAnswer(id: string) {
     return api.put<any, { data: Question }>(`/questions/${id}/confirm-answer`)
@@ -128,10 +236,71 @@ export const questionsApi = {
     type?: string
     difficulty?: string
     includeIncomplete?: boolean
+    tag?: string
+    format?: 'json' | 'ndjson'
   }) {
     return api.get('/questions/export/json', {
       params,
       responseType: 'blob'
     })
+  },
+
+  // Download the offline question bundle (gzip + msgpack, revalidated by ETag via the HTTP cache)
+  getQuestionBundle(params: {
+    categoryId?: string
+    type?: string
+    difficulty?: string
+    includeIncomplete?: boolean
+    tag?: string
+  } = {}) {
+    return api.get<any, ArrayBuffer>('/questions/bundle', {
+      params,
+      responseType: 'arraybuffer'
+    })
+  },
+
+  // Preview an import while it is parsed (NDJSON: one question per line, then the summary)
+  streamImportPreview(file: File, onEntry: (entry: ImportPreviewStreamEntry) => void) {
+    const formData = new FormData()
+    formData.append('file', file)
+    let consumed = 0
+    const consume = (text: string, final: boolean) => {
+      const end = final ? text.length : text.lastIndexOf('\n') + 1
+      if (end <= consumed) return
+      for (const line of text.slice(consumed, end).split('\n')) {
+        if (line.trim()) onEntry(JSON.parse(line))
+      }
+      consumed = end
+    }
+    return api.post<any, string>('/questions/import/preview/stream', formData, {
+      headers: { 'Content-Type': 'multipart/form-data' },
+      responseType: 'text',
+      onDownloadProgress: (event) => consume((event.event?.target as XMLHttpRequest)?.responseText ?? '', false)
+    }).then((text) => consume(text, true))
+  },
+
+  // Upload a file and import it in the background
+  createImportJob(file: File, params: {
+    categoryId?: string
+    defaultType?: string
+    defaultDifficulty?: string
+    skipDuplicates?: boolean
+  } = {}) {
+    const formData = new FormData()
+    formData.append('file', file)
+    return api.post<any, { data: ImportJob }>('/questions/import/jobs', formData, {
+      params,
+      headers: { 'Content-Type': 'multipart/form-data' }
+    })
+  },
+
+  // Poll import job progress
+  getImportJob(id: string) {
+    return api.get<any, { data: ImportJob }>(`/questions/import/jobs/${id}`)
+  },
+
+  // Per-question results of an import job
+  getImportJobItems(id: string, params: { page?: number; pageSize?: number; status?: string } = {}) {
+    return api.get<any, { data: PageResponse<ImportJobItem> }>(`/questions/import/jobs/${id}/items`, { params })
   }
 }
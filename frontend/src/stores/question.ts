@@ -1,6 +1,6 @@
 import { defineStore } from 'pinia'
 import { ref } from 'vue'
-import { questionsApi, Question, QuestionListQuery, QuestionStats } from '@/api/questions'
+import { questionsApi, Question, QuestionFacets, QuestionListQuery, QuestionStats } from '@/api/questions'
 
 export const useQuestionStore = defineStore('question', () => {
   const questions = ref<Question[]>([])
@@ -10,6 +10,7 @@ export const useQuestionStore = defineStore('question', () => {
   const total = ref(0)
   const page = ref(1)
   const pageSize = ref(20)
+  const facets = ref<QuestionFacets | null>(null)
   
   const fetchQuestions = async (params: QuestionListQuery = {}) => {
     loading.value = true
@@ -19,6 +20,7 @@ export const useQuestionStore = defineStore('question', () => {
       total.value = response.data.total
       page.value = response.data.page
       pageSize.value = response.data.pageSize
+      facets.value = response.data.facets ?? null
     } finally {
       loading.value = false
     }
@@ -80,6 +82,7 @@ export const useQuestionStore = defineStore('question', () => {
     total,
     page,
     pageSize,
+    facets,
     fetchQuestions,
     fetchQuestionStats,
     fetchQuestion,